@@ -11,7 +11,7 @@ from utils.app_utils import apputils as au, setup
 from utils.db_utils import (
     verify_username_and_phone,
     reset_password_with_username_phone,
-    get_engine, show_engine_conn
+    get_engine, show_engine_conn, invalidate_cache
 )
 from utils.order_utils import get_scouts_byparent
 import random
@@ -87,7 +87,7 @@ def create_parent(username, email, password, first, last, phone):
         RETURNING parent_id
     """)
     with engine.begin() as conn:
-        return conn.execute(sql, {
+        parent_id = conn.execute(sql, {
             "username": username.strip(),
             "email": email,
             "password": hash_password(password),
@@ -96,6 +96,9 @@ def create_parent(username, email, password, first, last, phone):
             "phone": phone.strip(),
         }).scalar()
 
+    invalidate_cache("parents")
+    return parent_id
+
 def get_compliment():
     compliments = [
         "You’re doing an amazing job.",
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark execute_many_sql paths: executemany vs COPY + INSERT ... SELECT
+
+Uses a scratch schema (bench_bulk) on a local Postgres, never cookies_app:
+    BENCH_DSN=postgresql+psycopg2://postgres@localhost/postgres python bench_bulk_insert.py
+"""
+import os
+import time
+import uuid
+
+from sqlalchemy import create_engine, text
+
+from utils.db_utils import _copy_insert
+
+DSN = os.environ.get("BENCH_DSN", "postgresql+psycopg2://postgres@localhost/postgres")
+SIZES = [1_000, 10_000, 100_000]
+
+# Same shape as bulk_insert_order_items
+INSERT_SQL = """
+    INSERT INTO bench_bulk.order_items (
+        order_item_id,
+        order_id,
+        parent_id,
+        scout_id,
+        program_year,
+        cookie_code,
+        quantity
+    )
+    VALUES (
+        :order_item_id,
+        :order_id,
+        :parent_id,
+        :scout_id,
+        :program_year,
+        :cookie_code,
+        :quantity
+    )
+"""
+
+COOKIES = ['ADV', 'LEM', 'TRE', 'DSD', 'SAM', 'TAG', 'TM', 'EXP', 'TOF', 'DON']
+
+
+def make_payload(n):
+    parent_id, scout_id = str(uuid.uuid4()), str(uuid.uuid4())
+    return [
+        {
+            "order_item_id": str(uuid.uuid4()),
+            "order_id": str(uuid.uuid4()),
+            "parent_id": parent_id,
+            "scout_id": scout_id,
+            "program_year": 2026,
+            "cookie_code": COOKIES[i % len(COOKIES)],
+            "quantity": (i % 12) + 1,
+        }
+        for i in range(n)
+    ]
+
+
+def setup(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS bench_bulk"))
+        conn.execute(text("DROP TABLE IF EXISTS bench_bulk.order_items"))
+        conn.execute(text("""
+            CREATE TABLE bench_bulk.order_items (
+                order_item_id uuid PRIMARY KEY,
+                order_id uuid NOT NULL,
+                parent_id uuid,
+                scout_id uuid,
+                program_year integer NOT NULL,
+                cookie_code text NOT NULL,
+                quantity integer NOT NULL
+            )
+        """))
+
+
+def run_executemany(engine, payload):
+    with engine.begin() as conn:
+        conn.execute(text(INSERT_SQL), payload)
+
+
+def run_copy(engine, payload):
+    with engine.begin() as conn:
+        if not _copy_insert(conn, INSERT_SQL, payload):
+            raise RuntimeError("COPY path did not apply")
+
+
+def timed(fn, engine, payload):
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bench_bulk.order_items"))
+    start = time.perf_counter()
+    fn(engine, payload)
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT count(*) FROM bench_bulk.order_items")).scalar()
+    assert count == len(payload), f"expected {len(payload)} rows, found {count}"
+    return elapsed
+
+
+def main():
+    engine = create_engine(DSN)
+    setup(engine)
+
+    print(f"{'rows':>8} {'executemany s':>14} {'copy s':>10} {'speedup':>8}")
+    for n in SIZES:
+        payload = make_payload(n)
+        t_many = timed(run_executemany, engine, payload)
+        t_copy = timed(run_copy, engine, payload)
+        print(f"{n:>8} {t_many:>14.3f} {t_copy:>10.3f} {t_many / t_copy:>7.1f}x")
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA bench_bulk CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark DOC import payload building: iterrows loops vs melt pipeline
+
+Builds a 20k-row wide Digital Cookie export (bench_season.doc_import_frame)
+and times how long bulk_insert_order_items / planned inventory / money
+ledger take to turn it into insert payloads.  The inserts themselves (COPY)
+are the same for both and are covered by bench_bulk_insert.py, so they are
+captured here instead of executed.  Needs cookie_years, so it seeds the
+troop profile into a scratch cookies_app first:
+    BENCH_DSN=postgresql+psycopg2://postgres@localhost/postgres python bench_doc_import.py
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+import bench_seed_season as seed
+from bench_season import doc_import_frame
+from utils.db_utils import register_engine, fetch_all
+import utils.order_utils as ou
+
+ROWS = 20_000
+LEGACY_CODES = ['ADV', 'LEM', 'TRE', 'DSD', 'SAM', 'TAG', 'TM', 'EXP', 'TOF', 'DON']
+
+
+# Pre-melt implementations (payload building only)
+def legacy_order_items(df):
+    payload = []
+    for _, row in df.iterrows():
+        order_id = row.get('order_id')
+        parent_id = row.get('parent_id')
+        scout_id = row.get('scout_id')
+        if pd.isna(parent_id):
+            parent_id = 999
+        if pd.isna(scout_id):
+            scout_id = 999
+        if pd.isna(order_id):
+            continue
+        for cookie_code in LEGACY_CODES:
+            if cookie_code not in df.columns:
+                continue
+            qty = pd.to_numeric(row.get(cookie_code), errors='coerce')
+            if pd.isna(qty) or qty == 0:
+                continue
+            payload.append({
+                "order_item_id": str(uuid.uuid4()), "order_id": str(order_id),
+                "parent_id": str(parent_id), "scout_id": str(scout_id),
+                "program_year": int(row.get('program_year')),
+                "cookie_code": cookie_code, "quantity": int(qty),
+            })
+    return payload
+
+
+def legacy_planned_inventory(df):
+    payload = []
+    for r in df.itertuples():
+        for col in df.columns:
+            if col not in LEGACY_CODES:
+                continue
+            qty = pd.to_numeric(getattr(r, col), errors='coerce')
+            if pd.isna(qty) or qty <= 0:
+                continue
+            if pd.isna(r.parent_id) or pd.isna(r.scout_id):
+                continue
+            payload.append({
+                "parent_id": str(r.parent_id), "scout_id": str(r.scout_id),
+                "program_year": r.program_year, "cookie_code": col,
+                "quantity": int(qty), "order_id": str(r.order_id),
+            })
+    return payload
+
+
+def legacy_money_ledger(df):
+    payload = []
+    for _, row in df.iterrows():
+        if not ou._is_digital(row.get('order_type')):
+            continue
+        if any(pd.isna(row.get(c)) for c in ('order_id', 'parent_id', 'scout_id', 'order_amount')):
+            continue
+        payload.append({
+            "parent_id": str(row.get('parent_id')), "scout_id": str(row.get('scout_id')),
+            "program_year": int(row.get('program_year')), "amount": float(row.get('order_amount')),
+            "method": "DIGITAL_COOKIE", "notes": "Digital Cookie import - pre-paid",
+            "order_id": str(row.get('order_id')),
+        })
+    return payload
+
+
+def melt_payloads(df):
+    """Run the current functions with execute_many_sql captured."""
+    captured = []
+    real = ou.execute_many_sql
+    ou.execute_many_sql = lambda sql, params_list: captured.append(params_list)
+    try:
+        ou.bulk_insert_order_items(df)
+        ou.bulk_insert_planned_inventory(df)
+        ou.bulk_insert_money_ledger(df)
+    finally:
+        ou.execute_many_sql = real
+    return captured
+
+
+def legacy_payloads(df):
+    return [legacy_order_items(df), legacy_planned_inventory(df), legacy_money_ledger(df)]
+
+
+def _comparable(payload: list[dict]) -> list[tuple]:
+    return sorted(
+        tuple(sorted((k, str(v)) for k, v in row.items() if k != "order_item_id"))
+        for row in payload
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--force", action="store_true", help="allow a non-local database")
+    args = parser.parse_args()
+
+    seed.check_target(seed.DSN, args.force)
+    engine = seed.engine_for_bench()
+    register_engine(engine)
+    seed.seed_season(engine, args.year, reset=True, **seed.PROFILES["troop"])
+
+    scouts = [dict(r) for r in fetch_all("SELECT scout_id, parent_id FROM cookies_app.scouts")]
+    df = doc_import_frame(args.year, args.rows, scouts)
+    df["order_id"] = [uuid.uuid4() for _ in range(len(df))]
+    ou._wide_cookie_codes(args.year)   # warm the catalog cache
+
+    print(f"{'path':<10} {'rows':>8} {'payload rows':>13} {'best s':>8}")
+    results = {}
+    for label, fn in (("iterrows", legacy_payloads), ("melt", melt_payloads)):
+        best = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            payloads = fn(df)
+            best = min(best, time.perf_counter() - start)
+        results[label] = payloads
+        print(f"{label:<10} {len(df):>8} {sum(map(len, payloads)):>13} {best:>8.3f}")
+
+    match = all(
+        _comparable(a) == _comparable(b)
+        for a, b in zip(results["iterrows"], results["melt"])
+    )
+    print(f"payloads identical: {'✓' if match else '✗'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark fetch_all -> pd.DataFrame(rows) vs fetch_df (typed, column buffers)
+
+Uses the queries issued by get_all_orders_wide and get_admin_orders_flat
+against the database in .streamlit/secrets.toml:
+    python bench_fetch_df.py 2026
+"""
+import sys
+import time
+import tracemalloc
+import datetime
+
+import pandas as pd
+
+import utils.order_utils as ou
+from utils.db_utils import fetch_all, fetch_df
+
+
+def capture_sql(fn, *args):
+    """
+    Run fn with fetch_df stubbed out and return the (sql, params) of its
+    main query.  fetch_all still runs (catalog lookups feed the main SQL).
+    """
+    captured = []
+
+    def record_all(sql, params=None, *a, **k):
+        captured.append((sql, params or {}))
+        return saved[0](sql, params, *a, **k)
+
+    def record_df(sql, params=None, *a, **k):
+        captured.append((sql, params or {}))
+        return pd.DataFrame()
+
+    saved = ou.fetch_all, ou.fetch_df
+    try:
+        ou.fetch_all, ou.fetch_df = record_all, record_df
+        fn(*args)
+    finally:
+        ou.fetch_all, ou.fetch_df = saved
+    return captured[-1]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak, df.memory_usage(deep=True).sum()
+
+
+def main():
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else datetime.datetime.now().year
+
+    queries = {
+        "get_all_orders_wide": capture_sql(ou.get_all_orders_wide, year),
+        "get_admin_orders_flat": capture_sql(ou.get_admin_orders_flat, year),
+    }
+
+    print(f"{'query':<24} {'path':<10} {'rows':>8} {'build s':>9} {'peak MB':>9} {'frame MB':>9}")
+    for name, (sql, params) in queries.items():
+        for label, build in (
+            ("list->df", lambda: pd.DataFrame(fetch_all(sql, params))),
+            ("fetch_df", lambda: fetch_df(sql, params)),
+        ):
+            df, elapsed, peak, frame_bytes = measure(build)
+            print(
+                f"{name:<24} {label:<10} {len(df):>8} {elapsed:>9.3f} "
+                f"{peak / 1e6:>9.1f} {frame_bytes / 1e6:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
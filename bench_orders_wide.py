@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark get_all_orders_wide: pandas pivot (one row per order item) vs
+SQL-side FILTER pivot (one row per order)
+
+Seeds a scratch cookies_app with bench_seed_season at ~10k and ~100k orders:
+    BENCH_DSN=postgresql+psycopg2://postgres@localhost/postgres python bench_orders_wide.py
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+
+import bench_seed_season as seed
+from utils.db_utils import register_engine, fetch_df, clear_query_cache
+import utils.order_utils as ou
+
+# ~10 girl orders per scout (6 paper + 4 digital)
+SIZES = {10_000: 1_000, 100_000: 10_000}
+
+LEGACY_SQL = """
+    WITH paid AS (
+        SELECT
+            related_order_id AS order_id,
+            COALESCE(SUM(amount), 0) AS paid_amount
+        FROM cookies_app.money_ledger
+        GROUP BY related_order_id
+    )
+    SELECT
+        o.order_id AS "orderId",
+        o.program_year,
+        o.submit_dt,
+        o.order_type AS "orderType",
+        o.status AS "orderStatus",
+        o.order_amount AS "orderAmount",
+        o.order_qty_boxes AS "orderQtyBoxes",
+        o.comments,
+        o.booth_id AS "boothId",
+        o.scout_id AS "scoutId",
+        COALESCE(o.add_ebudde, false) AS "addEbudde",
+        COALESCE(o.verified_digital, false) AS "verifiedDigitalCookie",
+        COALESCE(o.order_pickedup, false) AS "orderPickedup",
+        COALESCE(
+            o.initial_order,
+            (o.submit_dt >= make_date(o.program_year, 1, 5)
+             AND o.submit_dt <  make_date(o.program_year, 2, 1))
+        ) AS "initialOrder",
+        COALESCE(
+            (s.first_name || ' ' || s.last_name),
+            (p.parent_firstname || ' ' || p.parent_lastname),
+            ''
+        ) AS "scoutName",
+        COALESCE(paid.paid_amount, 0) AS "paidAmount",
+        oi.cookie_code AS "cookieCode",
+        oi.quantity
+    FROM cookies_app.orders o
+    LEFT JOIN cookies_app.order_items oi
+      ON oi.order_id = o.order_id
+     AND oi.program_year = o.program_year
+    LEFT JOIN cookies_app.scouts s
+      ON s.scout_id = o.scout_id
+    LEFT JOIN cookies_app.parents p
+      ON p.parent_id = o.parent_id
+    LEFT JOIN paid
+      ON paid.order_id = o.order_id
+    WHERE o.program_year = :year
+    ORDER BY o.submit_dt DESC, o.order_id
+"""
+
+
+def legacy_orders_wide(year: int) -> tuple[pd.DataFrame, int]:
+    """The pre-pivot implementation (drop_duplicates + pivot_table + join)."""
+    df = fetch_df(LEGACY_SQL, {"year": year})
+    transferred = len(df)
+
+    meta = df.drop(columns=["cookieCode", "quantity"]).drop_duplicates("orderId").set_index("orderId")
+    for col in ("orderType", "orderStatus"):
+        meta[col] = meta[col].astype(object)
+    meta["paymentStatus"] = meta.apply(
+        lambda r: ou.get_payment_status(
+            r.get("orderType"), Decimal(str(r.get("orderAmount", 0))), Decimal(str(r.get("paidAmount", 0)))
+        ),
+        axis=1,
+    )
+    cookies = df[df["cookieCode"].notna()].pivot_table(
+        index="orderId", columns="cookieCode", values="quantity",
+        aggfunc="sum", fill_value=0, observed=True,
+    ).astype(int)
+    result = meta.join(cookies, how="left").reset_index()
+    for code in ou.get_cookie_codes_for_year(year):
+        result[code] = result[code].fillna(0).astype(int) if code in result.columns else 0
+    result["submit_dt"] = pd.to_datetime(result["submit_dt"], errors="coerce").dt.date
+    result.loc[~result["orderType"].str.contains("Digital", case=False, na=False), "verifiedDigitalCookie"] = False
+    return result, transferred
+
+
+def sql_pivot_orders_wide(year: int) -> tuple[pd.DataFrame, int]:
+    df = ou.get_all_orders_wide(year)
+    return df, len(df)
+
+
+def measure(fn, year):
+    clear_query_cache()
+    tracemalloc.start()
+    start = time.perf_counter()
+    df, transferred = fn(year)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, transferred, elapsed, peak
+
+
+def same_result(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    cols = [c for c in a.columns if c in b.columns]
+    a = a[cols].sort_values("orderId").reset_index(drop=True)
+    b = b[cols].sort_values("orderId").reset_index(drop=True)
+    return a.astype(str).equals(b.astype(str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument("--force", action="store_true", help="allow a non-local database")
+    args = parser.parse_args()
+
+    seed.check_target(seed.DSN, args.force)
+    engine = seed.engine_for_bench()
+    register_engine(engine)
+
+    print(f"{'orders':>8} {'path':<10} {'rows sent':>10} {'build s':>9} {'peak MB':>9}")
+    for target, scouts in SIZES.items():
+        knobs = {**seed.PROFILES["troop"], "scouts": scouts, "parents": scouts, "booths": 0}
+        seed.seed_season(engine, args.year, reset=True, **knobs)
+
+        results = {}
+        for label, fn in (("pandas", legacy_orders_wide), ("sql", sql_pivot_orders_wide)):
+            df, transferred, elapsed, peak = measure(fn, args.year)
+            results[label] = df
+            print(f"{len(df):>8} {label:<10} {transferred:>10} {elapsed:>9.3f} {peak / 1e6:>9.1f}")
+
+        match = same_result(results["pandas"], results["sql"])
+        print(f"{'':>8} results identical: {'✓' if match else '✗'}")
+
+
+if __name__ == "__main__":
+    main()
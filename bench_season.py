@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the hot data paths on a synthetic season
+
+Seeds a scratch cookies_app (bench_seed_season.py) at troop scale (50 scouts)
+and service-unit / council scale (5,000 scouts) and times the functions the
+admin pages spend their time in:
+    BENCH_DSN=postgresql+psycopg2://postgres@localhost/postgres python bench_season.py
+    python bench_season.py --profile council --repeats 5
+
+Run before the season starts and compare against the previous run.
+"""
+import argparse
+import importlib
+import statistics
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import bench_seed_season as seed
+from utils.db_utils import register_engine, fetch_all, clear_query_cache
+import utils.order_utils as ou
+
+DOC_IMPORT_ORDERS = {"troop": 200, "council": 5_000}
+BULK_UPDATE_ORDERS = {"troop": 50, "council": 500}
+
+
+def timed(fn, repeats: int):
+    """(median ms, min ms, result of the last call)."""
+    samples, result = [], None
+    for _ in range(repeats):
+        clear_query_cache()
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples), result
+
+
+def _size(result) -> int:
+    # rows for frames / lists, bytes for the PDF, 0 for writes
+    return 0 if result is None else len(result)
+
+
+def doc_import_frame(year: int, n: int, scouts: list[dict]) -> pd.DataFrame:
+    """Wide DOC-import frame, same shape admin_import_DOC_orders hands to the bulk inserts."""
+    codes = [c[0] for c in seed.COOKIES]
+    rows = []
+    for i in range(n):
+        scout = scouts[i % len(scouts)]
+        qty = {code: (i + j) % 4 for j, code in enumerate(codes)}
+        rows.append({
+            "parent_id": scout["parent_id"],
+            "scout_id": scout["scout_id"],
+            "program_year": year,
+            "order_ref": None,
+            "order_type": "Digital",
+            "status": "IMPORTED",
+            "order_qty_boxes": sum(qty.values()),
+            "order_amount": 6 * sum(qty.values()),
+            "comments": None,
+            "external_order_id": f"BENCH-{i}",
+            "order_source": "Digital Cookie Import",
+            "initial_order": False,
+            "submit_dt": datetime(year, 2, 1, 12),
+            **qty,
+        })
+    return pd.DataFrame(rows)
+
+
+def doc_import(df: pd.DataFrame):
+    df = ou.bulk_insert_order_headers(df.copy())
+    ou.bulk_insert_order_items(df)
+    ou.bulk_insert_planned_inventory(df)
+    ou.bulk_insert_money_ledger(df)
+    return df
+
+
+def drop_doc_import():
+    rows = fetch_all("SELECT order_id FROM cookies_app.orders WHERE external_order_id LIKE 'BENCH-%'")
+    ou.delete_orders_bulk(r.order_id for r in rows)
+
+
+def bulk_updates(year: int, n: int) -> list[dict]:
+    """Grid edits: flip addEbudde and bump one cookie on n orders."""
+    rows = fetch_all("""
+        SELECT order_id, add_ebudde
+        FROM cookies_app.orders
+        WHERE program_year = :year AND order_type <> 'Booth'
+        ORDER BY order_id
+        LIMIT :n
+    """, {"year": year, "n": n})
+    return [
+        {"orderId": str(r.order_id), "addEbudde": not r.add_ebudde, "TM": 3 + i % 4}
+        for i, r in enumerate(rows)
+    ]
+
+
+def run_profile(profile: str, year: int, repeats: int, seed_value: int):
+    knobs = seed.PROFILES[profile]
+    started = time.perf_counter()
+    counts = seed.seed_season(seed.engine_for_bench(), year, seed_value, reset=True, **knobs)
+    print(f"\n== {profile}: {knobs['scouts']:,} scouts, {counts['orders']:,} orders, "
+          f"{counts['order_items']:,} items (seeded in {time.perf_counter() - started:.1f}s)")
+
+    print_page = importlib.import_module("pages.admin_print_new_orders")
+    inventory_page = importlib.import_module("pages.admin_add_inventory")
+    scouts = [dict(r) for r in fetch_all("SELECT scout_id, parent_id FROM cookies_app.scouts")]
+    print_rows = ou.get_admin_print_orders(statuses=["NEW", "IMPORTED"])
+    df_orders, df_items = print_page.split_print_rows(print_rows)
+    doc_df = doc_import_frame(year, DOC_IMPORT_ORDERS[profile], scouts)
+    updates = bulk_updates(year, BULK_UPDATE_ORDERS[profile])
+    cookie_cols = [c[0] for c in seed.COOKIES]
+
+    cases = [
+        ("get_all_orders_wide", lambda: ou.get_all_orders_wide(year), repeats),
+        ("get_admin_orders_flat", lambda: ou.get_admin_orders_flat(year), repeats),
+        ("get_admin_print_orders", lambda: ou.get_admin_print_orders(statuses=["NEW", "IMPORTED"]), repeats),
+        ("build_pdf", lambda: print_page.build_pdf(df_orders, df_items), repeats),
+        # lru_cache'd on the page: time the query, not the cache
+        ("inventory pickups", lambda: inventory_page.get_inventory_pickups_data.__wrapped__(year), repeats),
+        ("inventory total summary", lambda: inventory_page.get_total_inventory_summary_data.__wrapped__(year), repeats),
+        ("inventory by cookie", lambda: inventory_page.get_cookie_inventory_summary_data.__wrapped__(year), repeats),
+        # Writes: once each, on data the suite cleans up
+        (f"admin_update_orders_bulk x{len(updates)}", lambda: ou.admin_update_orders_bulk(updates, cookie_cols), 1),
+        (f"DOC import bulk inserts x{len(doc_df)}", lambda: doc_import(doc_df), 1),
+    ]
+
+    print(f"{'function':<36} {'median ms':>10} {'min ms':>10} {'rows':>9}")
+    for name, fn, n in cases:
+        median_ms, min_ms, result = timed(fn, n)
+        print(f"{name:<36} {median_ms:>10.1f} {min_ms:>10.1f} {_size(result):>9,}")
+    drop_doc_import()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=["troop", "council", "all"], default="all")
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="allow a non-local database")
+    args = parser.parse_args()
+
+    seed.check_target(seed.DSN, args.force)
+    register_engine(seed.engine_for_bench())
+
+    profiles = ["troop", "council"] if args.profile == "all" else [args.profile]
+    for profile in profiles:
+        run_profile(profile, args.year, args.repeats, args.seed)
+
+
+if __name__ == "__main__":
+    main()
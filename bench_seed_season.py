@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Synthetic season generator for benchmarks
+
+Creates the cookies_app schema on a scratch Postgres and fills one program
+year with reproducible fake data (same --seed, same rows):
+    BENCH_DSN=postgresql+psycopg2://postgres@localhost/postgres \
+    python bench_seed_season.py --profile troop --reset
+
+Profiles are starting points; every knob can be overridden on the command
+line (--scouts 800 --paper-per-scout 12 ...).  Refuses to touch a
+non-local database unless --force is given.
+"""
+import argparse
+import os
+import random
+import uuid
+from datetime import datetime, date, time, timedelta
+from urllib.parse import urlparse
+
+from sqlalchemy import create_engine, text
+
+from utils.db_utils import _copy_insert
+from utils.migrations import MIGRATIONS
+
+DSN = os.environ.get("BENCH_DSN", "postgresql+psycopg2://postgres@localhost/postgres")
+
+# Per-season knobs.  Orders per scout are averages (Poisson-ish spread).
+PROFILES = {
+    "troop": {
+        "parents": 40,
+        "scouts": 50,
+        "paper_per_scout": 6,
+        "digital_per_scout": 4,
+        "booths": 40,
+        "scouts_per_booth": 3,
+        "max_items_per_order": 6,
+        "paid_share": 0.8,
+        "pickups": 4,
+    },
+    "council": {
+        "parents": 4_000,
+        "scouts": 5_000,
+        "paper_per_scout": 6,
+        "digital_per_scout": 4,
+        "booths": 3_000,
+        "scouts_per_booth": 3,
+        "max_items_per_order": 6,
+        "paid_share": 0.8,
+        "pickups": 40,
+    },
+}
+
+# code, display name, price, default booth qty, average share of sales
+COOKIES = [
+    ("ADV", "Adventurefuls", 6, 24, 0.08),
+    ("LEM", "Lemon-Ups", 6, 12, 0.05),
+    ("TRE", "Trefoils", 6, 12, 0.06),
+    ("DSD", "Do-si-dos", 6, 24, 0.07),
+    ("SAM", "Samoas", 6, 60, 0.20),
+    ("TAG", "Tagalongs", 6, 48, 0.15),
+    ("TM", "Thin Mints", 6, 72, 0.25),
+    ("EXP", "Exploremores", 6, 12, 0.04),
+    ("TOF", "Toffee-tastic", 7, 12, 0.03),
+    ("DON", "Cookie Share", 6, 0, 0.07),
+]
+
+SCHEMA_DDL = """
+CREATE SCHEMA IF NOT EXISTS cookies_app;
+
+CREATE TABLE cookies_app.parents (
+    parent_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    parent_firstname text,
+    parent_lastname text,
+    parent_email text,
+    parent_phone text,
+    username text UNIQUE,
+    parent_password text,
+    is_admin boolean DEFAULT false,
+    reset_code_hash text,
+    reset_code_expires timestamp
+);
+
+CREATE TABLE cookies_app.scouts (
+    scout_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    parent_id uuid REFERENCES cookies_app.parents,
+    first_name text NOT NULL,
+    last_name text NOT NULL,
+    gsusa_id text,
+    grade text,
+    tshirt_size text,
+    active boolean DEFAULT true,
+    goals integer DEFAULT 0,
+    award_preferences text
+);
+
+CREATE TABLE cookies_app.cookie_years (
+    program_year integer NOT NULL,
+    cookie_code text NOT NULL,
+    display_name text NOT NULL,
+    price_per_box numeric(8, 2) NOT NULL,
+    display_order integer NOT NULL,
+    default_booth_qty integer,
+    cookie_avg_pct numeric(5, 4),
+    active boolean DEFAULT true,
+    PRIMARY KEY (program_year, cookie_code)
+);
+
+CREATE TABLE cookies_app.booths (
+    booth_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    program_year integer,
+    location text,
+    booth_date date,
+    start_time time,
+    end_time time,
+    quantity_multiplier numeric(4, 2),
+    weekend_number integer,
+    status text,
+    created_at timestamp DEFAULT now()
+);
+
+CREATE TABLE cookies_app.booth_scouts (
+    booth_id uuid REFERENCES cookies_app.booths ON DELETE CASCADE,
+    scout_id uuid REFERENCES cookies_app.scouts,
+    PRIMARY KEY (booth_id, scout_id)
+);
+
+CREATE TABLE cookies_app.booth_inventory_plan (
+    booth_id uuid REFERENCES cookies_app.booths ON DELETE CASCADE,
+    program_year integer,
+    cookie_code text,
+    planned_quantity integer
+);
+
+CREATE TABLE cookies_app.booth_inventory_actual (
+    booth_id uuid REFERENCES cookies_app.booths ON DELETE CASCADE,
+    program_year integer,
+    cookie_code text,
+    end_quantity integer
+);
+
+CREATE TABLE cookies_app.orders (
+    order_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    parent_id uuid,
+    scout_id uuid,
+    booth_id uuid,
+    program_year integer NOT NULL,
+    order_ref text,
+    order_type text,
+    status text,
+    verification_status text,
+    verification_notes text,
+    order_qty_boxes integer,
+    order_amount numeric(10, 2),
+    starting_cash numeric(10, 2),
+    ending_cash numeric(10, 2),
+    square_total numeric(10, 2),
+    comments text,
+    external_order_id text,
+    order_source text,
+    initial_order boolean,
+    add_ebudde boolean DEFAULT false,
+    verified_digital boolean DEFAULT false,
+    order_pickedup boolean DEFAULT false,
+    submit_dt timestamp,
+    created_at timestamp DEFAULT now()
+);
+
+CREATE TABLE cookies_app.order_items (
+    order_item_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    order_id uuid REFERENCES cookies_app.orders ON DELETE CASCADE,
+    parent_id uuid,
+    scout_id uuid,
+    program_year integer,
+    cookie_code text,
+    quantity integer
+);
+
+CREATE TABLE cookies_app.money_ledger (
+    money_event_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    parent_id uuid,
+    scout_id uuid,
+    program_year integer,
+    amount numeric(10, 2),
+    payment_method text,
+    notes text,
+    related_order_id uuid,
+    received_dt timestamp,
+    created_at timestamp DEFAULT now()
+);
+
+CREATE TABLE cookies_app.inventory_ledger (
+    inventory_event_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    parent_id uuid,
+    scout_id uuid,
+    program_year integer,
+    cookie_code text,
+    quantity integer,
+    event_type text,
+    status text,
+    related_order_id uuid,
+    event_dt timestamp,
+    notes text
+);
+
+CREATE INDEX ON cookies_app.orders (program_year);
+CREATE INDEX ON cookies_app.orders (scout_id);
+CREATE INDEX ON cookies_app.orders (booth_id);
+CREATE INDEX ON cookies_app.order_items (order_id);
+CREATE INDEX ON cookies_app.money_ledger (related_order_id);
+CREATE INDEX ON cookies_app.inventory_ledger (program_year, event_type);
+CREATE INDEX ON cookies_app.inventory_ledger (related_order_id);
+"""
+
+FIRST_NAMES = [
+    "Ava", "Emma", "Olivia", "Mia", "Sophia", "Isabella", "Amelia", "Harper",
+    "Evelyn", "Abigail", "Ella", "Lily", "Chloe", "Grace", "Zoe", "Nora",
+    "Riley", "Aria", "Layla", "Hazel", "Aurora", "Maya", "Ruby", "Ivy",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Garcia", "Nguyen", "Brown", "Lee", "Martinez", "Patel",
+    "Davis", "Lopez", "Wilson", "Anderson", "Thomas", "Kim", "Moore", "Clark",
+    "Lewis", "Walker", "Young", "Hall", "Allen", "King", "Wright", "Scott",
+]
+LOCATIONS = ["Safeway", "Fred Meyer", "Costco", "Library", "Farmers Market", "Hardware Store"]
+
+
+_ENGINE = None
+
+
+def engine_for_bench():
+    """One engine on BENCH_DSN, shared by the generator and the suites."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_engine(DSN)
+    return _ENGINE
+
+
+def check_target(dsn: str, force: bool):
+    host = urlparse(dsn.replace("+psycopg2", "")).hostname or "localhost"
+    if host not in ("localhost", "127.0.0.1", "::1") and not force:
+        raise SystemExit(f"Refusing to seed non-local database host '{host}' (use --force)")
+
+
+def create_schema(engine, reset: bool = False):
+    with engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM information_schema.schemata WHERE schema_name = 'cookies_app'"
+        )).first()
+        if exists:
+            if not reset:
+                raise SystemExit("cookies_app already exists; pass --reset to drop and recreate it")
+            conn.execute(text("DROP SCHEMA cookies_app CASCADE"))
+        conn.exec_driver_sql(SCHEMA_DDL)
+        # Same indexes / constraints production gets from utils.migrations
+        for _, sql in MIGRATIONS:
+            conn.exec_driver_sql(sql)
+
+
+def _load(conn, table: str, rows: list[dict]):
+    """COPY rows into cookies_app.<table> (same path as execute_many_sql)."""
+    if not rows:
+        return
+    cols = list(rows[0])
+    sql = (
+        f"INSERT INTO cookies_app.{table} ({', '.join(cols)}) "
+        f"VALUES ({', '.join(':' + c for c in cols)})"
+    )
+    if not _copy_insert(conn, sql, rows):
+        conn.execute(text(sql), rows)
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Cheap spread around the mean without numpy
+    return max(0, int(rng.gauss(mean, mean ** 0.5) + 0.5))
+
+
+def build_season(year: int, seed: int = 42, **knobs) -> dict[str, list[dict]]:
+    """
+    Rows for every table, keyed by table name.  Deterministic for a seed.
+    """
+    k = {**PROFILES["troop"], **knobs}
+    rng = random.Random(seed)
+
+    def uid() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def name() -> tuple[str, str]:
+        return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    season_start = datetime(year, 1, 5, 9)
+    price = {c[0]: c[2] for c in COOKIES}
+    weights = [c[4] for c in COOKIES]
+    codes = [c[0] for c in COOKIES]
+
+    tables: dict[str, list[dict]] = {t: [] for t in (
+        "cookie_years", "parents", "scouts", "booths", "booth_scouts",
+        "booth_inventory_plan", "orders", "order_items", "money_ledger",
+        "inventory_ledger",
+    )}
+
+    for i, (code, display, ppb, booth_qty, pct) in enumerate(COOKIES, start=1):
+        tables["cookie_years"].append({
+            "program_year": year, "cookie_code": code, "display_name": display,
+            "price_per_box": ppb, "display_order": i, "default_booth_qty": booth_qty,
+            "cookie_avg_pct": pct, "active": True,
+        })
+
+    for i in range(k["parents"]):
+        first, last = name()
+        tables["parents"].append({
+            "parent_id": uid(), "parent_firstname": first, "parent_lastname": last,
+            "parent_email": f"parent{i}@example.org", "parent_phone": f"555{i:07d}",
+            "username": f"parent{i}", "is_admin": i == 0,
+        })
+
+    for i in range(k["scouts"]):
+        first, last = name()
+        parent = tables["parents"][i % len(tables["parents"])]
+        tables["scouts"].append({
+            "scout_id": uid(), "parent_id": parent["parent_id"],
+            "first_name": first, "last_name": f"{last}{i}", "gsusa_id": str(10_000_000 + i),
+            "grade": str(rng.randint(0, 12)), "active": True, "goals": rng.choice([0, 100, 200, 300]),
+        })
+
+    def add_items(order: dict, n_items: int) -> tuple[int, int]:
+        qty_total = amt_total = 0
+        for code in dict.fromkeys(rng.choices(codes, weights, k=n_items)):
+            qty = rng.randint(1, 6)
+            qty_total += qty
+            amt_total += qty * price[code]
+            tables["order_items"].append({
+                "order_item_id": uid(), "order_id": order["order_id"],
+                "parent_id": order["parent_id"], "scout_id": order["scout_id"],
+                "program_year": year, "cookie_code": code, "quantity": qty,
+            })
+            tables["inventory_ledger"].append({
+                "inventory_event_id": uid(), "parent_id": order["parent_id"],
+                "scout_id": order["scout_id"], "program_year": year, "cookie_code": code,
+                "quantity": -qty, "event_type": "ORDER_SUBMITTED", "status": "PENDING",
+                "related_order_id": order["order_id"], "event_dt": order["submit_dt"], "notes": None,
+            })
+        return qty_total, amt_total
+
+    # ---- Girl orders (paper + digital) ----
+    ext_id = 100_000
+    for scout in tables["scouts"]:
+        for order_type, mean in (("Paper", k["paper_per_scout"]), ("Digital", k["digital_per_scout"])):
+            for _ in range(_poisson(rng, mean)):
+                submit_dt = season_start + timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+                digital = order_type == "Digital"
+                status = rng.choices(
+                    ["NEW", "PRINTED", "PICKED_UP", "CANCELLED"], [0.3, 0.2, 0.45, 0.05]
+                )[0]
+                if digital and status == "NEW":
+                    status = "IMPORTED"
+                order = {
+                    "order_id": uid(), "parent_id": scout["parent_id"], "scout_id": scout["scout_id"],
+                    "booth_id": None, "program_year": year, "order_ref": None,
+                    "order_type": order_type, "status": status, "verification_status": None,
+                    "comments": rng.choice([None, None, "porch pickup", "deliver Friday"]),
+                    "external_order_id": str(ext_id) if digital else None,
+                    "order_source": "Digital Cookie Import" if digital else None,
+                    "initial_order": submit_dt < datetime(year, 2, 1),
+                    "add_ebudde": rng.random() < 0.5, "verified_digital": digital and rng.random() < 0.7,
+                    "order_pickedup": status == "PICKED_UP", "submit_dt": submit_dt,
+                }
+                ext_id += digital
+                qty, amt = add_items(order, rng.randint(1, k["max_items_per_order"]))
+                order["order_qty_boxes"], order["order_amount"] = qty, amt
+                tables["orders"].append(order)
+
+                paid = amt if digital or rng.random() < k["paid_share"] else rng.choice([0, amt // 2])
+                if paid:
+                    tables["money_ledger"].append({
+                        "money_event_id": uid(), "parent_id": order["parent_id"],
+                        "scout_id": order["scout_id"], "program_year": year, "amount": paid,
+                        "payment_method": "DIGITAL_COOKIE" if digital else rng.choice(["CASH", "CHECK", "SQUARE"]),
+                        "notes": None, "related_order_id": order["order_id"],
+                        "received_dt": submit_dt + timedelta(days=rng.randint(0, 20)),
+                    })
+
+    # ---- Booths, booth scouts, plans and booth orders ----
+    for i in range(k["booths"]):
+        booth_date = date(year, 2, 6) + timedelta(days=rng.randint(0, 40))
+        start = rng.choice([10, 12, 14, 16])
+        weekend = rng.randint(1, 3)
+        booth = {
+            "booth_id": uid(), "program_year": year, "location": f"{rng.choice(LOCATIONS)} #{i}",
+            "booth_date": booth_date, "start_time": time(start), "end_time": time(start + 2),
+            "quantity_multiplier": {1: 1.0, 2: 0.75, 3: 0.5}[weekend], "weekend_number": weekend,
+            "status": None,
+        }
+        tables["booths"].append(booth)
+
+        crew = rng.sample(tables["scouts"], min(k["scouts_per_booth"], len(tables["scouts"])))
+        for scout in crew:
+            tables["booth_scouts"].append({"booth_id": booth["booth_id"], "scout_id": scout["scout_id"]})
+
+        verified = booth_date < date(year, 3, 1)
+        order = {
+            "order_id": uid(), "parent_id": crew[0]["parent_id"], "scout_id": crew[0]["scout_id"],
+            "booth_id": booth["booth_id"], "program_year": year, "order_ref": None,
+            "order_type": "Booth", "status": "COMPLETED" if verified else "NEW",
+            "verification_status": "VERIFIED" if verified else "DRAFT",
+            "comments": None, "external_order_id": None, "order_source": None,
+            "initial_order": False, "add_ebudde": False, "verified_digital": False,
+            "order_pickedup": False,
+            "submit_dt": datetime.combine(booth_date, time(start)),
+        }
+        qty_total = amt_total = 0
+        for code, _, ppb, booth_qty, _ in COOKIES:
+            planned = int(booth_qty * booth["quantity_multiplier"])
+            if not planned:
+                continue
+            tables["booth_inventory_plan"].append({
+                "booth_id": booth["booth_id"], "program_year": year,
+                "cookie_code": code, "planned_quantity": planned,
+            })
+            sold = rng.randint(0, planned)
+            qty_total += sold
+            amt_total += sold * ppb
+            tables["order_items"].append({
+                "order_item_id": uid(), "order_id": order["order_id"],
+                "parent_id": order["parent_id"], "scout_id": order["scout_id"],
+                "program_year": year, "cookie_code": code, "quantity": sold if verified else planned,
+            })
+            if verified and sold:
+                tables["inventory_ledger"].append({
+                    "inventory_event_id": uid(), "parent_id": None, "scout_id": None,
+                    "program_year": year, "cookie_code": code, "quantity": -sold,
+                    "event_type": "BOOTH_SALE", "status": "COMPLETED",
+                    "related_order_id": order["order_id"], "event_dt": order["submit_dt"],
+                    "notes": None,
+                })
+        order["order_qty_boxes"], order["order_amount"] = qty_total, amt_total
+        tables["orders"].append(order)
+
+    # ---- Troop inventory pickups from the cupboard ----
+    for n in range(k["pickups"]):
+        picked_dt = season_start + timedelta(days=7 * n)
+        for code, _, _, booth_qty, pct in COOKIES:
+            qty = max(12, int(pct * k["scouts"] * 60 / max(k["pickups"], 1)))
+            tables["inventory_ledger"].append({
+                "inventory_event_id": uid(), "parent_id": None, "scout_id": None,
+                "program_year": year, "cookie_code": code, "quantity": qty,
+                "event_type": "PICKUP", "status": "COMPLETED", "related_order_id": None,
+                "event_dt": picked_dt, "notes": f"Order Ref: {1000 + n}",
+            })
+
+    return tables
+
+
+# Parents before scouts before orders (foreign keys)
+LOAD_ORDER = [
+    "cookie_years", "parents", "scouts", "booths", "booth_scouts",
+    "booth_inventory_plan", "orders", "order_items", "money_ledger", "inventory_ledger",
+]
+
+
+def seed_season(engine, year: int, seed: int = 42, reset: bool = False, **knobs) -> dict[str, int]:
+    """
+    Create the schema and load one synthetic season.  Returns row counts.
+    """
+    create_schema(engine, reset=reset)
+    tables = build_season(year, seed, **knobs)
+    with engine.begin() as conn:
+        for table in LOAD_ORDER:
+            _load(conn, table, tables[table])
+        conn.execute(text("ANALYZE"))
+    return {t: len(tables[t]) for t in LOAD_ORDER}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="troop")
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop an existing cookies_app schema")
+    parser.add_argument("--force", action="store_true", help="allow a non-local database")
+    for knob, default in PROFILES["troop"].items():
+        parser.add_argument(f"--{knob.replace('_', '-')}", type=type(default), default=None)
+    args = parser.parse_args()
+
+    check_target(DSN, args.force)
+    knobs = dict(PROFILES[args.profile])
+    knobs.update({k: getattr(args, k) for k in knobs if getattr(args, k) is not None})
+
+    counts = seed_season(engine_for_bench(), args.year, args.seed, reset=args.reset, **knobs)
+    print(f"✓ Seeded {args.profile} season {args.year} (seed {args.seed})")
+    for table, n in counts.items():
+        print(f"  {table:<22} {n:>9,}")
+
+
+if __name__ == "__main__":
+    main()
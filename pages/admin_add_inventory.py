@@ -4,7 +4,10 @@ import pandas as pd
 from streamlit_extras.row import row as strow
 from datetime import datetime
 from utils.app_utils import setup 
-from utils.db_utils import require_admin, fetch_all, execute_many_sql
+from utils.db_utils import (
+    require_admin, fetch_all, execute_many_sql, QueryTimeout, HEAVY_QUERY_TIMEOUT_MS,
+)
+from utils.order_utils import get_cookie_catalog
 import uuid
 from functools import lru_cache
 
@@ -13,14 +16,8 @@ def init_ss():
         ss.current_year = datetime.now().year
 
 def get_cookie_data(program_year):
-    """Fetch cookie configuration from database"""
-    cookies = fetch_all("""
-        SELECT cookie_code, display_name, display_order
-        FROM cookies_app.cookie_years
-        WHERE program_year = :year
-        ORDER BY display_order
-    """, {"year": program_year})
-    return cookies
+    """Cookie configuration (active or not) from the cookie catalog"""
+    return get_cookie_catalog(program_year).all
 
 
 def _rows_to_dicts(rows):
@@ -180,7 +177,7 @@ def get_cookie_inventory_summary_data(program_year: int):
         LEFT JOIN planned_booths pb ON cy.cookie_code = pb.cookie_code
         WHERE cy.program_year = :year
         ORDER BY cy.display_order
-    """, {"year": int(program_year)})
+    """, {"year": int(program_year)}, timeout_ms=HEAVY_QUERY_TIMEOUT_MS)
     return _rows_to_dicts(rows)
 
 
@@ -316,7 +313,11 @@ def render_inventory_by_cookie_type(current_year):
         "Completed Booths, Total Current Inventory, -Planned Inventory, and Future Inventory."
     )
 
-    cookie_inventory_summary = get_cookie_inventory_summary_data(current_year)
+    try:
+        cookie_inventory_summary = get_cookie_inventory_summary_data(current_year)
+    except QueryTimeout as e:
+        st.warning(f"{e}. Try again in a moment.")
+        return
 
     if cookie_inventory_summary:
         inv_df = pd.DataFrame(cookie_inventory_summary)
@@ -7,8 +7,8 @@ from uuid import uuid4
 import time as time_module
 import math
 from utils.app_utils import setup
-from utils.db_utils import require_admin, execute_sql, execute_many_sql, fetch_all
-from utils.order_utils import delete_booth_cascade, set_add_ebudde
+from utils.db_utils import require_admin, execute_sql, execute_many_sql, fetch_all, request_scope, CACHE_TTL_CATALOG
+from utils.order_utils import delete_booth_cascade, set_add_ebudde, get_cookie_catalog, get_cookie_codes_for_year
 
 # --------------------------------------------------
 # Session init
@@ -35,22 +35,13 @@ def init_ss():
 # --------------------------------------------------
 
 def get_cookie_data(program_year):
-    """Fetch cookie data from cookie_years table"""
-    rows = fetch_all("""
-        SELECT cookie_code, default_booth_qty, cookie_avg_pct
-        FROM cookies_app.cookie_years
-        WHERE program_year = :year AND active = TRUE
-        ORDER BY display_order
-    """, {"year": program_year})
-    
+    """Default booth quantities and average-sale percentages from the cookie catalog"""
     default_qty = {}
     avg_pct = {}
     
-    for row in rows:
-        code = row.cookie_code
-        default_qty[code] = row.default_booth_qty or 0
-        pct_value = float(row.cookie_avg_pct or 0)
-        avg_pct[code] = f"{int(pct_value * 100)}%"
+    for c in get_cookie_catalog(program_year).active:
+        default_qty[c.cookie_code] = c.default_booth_qty
+        avg_pct[c.cookie_code] = f"{int(float(c.cookie_avg_pct) * 100)}%"
     
     return default_qty, avg_pct
 
@@ -75,7 +66,7 @@ def get_booths():
         SELECT *
         FROM cookies_app.booths
         ORDER BY booth_date DESC, start_time
-    """)
+    """, ttl=CACHE_TTL_CATALOG)
 
 
 def get_draft_booth_orders():
@@ -819,15 +810,7 @@ def main():
         else:
             st.caption("Showing starting quantities for planned booths.")
 
-        cookie_rows = fetch_all("""
-            SELECT cookie_code
-            FROM cookies_app.cookie_years
-            WHERE program_year = :year
-              AND active = TRUE
-              AND cookie_code <> 'DON'
-            ORDER BY display_order
-        """, {"year": int(ss.current_year)})
-        cookie_codes = [r.cookie_code for r in cookie_rows]
+        cookie_codes = [c for c in get_cookie_codes_for_year(ss.current_year) if c != 'DON']
 
         if not cookie_codes:
             st.info("No active cookie types configured for this year.")
@@ -1063,36 +1046,7 @@ def main():
                                 WHERE order_id = :oid
                             """, item_inserts)
 
-                    if changed_booths:
-                        order_updates = []
-                        for booth_key in changed_booths:
-                            meta = booth_meta_by_id[booth_key]
-                            order_id = meta["order_id"]
-                            is_verified = bool(meta["is_verified"])
-
-                            total_boxes = 0
-                            for code in cookie_codes:
-                                qty_val = pd.to_numeric(edited_df.at[booth_key, code], errors='coerce')
-                                display_qty = int(qty_val) if pd.notna(qty_val) else 0
-                                display_qty = max(display_qty, 0)
-                                if is_verified:
-                                    sold_qty = int(sold_lookup.get((order_id, code), 0))
-                                    total_boxes += display_qty + sold_qty
-                                else:
-                                    total_boxes += display_qty
-
-                            order_updates.append({
-                                "boxes": total_boxes,
-                                "amount": total_boxes * 6,
-                                "oid": order_id,
-                            })
-
-                        execute_many_sql("""
-                            UPDATE cookies_app.orders
-                            SET order_qty_boxes = :boxes,
-                                order_amount = :amount
-                            WHERE order_id = :oid
-                        """, order_updates)
+                    # Order totals follow the order_items writes (order_items triggers)
 
                     if changed_cells:
                         st.success(f"✅ Saved {changed_cells} quantity update(s) across {len(changed_booths)} booth(s).")
@@ -1520,15 +1474,11 @@ def main():
 
                             execute_sql("""
                                 UPDATE cookies_app.orders
-                                SET order_qty_boxes = :boxes,
-                                    order_amount = :amount,
-                                    starting_cash = :starting_cash,
+                                SET starting_cash = :starting_cash,
                                     ending_cash = :ending_cash,
                                     square_total = :square_total
                                 WHERE order_id = :oid
                             """, {
-                                "boxes": total_start_boxes,
-                                "amount": total_start_boxes * 6,
                                 "starting_cash": float(starting_cash),
                                 "ending_cash": float(ending_cash),
                                 "square_total": float(square_total),
@@ -1833,15 +1783,7 @@ def main():
                                             SELECT gen_random_uuid(), :oid, parent_id, scout_id, program_year, :code, :qty
                                             FROM cookies_app.orders WHERE order_id = :oid
                                         """, {"oid": order_id, "code": cookie_code, "qty": new_qty})
-                                
-                                # Update total boxes and amount on order
-                                total_amount = total_boxes * 6
-                                execute_sql("""
-                                    UPDATE cookies_app.orders
-                                    SET order_qty_boxes = :boxes,
-                                        order_amount = :amount
-                                    WHERE order_id = :oid
-                                """, {"boxes": total_boxes, "amount": total_amount, "oid": order_id})
+
                             
                             st.success(f"✅ Inventory updated for {booth.location}")
                             st.rerun()
@@ -1942,14 +1884,7 @@ def main():
         if not booth_rows:
             st.info("No booth orders found.")
         else:
-            cookie_codes = [r.cookie_code for r in fetch_all("""
-                SELECT cookie_code
-                FROM cookies_app.cookie_years
-                WHERE program_year = :year
-                  AND active = TRUE
-                  AND cookie_code <> 'DON'
-                ORDER BY display_order
-            """, {"year": int(ss.current_year)})]
+            cookie_codes = [c for c in get_cookie_codes_for_year(ss.current_year) if c != 'DON']
 
             sold_rows = fetch_all("""
                 SELECT
@@ -2038,5 +1973,6 @@ if __name__ == "__main__":
         page_title="Booth Admin",
         initial_sidebar_state="expanded"
     )
-    main()
+    with request_scope("admin_booths"):
+        main()
 
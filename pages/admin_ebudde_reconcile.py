@@ -0,0 +1,103 @@
+import streamlit as st
+from streamlit import session_state as ss
+
+from utils.app_utils import setup
+from utils.db_utils import require_admin
+from utils.doc_import_utils import parse_ebudde_report, match_scouts
+from utils.order_utils import (
+    reconcile_ebudde_orders,
+    get_all_scouts,
+    fetch_scout_aliases,
+    RECON_MISSING_LOCAL, RECON_MISSING_EBUDDE, RECON_SCOUT, RECON_QTY, RECON_AMOUNT, RECON_STATUS,
+)
+
+RECON_LABELS = {
+    RECON_MISSING_LOCAL: "Missing Locally",
+    RECON_MISSING_EBUDDE: "Missing in eBudde",
+    RECON_SCOUT: "Scout Mismatch",
+    RECON_QTY: "Quantity Mismatch",
+    RECON_AMOUNT: "Amount Mismatch",
+    RECON_STATUS: "Status Mismatch",
+}
+
+RECON_COLUMNS = {
+    RECON_MISSING_LOCAL: ["external_order_id", "scout_name", "ebudde_qty", "ebudde_amount"],
+    RECON_MISSING_EBUDDE: ["external_order_id", "scout_name", "local_qty", "local_amount"],
+    RECON_SCOUT: ["external_order_id", "scout_name", "ebudde_scout_name"],
+    RECON_QTY: ["external_order_id", "scout_name", "cookie_code", "local_qty", "ebudde_qty"],
+    RECON_AMOUNT: ["external_order_id", "scout_name", "local_amount", "ebudde_amount"],
+    RECON_STATUS: ["external_order_id", "scout_name", "ebudde_status", "local_qty", "ebudde_qty"],
+}
+
+
+# ======================================================
+# Main
+# ======================================================
+
+def main():
+    require_admin()
+    year = int(ss.current_year)
+
+    uploaded_file = st.file_uploader(
+        "Upload eBudde \"All DOC Orders\" report",
+        type=["xlsx", "csv"],
+    )
+
+    if not uploaded_file:
+        st.info("Upload the eBudde All DOC Orders report to compare it with the imported orders.")
+        return
+
+    report = parse_ebudde_report(uploaded_file.getvalue())
+    if "external_order_id" not in report.columns:
+        st.error("No order number column found in the report.")
+        return
+
+    # Same scout matching as the DOC import (GSUSA id, name, saved aliases)
+    scouts = get_all_scouts()
+    matches = match_scouts(report, scouts, fetch_scout_aliases())
+    if not matches.review.empty:
+        st.warning(
+            f"{len(matches.review)} girl name(s) in the report don't match a scout; "
+            "their orders are compared without checking the scout."
+        )
+
+    result = reconcile_ebudde_orders(matches.orders, year)
+    counts = result.counts()
+
+    st.metric("eBudde Orders", report["external_order_id"].nunique())
+    if result.out_of_scope:
+        st.caption(
+            f"{result.out_of_scope} order(s) in the report aren't in-person deliveries the DOC "
+            "import brings in (shipped, donation-only, canceled...) and were never imported."
+        )
+    if result.in_sync:
+        st.success("Every order matches eBudde.")
+        return
+
+    cols = st.columns(len(RECON_LABELS))
+    for col, (kind, label) in zip(cols, RECON_LABELS.items()):
+        col.metric(label, counts[kind])
+
+    found = result.discrepancies
+
+    for kind, label in RECON_LABELS.items():
+        if not counts[kind]:
+            continue
+        with st.expander(f"{label} ({counts[kind]})", expanded=kind == RECON_MISSING_LOCAL):
+            st.dataframe(
+                found.loc[found["discrepancy"] == kind, RECON_COLUMNS[kind]],
+                width='stretch',
+                hide_index=True,
+            )
+
+
+# ======================================================
+# Entry Point
+# ======================================================
+
+if __name__ == "__main__":
+    setup.config_site(
+        page_title="eBudde Reconciliation",
+        initial_sidebar_state="expanded",
+    )
+    main()
@@ -5,6 +5,7 @@ from datetime import datetime
 from decimal import Decimal
 from utils.app_utils import setup 
 from utils.db_utils import require_admin, fetch_all, execute_sql
+from utils.order_utils import payment_columns
 
 def decimal_sum(series):
     return sum(Decimal(str(x)) for x in series.fillna(0))
@@ -116,16 +117,16 @@ def main():
     order_money_df = pd.merge(left=all_orders_dat, right=all_money_agg, how='left', on=['scoutId', 'orderType', 'ebudde'])
     order_money_df.fillna(0, inplace=True)
     
-    # For Digital orders, set AmtReceived = TotalAmt (paid in full)
-    order_money_df.loc[order_money_df['orderType'] == 'Digital', 'AmtReceived'] = order_money_df.loc[order_money_df['orderType'] == 'Digital', 'TotalAmt']
-    
-    # Convert numeric columns (except ebudde which is boolean)
-    numeric_cols = ['ADV', 'LEM', 'TRE', 'DSD', 'SAM', 'TAG', 'TM', 'EXP', 'TOF', 'DON', 'QTY', 'TotalAmt', 'AmtReceived']
-    for col in numeric_cols:
-        order_money_df[col] = order_money_df[col].apply(lambda x: int(x) if isinstance(x, (int, float)) else x)
-    
-    # Calculate balance
-    order_money_df['balance'] = [total - rec for total, rec in zip(order_money_df['TotalAmt'], order_money_df['AmtReceived'])]
+    # Money via integer cents (shared with get_all_orders_wide / orders_overview);
+    # Digital orders count as paid in full (AmtReceived = TotalAmt)
+    money = payment_columns(order_money_df, amount_col='TotalAmt', paid_col='AmtReceived')
+    order_money_df['TotalAmt'] = money['sales_cents'] / 100
+    order_money_df['AmtReceived'] = money['paid_cents'] / 100
+    order_money_df['balance'] = money['balance_cents'] / 100
+
+    # Box counts as ints (ebudde stays boolean)
+    count_cols = ['ADV', 'LEM', 'TRE', 'DSD', 'SAM', 'TAG', 'TM', 'EXP', 'TOF', 'DON', 'QTY']
+    order_money_df[count_cols] = order_money_df[count_cols].astype(int)
     order_money_df = order_money_df.sort_values(by='scoutName')
     order_money_df.reset_index(drop=True, inplace=True)
 
@@ -1,19 +1,17 @@
 import streamlit as st
 from streamlit import session_state as ss
 from datetime import datetime
-from decimal import Decimal
 
 import pandas as pd
 from sqlalchemy import create_engine, text
 
 from utils.app_utils import setup, apputils
-from utils.order_utils import get_order_items, get_orders_for_scout, get_orders_for_scout_summary, get_all_scouts
+from utils.order_utils import (
+    get_order_items, get_orders_for_scout, get_orders_for_scout_summary, get_all_scouts,
+    get_scout_season_totals, get_cookies_for_year,
+)
 from utils.db_utils import require_admin, to_pacific, fetch_all
 
-def decimal_sum(series):
-    return sum(Decimal(str(x)) for x in series.fillna(0))
-
-
 # --------------------------------------------------
 # UI
 # --------------------------------------------------
@@ -38,39 +36,38 @@ def main():
     # ---- Year ----
     current_year = datetime.now().year
 
-    orders = get_orders_for_scout(scout.scout_id, current_year)
-    if orders.empty:
+    totals = get_scout_season_totals(scout.scout_id, current_year)
+    if not totals:
         st.info("No orders found for this scout and year.")
         st.stop()
 
     # --------------------------------------------------
-    # SUMMARY METRICS
+    # SUMMARY METRICS (scout_season_totals rollup)
     # --------------------------------------------------
-
-    total_due = decimal_sum(orders["order_amount"])
-    
-    paid_digital = decimal_sum(orders.loc[orders["order_type"] == "Digital", "paid_amount"])
-    paid_paper = decimal_sum(orders.loc[orders["order_type"] == "Paper", "paid_amount"])
-
-    total_boxes = int(orders["order_qty_boxes"].fillna(0).sum())
-    digital_boxes = decimal_sum(orders.loc[orders["order_type"] == "Digital", "order_qty_boxes"])
-    paper_boxes = decimal_sum(orders.loc[orders["order_type"] == "Paper", "order_qty_boxes"])
-    
-    total_paid = paid_digital + paid_paper
-    balance = total_due - total_paid
-
-    # ---- Summary display ----
     st.markdown("### Season Summary")
 
     c1, c2, c3 = st.columns(3)
-    c1.metric("Total Boxes", total_boxes)
-    c2.metric("Paper Boxes", paper_boxes)
-    c3.metric("Digital Boxes", digital_boxes)
+    c1.metric("Total Boxes", totals["total_boxes"])
+    c2.metric("Paper Boxes", totals["paper_boxes"])
+    c3.metric("Digital Boxes", totals["digital_boxes"])
 
     c4, c5, c6 = st.columns(3)
-    c4.metric("Total Due", f"${total_due:.2f}")
-    c5.metric("Total Paid", f"${total_paid:.2f}")
-    c6.metric("Balance", f"${balance:.2f}")
+    c4.metric("Total Due", f"${totals['amount_due']:.2f}")
+    c5.metric("Total Paid", f"${totals['amount_paid']:.2f}")
+    c6.metric("Balance", f"${totals['balance']:.2f}")
+
+    cookie_boxes = totals["cookie_boxes"] or {}
+    if cookie_boxes:
+        st.dataframe(
+            pd.DataFrame([{
+                c["display_name"]: cookie_boxes.get(c["cookie_code"], 0)
+                for c in get_cookies_for_year(current_year)
+            }]),
+            hide_index=True,
+            width='stretch',
+        )
+
+    orders = get_orders_for_scout(scout.scout_id, current_year)
 
     st.divider()
 
@@ -90,13 +87,19 @@ def main():
     # --------------------------------------------------
     # EXPANDABLE ORDER DETAILS
     # --------------------------------------------------
-    order_dets = get_orders_for_scout_summary(scout.scout_id)
+    order_dets = get_orders_for_scout_summary(scout.scout_id, current_year)
 
     if order_dets.empty:
         st.info("No orders found for this scout.")
     else:
-        # Ensure datetime
-        order_dets["submit_dt"] = pd.to_datetime(order_dets["submit_dt"])
+        # Pivot cookies into columns once, one row per order
+        cookie_tables = order_dets.pivot_table(
+            index="order_id",
+            columns="cookie_name",
+            values="quantity",
+            aggfunc="sum",
+            fill_value=0
+        )
 
         # Group by order
         for order_id, df_order in orders.groupby("order_id"):
@@ -106,19 +109,8 @@ def main():
             comments = df_order["comments"].iloc[0] if "comments" in df_order else None
             order_qty = df_order["order_qty_boxes"].iloc[0]
 
-            order_dets_by_id = order_dets[order_dets['order_id'] == order_id]
-    
-            # Pivot cookies into columns
-            cookie_table = (
-                order_dets_by_id
-                .pivot_table(
-                    index=None,
-                    columns="cookie_name",
-                    values="quantity",
-                    aggfunc="sum",
-                    fill_value=0
-                )
-            )
+            cookie_table = cookie_tables[cookie_tables.index == order_id]
+            cookie_table = cookie_table.loc[:, (cookie_table != 0).any()]
 
             with st.expander(
                 f"{order_type} — {submit_dt} — {order_status}",
@@ -5,17 +5,22 @@ import uuid
 from datetime import datetime, date
 
 from utils.app_utils import setup
-from utils.db_utils import require_admin
+from utils.db_utils import require_admin, transaction
+from utils.doc_import_utils import parse_doc_export, match_scouts, MATCH_FUZZY
+from utils.job_utils import (
+    submit_doc_import_job, list_import_jobs, retry_import_job, start_job_worker,
+    JOB_DOC_IMPORT, JOB_QUEUED, JOB_RUNNING, JOB_FAILED,
+)
 from utils.order_utils import (
-    fetch_existing_external_orders,
-    bulk_insert_order_headers, bulk_insert_order_items,
-    bulk_insert_planned_inventory, bulk_insert_money_ledger,
+    plan_doc_import,
+    DOC_IMPORT_TYPES, DOC_IMPORT_STATUSES,
+    PLAN_NEW, PLAN_UNCHANGED, PLAN_CHANGED, PLAN_COMPLETED_MISSING,
     build_cookie_rename_map,
     get_all_scouts,
-    update_scout_gsusa_id
+    fetch_scout_aliases, insert_scout_alias,
+    update_scout_gsusa_ids,
 )
 
-DOC_IMPORT_TYPES = ["In-Person Delivery", "In-Person Delivery with Donation"]
 
 # --------------------------------------------------
 # Session init
@@ -28,90 +33,6 @@ def init_ss():
 # Helpers (page-level only)
 # ======================================================
 
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    return df.rename(
-        columns={
-            "Order Number": "external_order_id",
-            "Order Date": "submit_dt",
-
-            "Girl First Name": "scout_first_name",
-            "Girl Last Name": "scout_last_name",
-            "Girl GSUSAID": "scout_gsusa_id",
-
-            "Order Type": "order_type",
-            "Order Status": "order_status",
-            "Customer Name": "customer_name",
-            "Customer Email": "customer_email",
-            "Customer First Name": "customer_first_name",
-            "Customer Last Name": "customer_last_name",
-            "Order Total": "order_total",
-            "Quantity": "order_qty_boxes",
-            "Total": "order_amount",
-            "Original Cookie Subtotal": "order_amount",
-            "Total Packages (Excluding Donation)": "order_qty_boxes",
-        }
-    )
-
-def build_gsusa_mapping(
-    scouts: dict,
-    orders_df: pd.DataFrame
-    ) -> dict[tuple[str, str], str]:
-
-    gsusa_map: dict[tuple[str, str], str] = {}
-
-    # 1️⃣ DB values win first
-    # scouts looks like: "{'scout_id': UUID('131....6dade'), 'first_name': 'Grace', 'last_name': 'Alexander', 'gsusa_id': None}"
-    for scout in scouts:
-        if scout['gsusa_id']:
-            key = (scout["first_name"], scout["last_name"])
-            gsusa_map[key] = scout["gsusa_id"]
-
-    # 2️⃣ Fill gaps from orders DF
-    for _, row in orders_df.iterrows():
-        key = (row["scout_first_name"], row["scout_last_name"])
-        if key not in gsusa_map and pd.notna(row["scout_gsusa_id"]):
-            gsusa_map[key] = row["scout_gsusa_id"]
-
-    return gsusa_map
-
-def build_scout_updates(
-    scouts: list[dict],
-    gsusa_by_name: dict
-    ) -> list[tuple]:
-
-    updates = []
-
-    for scout in scouts:
-        if scout["gsusa_id"] is not None:
-            continue
-
-        key = (scout["first_name"], scout["last_name"])
-        gsu_id = gsusa_by_name.get(key)
-
-        if gsu_id:
-            updates.append(
-                (str(scout["scout_id"]), gsu_id)
-            )
-
-    return updates
-
-
-def attach_scout_id(orders_df: pd.DataFrame):
-    df = orders_df.copy()
-
-    def _scout_lookup(row):
-        return ss.scout_name_lookup.get(
-                (row["scout_first_name"], row["scout_last_name"])
-            )
-    def _parent_lookup(row):
-        return ss.parent_id_lookup.get(row['scout_id'])
-    
-    df["scout_id"] = df.apply(_scout_lookup, axis=1)
-
-    df["parent_id"] = df.apply(_parent_lookup, axis=1)
-
-    return df
-
 def rename_cookie_columns(order_df: pd.DataFrame, program_year: int) -> pd.DataFrame:
     rename_map = build_cookie_rename_map(program_year)
 
@@ -131,26 +52,57 @@ def rename_cookie_columns(order_df: pd.DataFrame, program_year: int) -> pd.DataF
     return order_df.rename(columns=valid_map), rename_map
 
 
-def build_filter_exclusion_reason(row: pd.Series) -> str:
-    reasons = []
-    allowed_types = set(DOC_IMPORT_TYPES)
+def build_filter_exclusion_reason(df: pd.DataFrame) -> pd.Series:
+    bad_type = ~df["order_type"].isin(DOC_IMPORT_TYPES)
+    bad_status = df["order_status"] != "PROCESSING"
 
-    if row.get("order_type") not in allowed_types:
-        reasons.append("Order type not eligible")
-    if row.get("order_status") != "PROCESSING":
-        reasons.append("Order status not PROCESSING")
-
-    return "; ".join(reasons) if reasons else "Filtered out"
+    reason = pd.Series("Filtered out", index=df.index, dtype=object)
+    reason[bad_type] = "Order type not eligible"
+    reason[bad_status] = "Order status not PROCESSING"
+    reason[bad_type & bad_status] = "Order type not eligible; Order status not PROCESSING"
+    return reason
 
     
 
 
+# ======================================================
+# Import jobs
+# ======================================================
+
+@st.fragment(run_every=2)
+def show_import_jobs():
+    """Recent DOC import jobs, re-read every 2 s so progress shows without a rerun."""
+    jobs = list_import_jobs(JOB_DOC_IMPORT, limit=5)
+    if not jobs:
+        return
+
+    st.markdown("### Import Jobs")
+    for job in jobs:
+        total = max(job["total_batches"], 1)
+        label = (
+            f"{job['created_at']:%m/%d %H:%M} · {job['status']} · "
+            f"{job['done_batches']}/{job['total_batches']} batch(es) · "
+            f"{job['created_rows']} order(s) created"
+        )
+        if job["status"] in (JOB_QUEUED, JOB_RUNNING):
+            st.progress(job["done_batches"] / total, text=label)
+        else:
+            st.caption(label)
+        if job["status"] == JOB_FAILED:
+            st.error(job["error"])
+            if st.button("Retry", key=f"retry_job_{job['job_id']}"):
+                retry_import_job(job["job_id"])
+
+
 # ======================================================
 # Main
 # ======================================================
 
 def main():
     require_admin()
+    # Picks up jobs a previous server process left unfinished
+    start_job_worker()
+    show_import_jobs()
     
     uploaded_file = st.file_uploader(
         "Upload Digital Cookie Excel Export",
@@ -166,35 +118,50 @@ def main():
     # ----------------------------------
     # st.write('Raw data')
     
-    raw_dat  = (pd.read_excel(uploaded_file).head())
-    # st.write(raw_dat.columns.tolist())
-    st.dataframe(raw_dat.head())
-    uploaded_df = normalize_columns(pd.read_excel(uploaded_file))
-    uploaded_df["external_order_id"] = uploaded_df["external_order_id"].astype(str)
-
-    existing_ids = fetch_existing_external_orders(
-        order_source="Digital Cookie Import",
-    )
+    # Parsed once per distinct file (content hash); reruns reuse it
+    uploaded_df = parse_doc_export(uploaded_file.getvalue())
+    st.dataframe(uploaded_df.head())
+
+    in_person = uploaded_df["order_type"].isin(DOC_IMPORT_TYPES)
+    year = int(ss.current_year)
+
+    # ----------------------------------
+    # Import plan (dry run against the DB)
+    # ----------------------------------
+    plan_rows = uploaded_df[in_person & uploaded_df["order_status"].isin(DOC_IMPORT_STATUSES)]
+    plan = plan_doc_import(rename_cookie_columns(plan_rows, year)[0], year)
+    plan_counts = plan.counts()
+    existing_ids = plan.ids(PLAN_UNCHANGED, PLAN_CHANGED)
+
+    st.markdown("### Import Plan")
+    p1, p2, p3, p4 = st.columns(4)
+    p1.metric("New", plan_counts[PLAN_NEW])
+    p2.metric("Already Imported", plan_counts[PLAN_UNCHANGED])
+    p3.metric("Changed Upstream", plan_counts[PLAN_CHANGED])
+    p4.metric("Completed Missing", plan_counts[PLAN_COMPLETED_MISSING])
+
+    apply_changes = False
+    if plan_counts[PLAN_CHANGED]:
+        with st.expander(f"Quantity changes on {plan_counts[PLAN_CHANGED]} imported order(s)"):
+            st.dataframe(plan.item_diffs(), width='stretch', hide_index=True)
+        apply_changes = st.checkbox(
+            f"Apply upstream quantity changes to {plan_counts[PLAN_CHANGED]} imported order(s)",
+            key="doc_apply_changes",
+        )
 
-    completed_candidates = uploaded_df[
-        uploaded_df["order_type"].isin(DOC_IMPORT_TYPES)
+    completed_missing_in_db = uploaded_df[
+        in_person
         & (uploaded_df["order_status"] == "COMPLETED")
-    ].copy()
-    completed_missing_in_db = completed_candidates[
-        ~completed_candidates["external_order_id"].isin(existing_ids)
-    ].copy()
+        & uploaded_df["external_order_id"].isin(plan.ids(PLAN_COMPLETED_MISSING))
+    ]
     
-    eligible_mask = (
-        uploaded_df["order_type"].isin(DOC_IMPORT_TYPES)
-        & (uploaded_df["order_status"] == "PROCESSING")
-    )
-    processing_df = uploaded_df[eligible_mask].copy()
-    excluded_by_filter = uploaded_df[~eligible_mask].copy()
+    eligible_mask = in_person & (uploaded_df["order_status"] == "PROCESSING")
+    processing_df = uploaded_df[eligible_mask]
+    excluded_by_filter = uploaded_df[~eligible_mask]
 
     if not excluded_by_filter.empty:
-        excluded_by_filter["exclusion_reason"] = excluded_by_filter.apply(
-            build_filter_exclusion_reason,
-            axis=1,
+        excluded_by_filter = excluded_by_filter.assign(
+            exclusion_reason=build_filter_exclusion_reason(excluded_by_filter)
         )
 
     st.markdown("### Audit: Completed Digital Orders Missing in DB")
@@ -255,12 +222,12 @@ def main():
         if force_include_ids:
             force_include_df = completed_missing_in_db[
                 completed_missing_in_db["external_order_id"].isin(force_include_ids)
-            ].copy()
+            ]
             st.info(f"Force-selected completed orders: {len(force_include_df)}")
     else:
         st.success("No completed in-person digital orders are missing from the database.")
 
-    filtered_df = processing_df.copy()
+    filtered_df = processing_df
     if not force_include_df.empty:
         filtered_df = pd.concat([filtered_df, force_include_df], ignore_index=True)
         filtered_df = filtered_df.drop_duplicates(subset=["external_order_id"], keep="first")
@@ -268,7 +235,7 @@ def main():
     if force_include_ids and not excluded_by_filter.empty:
         excluded_by_filter = excluded_by_filter[
             ~excluded_by_filter["external_order_id"].isin(force_include_ids)
-        ].copy()
+        ]
 
     m1, m2, m3 = st.columns(3)
     m1.metric("Eligible PROCESSING", len(processing_df))
@@ -300,107 +267,87 @@ def main():
     # ----------------------------------
 
     scouts = get_all_scouts()
-    # st.write(scouts[:2])
-    # aliases = fetch_scout_aliases()
-
-    ss.scout_name_lookup = {
-        (s["first_name"], s["last_name"]): s["scout_id"]
-        for s in scouts
-        }
-    ss.parent_id_lookup = {
-        s["scout_id"]: s["parent_id"]
-        for s in scouts
-        }
-    
-    ss.gsuid_map = build_gsusa_mapping(scouts, filtered_df)
-
-    # Update Scouts Table with GSU_ID
-    scout_updates = build_scout_updates(scouts, ss.gsuid_map)
-    # st.write(f'Scouts table Updates: \n\n{scout_updates[:2]}')
-    
-    # Apply GSUSA ID updates to scouts table
-    if scout_updates:
-        for scout_id, gsusa_id in scout_updates:
-            update_scout_gsusa_id(scout_id, gsusa_id)
-        st.info(f"✓ Updated {len(scout_updates)} scout(s) with GSUSA IDs")
-
-    #### 
-    updated_df = attach_scout_id(filtered_df)
-    # st.dataframe(updated_df) #[['scout_id','external_order_id','scout_gsusa_id','scout_first_name']])
-    
+    result = match_scouts(filtered_df, scouts, fetch_scout_aliases())
+
+    # Record GSUSA ids learned from exact-name / alias matches
+    if result.gsusa_updates:
+        updated = update_scout_gsusa_ids(result.gsusa_updates)
+        if updated:
+            st.info(f"✓ Updated {updated} scout(s) with GSUSA IDs")
+
+    updated_df = result.orders
+    matched = updated_df[updated_df["scout_id"].notna()]
+    still_unmatched = updated_df.iloc[0:0]
+    new_aliases = {}
+
+    fuzzy = matched[matched["match_method"] == MATCH_FUZZY]
+    if not fuzzy.empty:
+        with st.expander(f"Fuzzy name matches ({fuzzy['alias_name'].nunique()})"):
+            names = {s["scout_id"]: f"{s['first_name']} {s['last_name']}" for s in scouts}
+            st.dataframe(
+                fuzzy.drop_duplicates("alias_name").assign(
+                    matched_scout=lambda d: d["scout_id"].map(names),
+                )[["scout_first_name", "scout_last_name", "matched_scout", "match_confidence"]],
+                width='stretch',
+                hide_index=True,
+            )
 
-    unmatched = updated_df[updated_df["scout_id"].isna()].copy()
-    matched = updated_df[updated_df["scout_id"].notna()].copy()
-    still_unmatched = pd.DataFrame(columns=updated_df.columns)
-    # st.write('matched:\n')
-    # st.dataframe(matched)
     # ----------------------------------
-    # Alias Resolution UI
+    # Review queue: names nothing matched
     # ----------------------------------
-    if not unmatched.empty:
+    if not result.review.empty:
         st.warning("Some scout names need to be matched")
 
         scout_options = {
             f"{s['first_name']} {s['last_name']}": s["scout_id"] for s in scouts
         }
-
-        # Create unique scout mapping with order count
-        unmatched['scout_name'] = unmatched['scout_first_name'] + ' ' + unmatched['scout_last_name']
-        scout_order_counts = unmatched.groupby('scout_name').size()
-        
-        # Get unique scouts (no duplicates)
-        unique_scouts = sorted(scout_order_counts.index.tolist())
+        option_names = sorted(scout_options.keys())
+        name_by_id = {v: k for k, v in scout_options.items()}
 
         scout_matches = {}
-        for scout_name in unique_scouts:
-            order_count = scout_order_counts[scout_name]
-            st.markdown(f"**Digital Cookie Scout:** `{scout_name}` ({order_count} orders)")
+        for r in result.review.itertuples():
+            st.markdown(f"**Digital Cookie Scout:** `{r.scout_name}` ({r.order_count} orders)")
 
+            suggested = name_by_id.get(r.suggested_scout_id) if pd.notna(r.suggested_scout_id) else None
             choice = st.selectbox(
                 "Match to Scout",
-                [""] + sorted(scout_options.keys()),
-                key=f"scout_match_{scout_name.replace(' ', '_')}",
+                [""] + option_names,
+                index=option_names.index(suggested) + 1 if suggested else 0,
+                key=f"scout_match_{r.scout_name.replace(' ', '_')}",
+                help=f"Suggested ({r.confidence:.0%} similar)" if suggested else None,
             )
 
             if choice:
-                scout_matches[scout_name] = scout_options[choice]
+                scout_matches[r.alias_name] = scout_options[choice]
                 st.success(f"✓ Selected: {choice}")
             else:
                 st.warning(f"⚠️ No match selected - orders will be skipped")
 
-        # Separate newly matched from still unmatched
-        newly_matched_list = []
-        still_unmatched = unmatched.copy()
-
-        for digital_scout_name, system_scout_id in scout_matches.items():
-            mask = still_unmatched['scout_name'] == digital_scout_name
-            newly_matched_subset = still_unmatched[mask].copy()
-            newly_matched_subset['scout_id'] = system_scout_id
-            newly_matched_subset['parent_id'] = ss.parent_id_lookup.get(system_scout_id)
-            newly_matched_list.append(newly_matched_subset)
-            
-            # Remove from still_unmatched
-            still_unmatched = still_unmatched[~mask].copy()
-            
-            # Store alias for future imports
-            system_scout_name = scout_options[
-                [k for k, v in scout_options.items() if v == system_scout_id][0]
-            ]
-            st.success(f"✓ Matched: {digital_scout_name} → {system_scout_name}")
+        # Apply the reviewed matches; they are saved as aliases on import
+        if scout_matches:
+            chosen = updated_df["scout_id"].isna() & updated_df["alias_name"].isin(scout_matches.keys())
+            updated_df = updated_df.copy()
+            updated_df.loc[chosen, "scout_id"] = updated_df.loc[chosen, "alias_name"].map(scout_matches)
+            updated_df.loc[chosen, "parent_id"] = updated_df.loc[chosen, "scout_id"].map(
+                {s["scout_id"]: s["parent_id"] for s in scouts}
+            )
+            updated_df.loc[chosen, "match_method"] = "review"
+            matched = updated_df[updated_df["scout_id"].notna()]
+            new_aliases = scout_matches
 
-        # Add newly matched orders to matched dataframe
-        if newly_matched_list:
-            matched = pd.concat([matched] + newly_matched_list, ignore_index=True)
+        still_unmatched = updated_df[updated_df["scout_id"].isna()].assign(
+            scout_name=lambda d: (d["scout_first_name"].fillna("") + " " + d["scout_last_name"].fillna("")).str.strip()
+        )
 
         # Display and handle remaining unmatched scouts
         if not still_unmatched.empty:
             st.warning(f"⏳ {len(still_unmatched)} orders remain unmatched - these will be skipped")
             st.info("**Action needed:** Parents must create accounts and add scouts to the system before these orders can be imported.")
-            unmatched_scouts = still_unmatched['scout_name'].unique()
-            for scout in unmatched_scouts:
-                count = len(still_unmatched[still_unmatched['scout_name'] == scout])
+            for scout, count in still_unmatched.groupby("scout_name").size().items():
                 st.info(f"  • {scout}: {count} orders (skipped)")
 
+    matched = matched.copy()
+
     # ----------------------------------
     # Final Prep + Deduplication
     # ----------------------------------
@@ -422,7 +369,7 @@ def main():
     )
 
     # Rename cookie display names -> cookie codes (must ASSIGN result)
-    matched, cookie_nm_map = rename_cookie_columns(matched, int(ss.current_year))
+    matched, cookie_nm_map = rename_cookie_columns(matched, year)
     # st.write(cookie_nm_map)
     # st.write(matched.columns.tolist())
 
@@ -496,19 +443,24 @@ def main():
         width='stretch',
     )
 
-    if new_orders.empty:
+    if new_orders.empty and not apply_changes:
         st.success("All eligible orders already imported.")
         return
 
     if st.button("Import Digitals", type="primary"):
-        # add st spinner or progress bar
-        with st.spinner("Importing orders..."):
-            updated_df = bulk_insert_order_headers(new_orders) # return adds the order_id
-            bulk_insert_order_items(updated_df)
-            bulk_insert_planned_inventory(updated_df)
-            bulk_insert_money_ledger(updated_df)
-            
-        st.success(f"Orders submitted successfully!")
+        with st.spinner("Queuing import..."):
+            # Reviewed names resolve automatically next time
+            with transaction():
+                for alias_name, scout_id in new_aliases.items():
+                    insert_scout_alias(alias_name, scout_id)
+            # The worker creates the orders in committed batches; progress shows above
+            submit_doc_import_job(
+                new_orders,
+                plan.item_updates() if apply_changes else None,
+                program_year=year,
+                created_by=ss.get("username"),
+            )
+        st.rerun()
 
     
 
@@ -8,7 +8,10 @@ import datetime
 from utils.db_utils import require_admin, to_pacific
 from utils.app_utils import setup, apputils
 from utils.order_utils import (
-    get_all_orders_wide,
+    get_orders_page,
+    count_orders,
+    OrderFilters,
+    ORDERS_PAGE_SIZE,
     admin_update_orders_bulk,
     get_cookie_codes_for_year,
     get_all_scouts,
@@ -19,6 +22,9 @@ from utils.order_utils import (
 # -----------------------------
 STATUS_OPTIONS = ["NEW", "PRINTED", "IMPORTED","PICKED_UP", "CANCELLED"]
 
+# Placeholder scout that booth orders are booked under
+BOOTH_SCOUT_ID = '7bcf1980-ccb7-4d0c-b0a0-521b542356fa'
+
 DEFAULT_COLUMNS = [
     "orderId",
     "submitDate",
@@ -221,63 +227,84 @@ def main():
     # Show last digital import date
     apputils.get_last_digital_import()
    
-    df_all = get_all_orders_wide(program_year=int(ss.current_year))
-    if df_all.empty:
-        st.info("No orders found.")
-        return
-    
-    # Add formatted date column
-    if "submit_dt" in df_all.columns:
-        df_all["submitDate"] = pd.to_datetime(df_all["submit_dt"]).dt.date
-    
-    # Filter out booth orders (orderType == 'Booth' or scout_id == booth scout)
-    BOOTH_SCOUT_ID = '7bcf1980-ccb7-4d0c-b0a0-521b542356fa'
-    df_all = df_all[
-        (df_all["orderType"] != "Booth") & 
-        (df_all.get("scoutId", "") != BOOTH_SCOUT_ID)
-    ]
-    
-    if df_all.empty:
-        st.info("No non-booth orders found.")
-        return
-
-    # Clean up blank orderType values (fill with empty string so selectbox works)
-    if "orderType" in df_all.columns:
-        df_all["orderType"] = df_all["orderType"].fillna("")
+    year = int(ss.current_year)
 
     # ---------------- Filters ----------------
+    # Applied in SQL (get_orders_page); the grid holds one page at a time
     st.subheader("Filters")
 
+    scouts = get_all_scouts()
+    scout_ids_by_name: dict[str, list[str]] = {}
+    for s in scouts:
+        if str(s["scout_id"]) == BOOTH_SCOUT_ID:
+            continue
+        name = f"{s['first_name']} {s['last_name']}".strip()
+        scout_ids_by_name.setdefault(name, []).append(str(s["scout_id"]))
+
     c1, c2, c3 = st.columns(3)
 
     with c1:
-        status_vals = sorted(df_all["orderStatus"].dropna().unique())  if "orderStatus" in df_all.columns else []
         status_filter = st.multiselect(
             "Status",
-            options=status_vals,
-            default=["NEW","IMPORTED","PRINTED"] if "NEW" in status_vals else status_vals,
+            options=STATUS_OPTIONS,
+            default=["NEW", "IMPORTED", "PRINTED"],
         )
+        type_filter = st.multiselect("Order Type", options=["Paper", "Digital"])
 
     with c2:
         scout_filter = st.multiselect(
             "Scout",
-            options=sorted(df_all["scoutName"].dropna().unique()),
+            options=sorted(scout_ids_by_name),
         )
+        payment_filter = st.selectbox("Payment", ["All", "Paid", "Unpaid"])
 
     with c3:
         initial_only = st.checkbox("Initial Orders Only")
+        ebudde_filter = st.selectbox("eBudde", ["All", "Added", "Not added"])
+
+    filters = OrderFilters(
+        statuses=status_filter,
+        order_types=type_filter,
+        # Booth orders are managed on the booth pages
+        exclude_order_types=["Booth"],
+        exclude_scout_ids=[BOOTH_SCOUT_ID],
+        scout_ids=[sid for name in scout_filter for sid in scout_ids_by_name[name]],
+        paid={"Paid": True, "Unpaid": False}.get(payment_filter),
+        initial_order=True if initial_only else None,
+        add_ebudde={"Added": True, "Not added": False}.get(ebudde_filter),
+    )
 
-    df = df_all.copy()
-
-    if status_filter:
-        df = df[df["orderStatus"].isin(status_filter)]
+    # Back to the first page whenever the filters change
+    filter_key = repr((year, filters))
+    if ss.get("orders_filter_key") != filter_key:
+        ss.orders_filter_key = filter_key
+        ss.orders_cursors = [None]
+
+    total_orders = count_orders(year, filters)
+    df, next_cursor = get_orders_page(year, filters, after=ss.orders_cursors[-1])
+    page_no = len(ss.orders_cursors)
+    page_count = max(1, -(-total_orders // ORDERS_PAGE_SIZE))
+
+    n1, n2, n3 = st.columns([1, 2, 1])
+    if n1.button("◀ Previous", disabled=page_no == 1):
+        ss.orders_cursors.pop()
+        st.rerun()
+    n2.caption(f"Page {page_no} of {page_count} · {total_orders} order(s)")
+    if n3.button("Next ▶", disabled=next_cursor is None):
+        ss.orders_cursors.append(next_cursor)
+        st.rerun()
+
+    if df.empty:
+        st.info("No orders found.")
+        return
 
-    if scout_filter:
-        # Make sure filter values are also cleaned for comparison
-        df = df[df["scoutName"].str.strip().isin(scout_filter)]
+    # Add formatted date column
+    if "submit_dt" in df.columns:
+        df["submitDate"] = pd.to_datetime(df["submit_dt"]).dt.date
 
-    if initial_only and "initialOrder" in df.columns:
-        df = df[df["initialOrder"] == True]
+    # Clean up blank orderType values (fill with empty string so selectbox works)
+    if "orderType" in df.columns:
+        df["orderType"] = df["orderType"].fillna("")
 
     # Get all cookie columns BEFORE filtering (to include DON and other codes)
     meta_cols = {'orderId', 'program_year', 'scoutName', 'orderType', 'orderStatus', 'paymentStatus', 
@@ -384,7 +411,9 @@ def main():
             try:
                 admin_update_orders_bulk(updates, cookie_cols)
             except Exception as e:
-                st.error(f"Update failed: {e}")
+                # Saved as one transaction: nothing was applied
+                st.error(f"Update failed, no changes saved: {e}")
+                return
 
             st.subheader("Changes Applied")
             st.dataframe(diffs.reset_index(drop=True), width='stretch', hide_index=True)
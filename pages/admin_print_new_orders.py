@@ -334,22 +334,8 @@ def build_pdf(df_orders: pd.DataFrame, df_items: pd.DataFrame) -> bytes:
 # =========================
 # PAGE
 # =========================
-def main():
-    require_admin()
-    setup.config_site(page_title="Print Orders", initial_sidebar_state="expanded")
-
-    st.title("Admin Print Orders")
-
-    statuses = st.multiselect("Statuses", STATUS_OPTIONS, default=["NEW", "IMPORTED"])
-    initial_only = False
-    initial_only = st.checkbox("Initial Orders Only", value=False)
-
-
-    rows = get_admin_print_orders(statuses=statuses, initial_only=initial_only)
-    if not rows:
-        st.success("No orders found.")
-        return
-
+def split_print_rows(rows) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """get_admin_print_orders rows -> (one row per order, order items) for build_pdf."""
     df = pd.DataFrame(rows)
     df["Date"] = pd.to_datetime(df["submit_date"]).dt.date
 
@@ -372,6 +358,26 @@ def main():
     )
 
     df_items = df[["order_id", "cookie_code", "quantity"]].dropna()
+    return df_orders, df_items
+
+
+def main():
+    require_admin()
+    setup.config_site(page_title="Print Orders", initial_sidebar_state="expanded")
+
+    st.title("Admin Print Orders")
+
+    statuses = st.multiselect("Statuses", STATUS_OPTIONS, default=["NEW", "IMPORTED"])
+    initial_only = False
+    initial_only = st.checkbox("Initial Orders Only", value=False)
+
+
+    rows = get_admin_print_orders(statuses=statuses, initial_only=initial_only)
+    if not rows:
+        st.success("No orders found.")
+        return
+
+    df_orders, df_items = split_print_rows(rows)
 
     scouts = sorted(df_orders["scoutName"].unique())
     selected = st.multiselect("Scouts", scouts, default=scouts)
@@ -3,12 +3,9 @@ from streamlit import session_state as ss
 from datetime import datetime
 from decimal import Decimal
 import pandas as pd
-from sqlalchemy import text
 
 from utils.app_utils import setup
-from utils.db_utils import get_engine
-
-engine = get_engine()
+from utils.db_utils import fetch_all, fetch_one, execute_sql, request_scope
 
 # --------------------------------------------------
 # Session helpers
@@ -27,7 +24,7 @@ def require_admin():
 # DB helpers
 # --------------------------------------------------
 def get_parents(year):
-    sql = text("""
+    sql = """
         SELECT DISTINCT
             p.parent_id,
             p.parent_firstname || ' ' || p.parent_lastname AS parent_name
@@ -36,13 +33,12 @@ def get_parents(year):
           ON p.parent_id = o.parent_id
         WHERE o.program_year = :year
         ORDER BY parent_name
-    """)
-    with engine.connect() as conn:
-        return conn.execute(sql, {"year": year}).fetchall()
+    """
+    return fetch_all(sql, {"year": year})
 
 
 def get_orders_for_parent(parent_id, year):
-    sql = text("""
+    sql = """
         SELECT
             o.order_id,
             o.order_ref,
@@ -59,22 +55,20 @@ def get_orders_for_parent(parent_id, year):
         WHERE o.parent_id = :parent_id
           AND o.program_year = :year
         ORDER BY o.created_at
-    """)
-    with engine.connect() as conn:
-        return conn.execute(sql, {
-            "parent_id": parent_id,
-            "year": year
-        }).fetchall()
+    """
+    return fetch_all(sql, {
+        "parent_id": parent_id,
+        "year": year
+    })
 
 
 def get_money_received(order_id):
-    sql = text("""
-        SELECT COALESCE(SUM(amount), 0)
+    sql = """
+        SELECT COALESCE(SUM(amount), 0) AS total
         FROM cookies_app.money_ledger
         WHERE related_order_id = :order_id
-    """)
-    with engine.connect() as conn:
-        return Decimal(conn.execute(sql, {"order_id": order_id}).scalar())
+    """
+    return Decimal(fetch_one(sql, {"order_id": order_id})["total"])
 
 
 def get_money_received_bulk(order_ids):
@@ -82,20 +76,19 @@ def get_money_received_bulk(order_ids):
     if not order_ids:
         return {}
     
-    sql = text("""
+    sql = """
         SELECT related_order_id, COALESCE(SUM(amount), 0) as total
         FROM cookies_app.money_ledger
         WHERE related_order_id = ANY(:order_ids)
         GROUP BY related_order_id
-    """)
-    with engine.connect() as conn:
-        results = conn.execute(sql, {"order_ids": order_ids}).fetchall()
-        return {row.related_order_id: Decimal(row.total) for row in results}
+    """
+    results = fetch_all(sql, {"order_ids": order_ids})
+    return {row.related_order_id: Decimal(row.total) for row in results}
 
 
 def get_parents_with_balances(year):
     """Get parents who have outstanding paper order balances in a single query"""
-    sql = text("""
+    sql = """
         WITH order_totals AS (
             SELECT 
                 o.parent_id,
@@ -113,14 +106,13 @@ def get_parents_with_balances(year):
         FROM order_totals
         WHERE total_due > total_received
         ORDER BY parent_name
-    """)
-    with engine.connect() as conn:
-        return conn.execute(sql, {"year": year}).fetchall()
+    """
+    return fetch_all(sql, {"year": year})
 
 
 def get_money_due_by_parent_scout(year):
         """Get outstanding paper-order balances grouped by parent and scout."""
-        sql = text("""
+        sql = """
                 WITH order_paid AS (
                         SELECT
                                 o.order_id,
@@ -155,9 +147,8 @@ def get_money_due_by_parent_scout(year):
                 WHERE od.amount_due > 0
                 GROUP BY parent_name, scout_name
                 ORDER BY parent_name, scout_name
-        """)
-        with engine.connect() as conn:
-                return conn.execute(sql, {"year": year}).fetchall()
+        """
+        return fetch_all(sql, {"year": year})
 
 
 def insert_money_received(
@@ -169,7 +160,7 @@ def insert_money_received(
     method,
     notes
 ):
-    sql = text("""
+    sql = """
         INSERT INTO cookies_app.money_ledger (
             money_event_id,
             parent_id,
@@ -194,21 +185,20 @@ def insert_money_received(
             now(),
             now()
         )
-    """)
-    with engine.begin() as conn:
-        conn.execute(sql, {
-            "parent_id": parent_id,
-            "scout_id": scout_id,
-            "program_year": program_year,
-            "amount": amount,
-            "method": method,
-            "notes": notes,
-            "order_id": order_id
-        })
+    """
+    execute_sql(sql, {
+        "parent_id": parent_id,
+        "scout_id": scout_id,
+        "program_year": program_year,
+        "amount": amount,
+        "method": method,
+        "notes": notes,
+        "order_id": order_id
+    })
 
 
 def update_order_status_if_paid(order_id):
-    sql = text("""
+    sql = """
         UPDATE cookies_app.orders o
         SET status = 'PAID'
         WHERE o.order_id = :order_id
@@ -217,9 +207,8 @@ def update_order_status_if_paid(order_id):
               FROM cookies_app.money_ledger m
               WHERE m.related_order_id = o.order_id
           ) >= o.order_amount
-    """)
-    with engine.begin() as conn:
-        conn.execute(sql, {"order_id": order_id})
+    """
+    execute_sql(sql, {"order_id": order_id})
 
 
 # --------------------------------------------------
@@ -467,4 +456,5 @@ if __name__ == "__main__":
         initial_sidebar_state="expanded"
     )
     init_flags()
-    main()
+    with request_scope("admin_receive_money", snapshot=True):
+        main()
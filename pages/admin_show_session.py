@@ -6,6 +6,11 @@ import json
 from datetime import datetime
 from utils.esutils import esu
 from utils.app_utils import apputils as au, setup 
+from utils.db_utils import (
+    query_cache_stats, clear_query_cache, pool_stats,
+    query_stats, reset_query_stats, set_explain_capture, explain_capture_enabled,
+    LATENCY_BUCKETS_MS, SLOW_QUERY_MS,
+)
 from elasticsearch import Elasticsearch  # need to also install with pip3
 
 es = esu.conn_es()
@@ -85,6 +90,79 @@ def reindex_index(src_index, dest_index):
     except Exception as e:
         st.write(f"Error reindexing from '{src_index}' to '{dest_index}': {e}")
 
+def render_query_stats():
+    stats = query_stats()
+
+    st.subheader('Query Performance')
+    explain_on = st.toggle(
+        f'Capture EXPLAIN ANALYZE for reads slower than {SLOW_QUERY_MS} ms',
+        value=explain_capture_enabled(),
+    )
+    set_explain_capture(explain_on)
+
+    if not stats['statements']:
+        st.info('No queries recorded yet.')
+        return
+
+    timeouts = sum(v['timeouts'] for v in stats['statements'].values())
+    cancels = sum(v['cancels'] for v in stats['statements'].values())
+    c1, c2 = st.columns(2)
+    c1.metric('Statement timeouts', timeouts)
+    c2.metric('Cancelled queries', cancels)
+
+    # ---- Per page: DB time vs total rerun time (the rest is Streamlit rendering) ----
+    st.markdown('#### By Page')
+    pages_df = pd.DataFrame([
+        {'page': page, **vals} for page, vals in stats['pages'].items()
+    ])
+    pages_df['db_share'] = (pages_df['db_ms'] / pages_df['wall_ms'].where(pages_df['wall_ms'] > 0)).round(2)
+    st.dataframe(pages_df.sort_values('db_ms', ascending=False).round(1), hide_index=True, width='stretch')
+
+    # ---- Top statements ----
+    st.markdown('#### Top Statements (by total time)')
+    stmt_df = pd.DataFrame([
+        {
+            'caller': v['caller'],
+            'kind': v['kind'],
+            'calls': v['calls'],
+            'total_ms': v['total_ms'],
+            'avg_ms': v['total_ms'] / max(v['calls'], 1),
+            'max_ms': v['max_ms'],
+            'rows': v['rows'],
+            'timeouts': v['timeouts'],
+            'cancels': v['cancels'],
+            'plan': sql in stats['plans'],
+            'sql': sql,
+        }
+        for sql, v in stats['statements'].items()
+    ]).sort_values('total_ms', ascending=False).head(25)
+    st.dataframe(stmt_df.round(1), hide_index=True, width='stretch')
+
+    # ---- Histogram for one statement ----
+    bucket_labels = [f'<= {b} ms' for b in LATENCY_BUCKETS_MS] + [f'> {LATENCY_BUCKETS_MS[-1]} ms']
+    picked = st.selectbox(
+        'Latency histogram for',
+        stmt_df['sql'].tolist(),
+        format_func=lambda q: f"{stats['statements'][q]['caller']}: {q[:100]}",
+    )
+    if picked:
+        hist = pd.DataFrame({'calls': stats['statements'][picked]['hist']}, index=bucket_labels)
+        st.bar_chart(hist)
+        if picked in stats['plans']:
+            st.code(stats['plans'][picked])
+
+    # ---- Slow query log ----
+    st.markdown(f'#### Slow Queries (>= {SLOW_QUERY_MS} ms, most recent first)')
+    if stats['slow_log']:
+        st.dataframe(pd.DataFrame(stats['slow_log'][::-1]), hide_index=True, width='stretch')
+    else:
+        st.caption('None yet.')
+
+    if st.button('Reset Query Stats'):
+        reset_query_stats()
+        st.rerun()
+
+
 # Main function
 def get_latest_backup_num(index_nm):
         if es.indices.exists(index=index_nm):
@@ -144,6 +222,35 @@ def main():
     if st.button('Show Session State'):
         ss
 
+    st.divider()
+    st.subheader('Connection Pool')
+    pools = pool_stats()
+    if pools:
+        pool_df = pd.DataFrame([{'engine': name, **vals} for name, vals in pools.items()])
+        if 'wait_ms_total' in pool_df.columns:
+            pool_df['wait_ms_avg'] = pool_df['wait_ms_total'] / pool_df['checkouts'].where(pool_df['checkouts'] > 0)
+        st.dataframe(pool_df.round(2), hide_index=True, width='stretch')
+    else:
+        st.caption('No engine created yet.')
+
+    st.divider()
+    st.subheader('Query Cache')
+    stats = query_cache_stats()
+    lookups = stats['hits'] + stats['misses']
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric('Hits', stats['hits'])
+    c2.metric('Misses', stats['misses'])
+    c3.metric('Hit Rate', f"{stats['hits'] / lookups:.0%}" if lookups else '-')
+    c4.metric('Evictions', stats['evictions'])
+    c5.metric('Invalidations', stats['invalidations'])
+    st.caption(f"{stats['entries']} cached result sets")
+    if st.button('Clear Query Cache'):
+        clear_query_cache()
+        st.rerun()
+
+    st.divider()
+    render_query_stats()
+
 if __name__ == '__main__':
 
     setup.config_site(page_title="Session State",initial_sidebar_state='expanded')
@@ -71,12 +71,11 @@ def save_booth_order(booth_id, year, total_boxes, total_amount, starting_cash, e
     if existing:
         # Update existing order - set status to PENDING since parent is submitting data
         # Also update parent_id and scout_id from the scouts selected by the parent
+        # (totals follow from save_order_items via the order_items triggers)
         order_id = existing[0].order_id
         execute_sql("""
             UPDATE cookies_app.orders
-            SET order_qty_boxes = :qty,
-                order_amount = :amt,
-                starting_cash = :starting_cash,
+            SET starting_cash = :starting_cash,
                 ending_cash = :ending_cash,
                 square_total = :square_total,
                 parent_id = :parent_id,
@@ -87,8 +86,6 @@ def save_booth_order(booth_id, year, total_boxes, total_amount, starting_cash, e
             WHERE order_id = :order_id
         """, {
             "order_id": str(order_id),
-            "qty": total_boxes,
-            "amt": float(total_amount),
             "starting_cash": float(starting_cash),
             "ending_cash": float(ending_cash),
             "square_total": float(square_total),
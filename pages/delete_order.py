@@ -6,7 +6,7 @@ from decimal import Decimal
 from sqlalchemy import create_engine, text
 
 from utils.app_utils import setup
-from utils.db_utils import get_engine
+from utils.db_utils import get_engine, invalidate_cache
 from utils.order_utils import delete_order_cascade
 
 engine = get_engine()
@@ -80,6 +80,7 @@ def update_order(order_id, order_type, comments):
             "order_type": order_type,
             "comments": comments
         })
+    invalidate_cache("orders")
 
 
 # NOTE: delete_order function now uses utility from order_utils
@@ -7,7 +7,7 @@ from sqlalchemy import create_engine, text
 import pandas as pd
 
 from utils.app_utils import apputils as au, setup, cookie_celebration
-from utils.order_utils import get_cookies_for_year, insert_order_header, insert_order_items, insert_planned_inventory
+from utils.order_utils import get_cookie_catalog, insert_order_header, insert_order_items, insert_planned_inventory
 from utils.db_utils import get_engine
 
 engine = get_engine()
@@ -81,7 +81,8 @@ def main():
     scout_display = st.selectbox("Select Scout", [s["display"] for s in scouts])
     scout = next(s for s in scouts if s["display"] == scout_display)
 
-    cookies = get_cookies_for_year(ss.current_year)
+    catalog = get_cookie_catalog(ss.current_year)
+    cookies = catalog.active
 
     if not cookies:
         st.error(f"No cookies are configured for {ss.current_year}. Please contact an admin.")
@@ -118,7 +119,7 @@ def main():
         if st.form_submit_button("Submit Order"):
             total_boxes = sum(cookie_inputs.values())
             order_amount = sum(
-                qty * next(c.price_per_box for c in cookies if c.cookie_code == code)
+                qty * catalog.price(code)
                 for code, qty in cookie_inputs.items()
             )
 
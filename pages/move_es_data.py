@@ -9,7 +9,30 @@ from pathlib import Path
 from pathlib import Path
 from utils.app_utils import setup
 from utils.esutils import esu
-from utils.db_utils import get_engine, load_jsonl_to_staging, show_engine_conn, mk_sql_table
+from utils.db_utils import get_engine, load_jsonl_to_staging, show_engine_conn, mk_sql_table, fetch_df_chunks
+
+
+# Postgres tables offered for CSV export, filtered by program year
+EXPORT_TABLES = {
+    "orders": "SELECT * FROM cookies_app.orders WHERE program_year = :year ORDER BY submit_dt, order_id",
+    "order_items": "SELECT * FROM cookies_app.order_items WHERE program_year = :year ORDER BY order_id, cookie_code",
+    "money_ledger": "SELECT * FROM cookies_app.money_ledger WHERE program_year = :year ORDER BY received_dt",
+    "inventory_ledger": "SELECT * FROM cookies_app.inventory_ledger WHERE program_year = :year ORDER BY event_dt",
+}
+
+
+def export_table_csv(table: str, year: int) -> tuple[Path, int]:
+    """
+    Stream a season of one table to a temp CSV a chunk at a time,
+    so memory stays flat no matter how many rows exist.
+    """
+    output_path = Path(tempfile.mkdtemp()) / f"{table}_{year}.csv"
+    count = 0
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        for chunk in fetch_df_chunks(EXPORT_TABLES[table], {"year": year}):
+            chunk.to_csv(f, header=(count == 0), index=False)
+            count += len(chunk)
+    return output_path, count
 
 
 def main():
@@ -222,6 +245,26 @@ def main():
 
         print("scouts.csv regenerated")
 
+    # ---------------------------
+    # Postgres export
+    # ---------------------------
+    with st.form("pg_export"):
+        st.subheader("Export Postgres Table (CSV)")
+        export_table = st.selectbox("Table", list(EXPORT_TABLES))
+        export_year = st.number_input("Program year", min_value=2024, max_value=2100, value=2026, step=1)
+        export = st.form_submit_button("Export")
+
+    if export:
+        output_path, count = export_table_csv(export_table, int(export_year))
+        st.success(f"✅ Exported {count} rows from {export_table}")
+        with open(output_path, "rb") as f:
+            st.download_button(
+                label=f"⬇️ Download {output_path.name}",
+                data=f,
+                file_name=output_path.name,
+                mime="text/csv"
+            )
+
     # ---------------------------
     # Push to SQL Logic
     # ---------------------------
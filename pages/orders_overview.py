@@ -1,14 +1,14 @@
 import streamlit as st
 from streamlit import session_state as ss
 from datetime import datetime
-from decimal import Decimal
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import text
 
 from utils.app_utils import setup, apputils
 from utils.db_utils import get_engine, require_login, to_pacific, fetch_all
-from utils.order_utils import get_all_orders_wide
+from utils.order_utils import get_all_orders_wide, season_payment_summary
 
 engine = get_engine()
 
@@ -22,15 +22,6 @@ def init_ss():
 
 
 
-# --------------------------------------------------
-# Helpers
-# --------------------------------------------------
-def payment_status(order_type, order_amount, paid_amount):
-    if "Digital" in order_type:
-        return "PAID"
-    return "PAID" if paid_amount >= order_amount else "UNPAID"
-
-
 # --------------------------------------------------
 # DB helpers
 # --------------------------------------------------
@@ -70,20 +61,6 @@ def main():
     # --------------------------------------------------
     # Build aggregates
     # --------------------------------------------------
-    booth_orders = 0
-    digital_orders = 0
-    paper_orders = 0
-
-    booth_boxes = 0
-    digital_boxes = 0
-    paper_boxes = 0
-
-    total_sales = Decimal("0.00")
-    total_paid = Decimal("0.00")
-    
-    paper_sales = Decimal("0.00")
-    paper_paid = Decimal("0.00")
-
     # Calculate cookie totals from wide format
     meta_cols = {'orderId', 'program_year', 'submit_dt', 'orderType', 'orderStatus', 
                  'orderAmount', 'orderQtyBoxes', 'comments', 'boothId', 'scoutId', 'addEbudde', 
@@ -128,36 +105,30 @@ def main():
                 cookie_booth_pending[col] = int(booth_pending)
                 cookie_scout_pending[col] = int(scout_pending)
 
-    for _, o in orders.iterrows():
-        order_type = str(o.get('orderType', '')).lower()
-        scout_id = str(o.get('scoutId', ''))
-        is_booth = order_type == 'Booth' or scout_id == BOOTH_SCOUT_ID
-        is_digital = 'digital' in order_type
-        is_paper = 'paper' in order_type
-        
-        qty = int(o.get('orderQtyBoxes', 0) or 0)
-        amount = Decimal(str(o.get('orderAmount', 0)))
-
-        paid = (
-            amount
-            if is_digital
-            else Decimal(str(o.get('paidAmount', 0) or 0))
-        )
+    # One vectorized pass instead of a Decimal loop over every order.
+    # Buckets match the old loop: booth = the booth scout (the lowercased type
+    # was compared to 'Booth', which never matched), then digital, then paper.
+    order_type = orders['orderType'].astype(str).str.lower()
+    bucket = np.select(
+        [
+            orders['scoutId'].astype(str) == BOOTH_SCOUT_ID,
+            order_type.str.contains('digital', regex=False),
+            order_type.str.contains('paper', regex=False),
+        ],
+        ['booth', 'digital', 'paper'],
+        default='other',
+    )
+    by_bucket = season_payment_summary(orders, by=pd.Series(bucket, index=orders.index, name='bucket'))
+    by_bucket = by_bucket.reindex(['booth', 'digital', 'paper', 'other'], fill_value=0)
+    season = by_bucket.sum()
 
-        if is_booth:
-            booth_orders += 1
-            booth_boxes += qty
-        elif is_digital:
-            digital_orders += 1
-            digital_boxes += qty
-        elif is_paper:
-            paper_orders += 1
-            paper_boxes += qty
-            paper_sales += amount
-            paper_paid += paid
+    booth_orders, digital_orders, paper_orders = (int(by_bucket.at[b, 'orders']) for b in ('booth', 'digital', 'paper'))
+    booth_boxes, digital_boxes, paper_boxes = (int(by_bucket.at[b, 'boxes']) for b in ('booth', 'digital', 'paper'))
 
-        total_sales += amount
-        total_paid += paid
+    total_sales = season['sales_cents'] / 100
+    total_paid = season['paid_cents'] / 100
+    paper_sales = by_bucket.at['paper', 'sales_cents'] / 100
+    paper_paid = by_bucket.at['paper', 'paid_cents'] / 100
 
     # Calculate metrics
     total_orders = booth_orders + digital_orders + paper_orders
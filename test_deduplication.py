@@ -4,19 +4,12 @@ Test deduplication logic for Digital Cookie import
 """
 import sys
 import pandas as pd
-from sqlalchemy import create_engine, text
-import tomllib
+from sqlalchemy import text
 
-# Load secrets
-with open('.streamlit/secrets.toml', 'rb') as f:
-    secrets = tomllib.load(f)
+# Shared engine from utils.db_utils (reads .streamlit/secrets.toml)
+from utils.db_utils import get_engine
 
-db = secrets["general"]
-
-engine = create_engine(
-    f"postgresql+psycopg2://{db['DB_USER']}:{db['DB_PASSWORD']}@"
-    f"{db['DB_HOST']}:{db['DB_PORT']}/{db['DB_NAME']}?sslmode={db['sslmode']}"
-)
+engine = get_engine()
 
 def fetch_existing_external_orders(order_source: str):
     with engine.connect() as conn:
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test read-replica routing in utils.db_utils
+
+Points "primary" and "replica" at two databases and checks where each
+helper call lands (compares inet_server_port / current_database):
+    PRIMARY_DSN=postgresql+psycopg2://postgres@localhost:5432/postgres \
+    REPLICA_DSN=postgresql+psycopg2://postgres@localhost:5433/postgres \
+    python test_replica_routing.py
+"""
+import os
+import time
+
+from sqlalchemy import create_engine
+
+import utils.db_utils as db
+
+WHERE_SQL = "SELECT current_database() || ':' || coalesce(inet_server_port(), 0) AS server"
+
+
+def where():
+    return db.fetch_one(WHERE_SQL)["server"]
+
+
+def test_replica_routing():
+    primary = create_engine(os.environ["PRIMARY_DSN"])
+    replica = create_engine(os.environ["REPLICA_DSN"])
+    db.register_engine(primary, "primary")
+    db.register_engine(replica, "replica")
+    db.REPLICA_PIN_SECONDS = 2
+
+    with primary.connect() as conn:
+        primary_id = conn.exec_driver_sql(WHERE_SQL).scalar()
+    with replica.connect() as conn:
+        replica_id = conn.exec_driver_sql(WHERE_SQL).scalar()
+    assert primary_id != replica_id, "PRIMARY_DSN and REPLICA_DSN are the same server"
+
+    assert db.has_replica()
+    assert where() == replica_id
+    print("✓ Reads go to the replica")
+
+    with db.request_scope("test_replica_routing"):
+        assert where() == replica_id
+        db.execute_sql("SELECT 1")       # any write pins the session
+        assert where() == primary_id
+    print("✓ Reads after a write go to the primary (read-your-writes)")
+
+    time.sleep(db.REPLICA_PIN_SECONDS + 0.5)
+    assert where() == replica_id
+    print(f"✓ Pin expires after {db.REPLICA_PIN_SECONDS}s")
+
+    with db.transaction():
+        assert where() == primary_id
+    print("✓ Reads inside transaction() use the primary")
+
+    time.sleep(db.REPLICA_PIN_SECONDS + 0.5)
+    db.invalidate_cache("scouts")        # engine().begin() writers call this
+    assert where() == primary_id
+    print("✓ invalidate_cache() pins reads to the primary")
+
+    time.sleep(db.REPLICA_PIN_SECONDS + 0.5)
+    cached = f"{WHERE_SQL}, (SELECT count(*) FROM cookies_app.schema_migrations) AS n"
+    assert db.fetch_one(cached, ttl=60)["server"] == primary_id
+    print("✓ Cached (ttl) reads are filled from the primary")
+
+    print("\n✓ Replica routing verified!")
+
+
+if __name__ == "__main__":
+    test_replica_routing()
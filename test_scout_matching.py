@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test DOC import scout matching (utils/doc_import_utils.match_scouts)
+No database needed - scouts, aliases and the export are built in memory.
+"""
+import uuid
+
+import pandas as pd
+
+from utils.doc_import_utils import (
+    match_scouts, MATCH_GSUSA, MATCH_NAME, MATCH_ALIAS, MATCH_FUZZY,
+)
+
+PARENT = uuid.uuid4()
+SCOUTS = [
+    {"scout_id": uuid.uuid4(), "first_name": "Brooklyn", "last_name": "Berry", "gsusa_id": "215369223", "parent_id": PARENT},
+    {"scout_id": uuid.uuid4(), "first_name": "Zoë", "last_name": "O'Neil", "gsusa_id": None, "parent_id": PARENT},
+    {"scout_id": uuid.uuid4(), "first_name": "Katherine", "last_name": "Callison", "gsusa_id": None, "parent_id": uuid.uuid4()},
+    {"scout_id": uuid.uuid4(), "first_name": "Hazel", "last_name": "Hoar", "gsusa_id": None, "parent_id": uuid.uuid4()},
+    {"scout_id": uuid.uuid4(), "first_name": "Mckenzie", "last_name": "Davis", "gsusa_id": None, "parent_id": uuid.uuid4()},
+]
+BY_NAME = {s["first_name"]: s["scout_id"] for s in SCOUTS}
+
+
+def export(rows):
+    return pd.DataFrame(rows, columns=["external_order_id", "scout_first_name", "scout_last_name", "scout_gsusa_id"])
+
+
+def test_scout_matching():
+    print("Testing DOC import scout matching")
+    print("=" * 60)
+
+    orders = export([
+        ("1", "B", "Berry-Smith", "215369223"),         # GSUSA id beats a different name
+        ("2", "zoe", "oneil", "219000001"),             # accents / punctuation / case
+        ("3", "Kate", "Callison", None),                # saved alias
+        ("4", "Hazle", "Hoar", None),                   # one-letter typo -> fuzzy
+        ("5", "Someone", "Else", None),                 # no match -> review
+        ("6", "Someone", "Else", None),
+        ("7", "Kenzie", "Davids", None),                # close, but below auto-accept
+    ])
+    aliases = {"kate callison": BY_NAME["Katherine"]}
+
+    result = match_scouts(orders, SCOUTS, aliases)
+    got = result.orders.set_index("external_order_id")
+
+    assert got.loc["1", "scout_id"] == BY_NAME["Brooklyn"]
+    assert got.loc["1", "match_method"] == MATCH_GSUSA
+    print("✓ GSUSA id match")
+    assert got.loc["2", "scout_id"] == BY_NAME["Zoë"]
+    assert got.loc["2", "match_method"] == MATCH_NAME
+    print("✓ Normalized name match")
+    assert got.loc["3", "scout_id"] == BY_NAME["Katherine"]
+    assert got.loc["3", "match_method"] == MATCH_ALIAS
+    print("✓ Alias match")
+    assert got.loc["4", "scout_id"] == BY_NAME["Hazel"]
+    assert got.loc["4", "match_method"] == MATCH_FUZZY
+    assert got.loc["4", "match_confidence"] >= 0.9
+    print("✓ Fuzzy match")
+    assert got.loc["2", "parent_id"] == PARENT
+    print("✓ Parent follows scout")
+    assert got.loc[["5", "6", "7"], "scout_id"].isna().all()
+    print("✓ Unmatched rows have no scout")
+
+    review = result.review.set_index("scout_name")
+    assert sorted(review.index) == ["Kenzie Davids", "Someone Else"]
+    print("✓ Review queue has one row per name")
+    assert review.loc["Someone Else", "order_count"] == 2
+    print("✓ Review counts orders")
+    assert review.loc["Kenzie Davids", "suggested_scout_id"] == BY_NAME["Mckenzie"]
+    print("✓ Review suggests a close scout")
+    assert pd.isna(review.loc["Someone Else", "suggested_scout_id"])
+    print("✓ No suggestion for strangers")
+
+    assert result.gsusa_updates == [(BY_NAME["Zoë"], "219000001")]
+    print("✓ GSUSA id recorded for exact-name match only")
+
+    # Same-name scouts are ambiguous: never auto-matched
+    twins = SCOUTS + [{**SCOUTS[3], "scout_id": uuid.uuid4()}]
+    result = match_scouts(export([("8", "Hazel", "Hoar", None)]), twins)
+    assert result.orders["scout_id"].isna().all()
+    assert len(result.review) == 1
+    print("✓ Ambiguous name goes to review")
+
+    print("=" * 60)
+    print("✓ All matching checks passed")
+
+
+if __name__ == "__main__":
+    test_scout_matching()
@@ -92,6 +92,7 @@ class setup:
             # if ss.is_admin: ss.is_admin_pers = ss.is_admin #alighn the admin persistent 
             st.sidebar.write('----- ADMIN ------')
             st.sidebar.page_link('pages/admin_ebudde_summary.py',label='Ebudde Summary')
+            st.sidebar.page_link('pages/admin_ebudde_reconcile.py',label='Ebudde Reconcile')
             st.sidebar.page_link('pages/admin_girl_order_summary.py',label='Girl Summary')
             st.sidebar.page_link('pages/admin_order_management.py',label='Order Management')
             st.sidebar.page_link('pages/admin_print_new_orders.py',label='Print Orders')
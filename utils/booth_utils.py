@@ -1,6 +1,6 @@
 from decimal import Decimal
 from sqlalchemy import text
-from utils.db_utils import fetch_all, fetch_one, execute_sql
+from utils.db_utils import fetch_all, fetch_one, execute_sql, CACHE_TTL_CATALOG
 
 
 # ==================================================
@@ -26,7 +26,7 @@ def get_booths(program_year=None):
         FROM cookies_app.booths
         {year_sql}
         ORDER BY booth_date DESC, start_time
-    """, params)
+    """, params, ttl=CACHE_TTL_CATALOG)
 
 
 def get_booth(booth_id):
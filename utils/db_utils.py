@@ -1,8 +1,20 @@
 import streamlit as st
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+import io
 import json
-from typing import IO
+import re
+import uuid
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Iterator
 import bcrypt
 import secrets
 from datetime import datetime, timedelta
@@ -14,74 +26,1242 @@ import pandas as pd
 # Database connection
 # ==================================================
 
-def get_engine():
+POOL_DEFAULTS = {
+    "DB_POOL_SIZE": 5,
+    "DB_MAX_OVERFLOW": 2,
+    "DB_POOL_TIMEOUT": 30,
+    "DB_POOL_RECYCLE": 1800,
+}
+
+
+def _truthy(v) -> bool:
+    return str(v).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _db_settings(name: str) -> dict:
     """
-    Central Postgres engine.
-    Uses Streamlit secrets.
+    Connection settings for a named engine, from Streamlit secrets.
+    "primary" is [general]; "replica" is [replica] layered over [general]
+    (usually only DB_HOST differs).
     """
-    db = st.secrets["general"]
+    if name == "primary":
+        return dict(st.secrets["general"])
+    if name == "replica":
+        return {**st.secrets["general"], **st.secrets["replica"]}
+    raise KeyError(f"Unknown database engine '{name}'")
 
-    return create_engine(
+
+def _build_engine(db: dict) -> Engine:
+    """
+    Pool sizing comes from DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT /
+    DB_POOL_RECYCLE.  DB_PGBOUNCER = true switches to NullPool: pgbouncer
+    (transaction mode) owns the pooling and holding idle server connections
+    here would just pin its slots.
+    """
+    url = (
         f"postgresql+psycopg2://{db['DB_USER']}:{db['DB_PASSWORD']}@"
-        f"{db['DB_HOST']}:{db['DB_PORT']}/{db['DB_NAME']}?sslmode={db['sslmode']}",
+        f"{db['DB_HOST']}:{db['DB_PORT']}/{db['DB_NAME']}?sslmode={db['sslmode']}"
+    )
+    if _truthy(db.get("DB_PGBOUNCER", False)):
+        return create_engine(url, poolclass=NullPool)
+
+    opts = {k: int(db.get(k, v)) for k, v in POOL_DEFAULTS.items()}
+    return create_engine(
+        url,
         pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=2,
-        pool_timeout=30,
-        pool_recycle=1800,
+        pool_size=opts["DB_POOL_SIZE"],
+        max_overflow=opts["DB_MAX_OVERFLOW"],
+        pool_timeout=opts["DB_POOL_TIMEOUT"],
+        pool_recycle=opts["DB_POOL_RECYCLE"],
     )
 
-_ENGINE = None
+
+class _EngineRegistry:
+    """
+    One engine (and connection pool) per database for the whole process.
+    Also tracks how long callers wait to check a connection out.
+    """
+    def __init__(self):
+        self._engines: dict[str, Engine] = {}
+        self._lock = threading.Lock()
+        self.waits: dict[str, dict] = {}
+
+    def get(self, name: str = "primary") -> Engine:
+        eng = self._engines.get(name)
+        if eng is None:
+            with self._lock:
+                eng = self._engines.get(name)
+                if eng is None:
+                    eng = self._engines[name] = _build_engine(_db_settings(name))
+        return eng
+
+    def register(self, name: str, eng: Engine):
+        with self._lock:
+            old = self._engines.get(name)
+            self._engines[name] = eng
+        if old is not None and old is not eng:
+            old.dispose()
+
+    def names(self) -> list[str]:
+        return list(self._engines)
+
+    def record_wait(self, name: str, ms: float, timed_out: bool):
+        with self._lock:
+            w = self.waits.setdefault(
+                name, {"checkouts": 0, "timeouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            )
+            w["checkouts"] += 1
+            w["timeouts"] += int(timed_out)
+            w["wait_ms_total"] += ms
+            w["wait_ms_max"] = max(w["wait_ms_max"], ms)
+
+
+_ENGINES = _EngineRegistry()
+
+
+def get_engine(name: str = "primary") -> Engine:
+    """
+    Process-wide shared engine from the registry (built on first use).
+    Safe to call per request / per rerun: it never creates a second pool.
+    """
+    return _ENGINES.get(name)
 
 
 def engine() -> Engine:
     """
     Cached engine getter (safe for Streamlit reruns).
     """
-    global _ENGINE
-    if _ENGINE is None:
-        _ENGINE = get_engine()
-    return _ENGINE
+    return _ENGINES.get("primary")
+
+
+def register_engine(eng: Engine, name: str = "primary"):
+    """
+    Swap in an engine built elsewhere (scripts, benchmarks pointing at a
+    local database).  The previous engine for that name is disposed.
+    """
+    _ENGINES.register(name, eng)
+
+
+def _connect(name: str = "primary") -> Connection:
+    """
+    Check a connection out of the shared pool, recording the wait.
+    """
+    eng = _ENGINES.get(name)
+    started = time.perf_counter()
+    try:
+        conn = eng.connect()
+    except PoolTimeoutError:
+        _ENGINES.record_wait(name, (time.perf_counter() - started) * 1000, timed_out=True)
+        raise
+    _ENGINES.record_wait(name, (time.perf_counter() - started) * 1000, timed_out=False)
+    return conn
+
+
+def pool_stats() -> dict:
+    """
+    Per engine: pool class, size, checked_out, checked_in, overflow, plus
+    checkout count / timeouts / wait time (total and max, ms).
+    """
+    out = {}
+    for name in _ENGINES.names():
+        pool = _ENGINES.get(name).pool
+        stats = {"pool": type(pool).__name__}
+        for key, attr in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            fn = getattr(pool, attr, None)
+            stats[key] = fn() if callable(fn) else None
+        stats.update(_ENGINES.waits.get(name, {}))
+        out[name] = stats
+    return out
+
+
+# ==================================================
+# Read replica routing
+# ==================================================
+REPLICA_PIN_SECONDS = 15    # read-your-writes window after a session writes
+
+_HAS_REPLICA: bool | None = None
+_PIN_KEY = "_db_primary_pin_until"
+_process_pin_until = 0.0     # scripts / threads without a Streamlit session
+
+
+def has_replica() -> bool:
+    """
+    True when a [replica] section (or a registered "replica" engine) exists.
+    """
+    global _HAS_REPLICA
+    if "replica" in _ENGINES.names():
+        return True
+    if _HAS_REPLICA is None:
+        try:
+            _HAS_REPLICA = "replica" in st.secrets
+        except Exception:
+            _HAS_REPLICA = False
+    return _HAS_REPLICA
+
+
+def _pin_primary():
+    """
+    After a write, send this session's reads to the primary for
+    REPLICA_PIN_SECONDS so it sees its own writes despite replica lag.
+    """
+    global _process_pin_until
+    until = time.monotonic() + REPLICA_PIN_SECONDS
+    try:
+        st.session_state[_PIN_KEY] = until
+    except Exception:
+        _process_pin_until = until
+
+
+def _primary_pinned() -> bool:
+    try:
+        until = st.session_state.get(_PIN_KEY, 0.0)
+    except Exception:
+        until = _process_pin_until
+    return until > time.monotonic()
+
+
+def _read_target() -> str:
+    if has_replica() and not _primary_pinned():
+        return "replica"
+    return "primary"
+
+
+# ==================================================
+# Request scope (one connection per page rerun)
+# ==================================================
+class _RequestScope:
+    """
+    State for one page rerun: at most one checked-out connection per engine
+    (primary / replica).
+    """
+    def __init__(self, label: str, snapshot: bool):
+        self.label = label
+        self.snapshot = snapshot
+        self.conns: dict[str, Connection] = {}
+
+    def conn(self, name: str) -> Connection:
+        conn = self.conns.get(name)
+        if conn is None:
+            conn = self.conns[name] = _connect(name)
+        return conn
+
+
+class _Transaction:
+    """
+    An explicit multi-statement write transaction on the primary.
+    """
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.tables: set[str] = set()
+
+
+_SCOPE: ContextVar[_RequestScope | None] = ContextVar("db_request_scope", default=None)
+_TXN: ContextVar[_Transaction | None] = ContextVar("db_transaction", default=None)
+
+
+@contextmanager
+def request_scope(label: str = "page", snapshot: bool = False):
+    """
+    Unit of work for a Streamlit rerun.
+
+    Checks out one pooled connection per database (primary and, when
+    configured, replica) and routes every fetch_all / fetch_one /
+    execute_sql / execute_many_sql call made inside the block through it.
+    Works as a context manager or as a decorator on main():
+
+        with request_scope("admin_booths"):
+            main()
+
+    snapshot=True runs reads in one REPEATABLE READ transaction so the whole
+    page sees a consistent view.  A write commits that snapshot, runs in its
+    own (READ COMMITTED) transaction, and the next read starts a fresh
+    snapshot on the primary (so the page always sees its own writes).
+
+    Nested scopes reuse the outer connections.
+    """
+    if _SCOPE.get() is not None:
+        yield
+        return
+
+    scope = _RequestScope(label, snapshot)
+    token = _SCOPE.set(scope)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _QUERY_STATS.record_rerun(label, (time.perf_counter() - started) * 1000)
+        _SCOPE.reset(token)
+        for conn in scope.conns.values():
+            # Writes are committed as they happen; anything still open is reads.
+            if conn.in_transaction():
+                conn.rollback()
+            conn.close()
+
+
+@contextmanager
+def transaction():
+    """
+    Run several helper calls atomically on the primary:
+
+        with transaction():
+            execute_sql(...)
+            row = fetch_one(...)      # sees the uncommitted write
+            execute_many_sql(...)
+
+    Everything inside shares one connection and one transaction; it commits
+    when the block exits and rolls back on error.  Reads inside go to the
+    primary.  Nested calls become savepoints.
+    """
+    txn = _TXN.get()
+    if txn is not None:
+        with txn.conn.begin_nested():
+            yield txn.conn
+        return
+
+    scope = _SCOPE.get()
+    if scope is not None:
+        conn = scope.conn("primary")
+        if conn.in_transaction():
+            # Close the read transaction (or snapshot) first
+            conn.commit()
+    else:
+        conn = _connect("primary")
+
+    txn = _Transaction(conn)
+    token = _TXN.set(txn)
+    try:
+        with conn.begin():
+            yield conn
+    finally:
+        _TXN.reset(token)
+        if scope is None:
+            conn.close()
+        _pin_primary()
+        # Drop anything cached between the write and the commit
+        _CACHE.invalidate(txn.tables)
+
+
+def _begin_snapshot(conn: Connection):
+    conn.begin()
+    conn.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+
+
+@contextmanager
+def _read_conn(target: str | None = None) -> Iterator[Connection]:
+    txn = _TXN.get()
+    if txn is not None:
+        yield txn.conn
+        return
+
+    target = target or _read_target()
+    scope = _SCOPE.get()
+    if scope is None:
+        with _connect(target) as conn:
+            yield conn
+        return
+
+    conn = scope.conn(target)
+    if scope.snapshot and not conn.in_transaction():
+        _begin_snapshot(conn)
+    try:
+        yield conn
+    except Exception:
+        # Leave the shared connection usable for the rest of the rerun
+        conn.rollback()
+        raise
+
+
+@contextmanager
+def _write_conn(tables: set[str] | None = None) -> Iterator[Connection]:
+    txn = _TXN.get()
+    if txn is not None:
+        txn.tables |= tables or set()
+        yield txn.conn
+        return
+
+    try:
+        scope = _SCOPE.get()
+        if scope is None:
+            with _connect("primary") as conn, conn.begin():
+                yield conn
+            return
+
+        conn = scope.conn("primary")
+        if conn.in_transaction():
+            # Close the read transaction (or snapshot) before writing
+            conn.commit()
+        with conn.begin():
+            yield conn
+    finally:
+        _pin_primary()
+
+
+# ==================================================
+# Query result cache
+# ==================================================
+CACHE_TTL_CATALOG = 900     # cookie_years, booths: change a few times a season
+CACHE_TTL_ROSTER = 300      # scouts / parents
+CACHE_MAX_ENTRIES = 256
+
+_TABLE_RE = re.compile(r"\bcookies_app\.(\w+)", re.IGNORECASE)
+_WRITE_TARGET_RE = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?)\s+(?:cookies_app\.)?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def _normalize_sql(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class _QueryCache:
+    """
+    In-process LRU cache of read results with per-entry TTL.
+
+    Entries remember the cookies_app tables their SQL reads, so a write to
+    any of those tables drops them.  Each write also bumps the table's
+    version, for in-process caches that live outside this one.
+    """
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return False, None
+            expires, _tables, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, value
+
+    def put(self, key, value, ttl: float, tables: frozenset[str]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, tables, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, tables: set[str]):
+        if not tables:
+            return
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+            stale = [k for k, (_, t, _) in self._entries.items() if t & tables]
+            for k in stale:
+                del self._entries[k]
+            self.stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def version(self, table: str) -> tuple[int, int]:
+        with self._lock:
+            return self._generation, self._versions.get(table, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
+
+
+_CACHE = _QueryCache()
+
+
+def _cache_key(kind: str, sql: str, params: dict):
+    return (kind, _normalize_sql(sql), _freeze(params))
+
+
+def _tables_read(sql: str) -> frozenset[str]:
+    return frozenset(t.lower() for t in _TABLE_RE.findall(sql))
+
+
+def _tables_written(sql: str) -> set[str]:
+    tables = {t.lower() for t in _WRITE_TARGET_RE.findall(sql)}
+    tables |= {t.lower() for t in _TABLE_RE.findall(sql)}
+    return tables
+
+
+def invalidate_cache(*tables: str):
+    """
+    Drop cached reads for the given cookies_app tables.
+    For writes that bypass execute_sql (engine().begin() blocks); also
+    pins the session to the primary, as the helpers' own writes do.
+    """
+    _CACHE.invalidate({t.lower() for t in tables})
+    _pin_primary()
+
+
+def clear_query_cache():
+    _CACHE.clear()
+
+
+def table_version(table: str) -> tuple[int, int]:
+    """
+    Opaque version of a cookies_app table, changed by every write this
+    process makes to it (and by clear_query_cache).  Lets callers keep
+    their own derived caches and rebuild only when it moves.
+    """
+    return _CACHE.version(table.lower())
+
+
+def query_cache_stats() -> dict:
+    """
+    hits / misses / evictions / invalidations / entries for the admin page.
+    """
+    return _CACHE.snapshot()
+
+
+# ==================================================
+# Query instrumentation
+# ==================================================
+SLOW_QUERY_MS = 250
+SLOW_QUERY_LOG_SIZE = 100
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_THIS_FILE = __file__
+
+
+def _caller() -> tuple[str, str]:
+    """
+    (page, function) for the first frame outside this module.
+    Page is the request_scope label when one is active, otherwise the
+    nearest pages/*.py (or Home.py) on the stack.
+    """
+    scope = _SCOPE.get()
+    page = scope.label if scope is not None else None
+    func = None
+
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if func is None and filename != _THIS_FILE and not filename.endswith("contextlib.py"):
+            func = frame.f_code.co_name
+        path = Path(filename)
+        if page is None and (path.parent.name == "pages" or path.name == "Home.py"):
+            page = path.stem
+        if func is not None and page is not None:
+            break
+        frame = frame.f_back
+
+    return page or "other", func or "?"
+
+
+class _QueryStats:
+    """
+    Per-statement latency histograms, per-page totals and a slow-query log.
+    Optionally captures EXPLAIN ANALYZE plans for slow reads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.explain_enabled = False
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.statements: dict[str, dict] = {}
+            self.pages: dict[str, dict] = {}
+            self.slow_log: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+            self.plans: dict[str, str] = {}
+
+    def _page(self, page: str) -> dict:
+        return self.pages.setdefault(
+            page, {"queries": 0, "db_ms": 0.0, "rows": 0, "reruns": 0, "wall_ms": 0.0,
+                   "timeouts": 0, "cancels": 0}
+        )
+
+    def _statement(self, norm: str, kind: str, func: str) -> dict:
+        st_ = self.statements.get(norm)
+        if st_ is None:
+            st_ = self.statements[norm] = {
+                "kind": kind,
+                "caller": func,
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+                "timeouts": 0,
+                "cancels": 0,
+                "hist": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        return st_
+
+    def record(self, kind: str, sql: str, ms: float, rows: int, page: str, func: str):
+        norm = _normalize_sql(sql)
+        bucket = next(
+            (i for i, edge in enumerate(LATENCY_BUCKETS_MS) if ms <= edge),
+            len(LATENCY_BUCKETS_MS),
+        )
+        with self._lock:
+            st_ = self._statement(norm, kind, func)
+            st_["calls"] += 1
+            st_["total_ms"] += ms
+            st_["max_ms"] = max(st_["max_ms"], ms)
+            st_["rows"] += rows
+            st_["hist"][bucket] += 1
+
+            pg = self._page(page)
+            pg["queries"] += 1
+            pg["db_ms"] += ms
+            pg["rows"] += rows
+
+            if ms >= SLOW_QUERY_MS:
+                self.slow_log.append({
+                    "at": datetime.now(),
+                    "page": page,
+                    "caller": func,
+                    "kind": kind,
+                    "ms": round(ms, 1),
+                    "rows": rows,
+                    "sql": norm,
+                })
+
+    def record_abort(self, kind: str, sql: str, ms: float, reason: str, page: str, func: str):
+        """
+        A statement killed by statement_timeout ("timeout") or a cancel
+        hook ("cancel").  Counted separately from completed calls.
+        """
+        norm = _normalize_sql(sql)
+        counter = "timeouts" if reason == "timeout" else "cancels"
+        with self._lock:
+            self._statement(norm, kind, func)[counter] += 1
+            pg = self._page(page)
+            pg[counter] += 1
+            pg["db_ms"] += ms
+            self.slow_log.append({
+                "at": datetime.now(),
+                "page": page,
+                "caller": func,
+                "kind": f"{kind} ({reason})",
+                "ms": round(ms, 1),
+                "rows": 0,
+                "sql": norm,
+            })
+
+    def record_rerun(self, page: str, wall_ms: float):
+        with self._lock:
+            pg = self._page(page)
+            pg["reruns"] += 1
+            pg["wall_ms"] += wall_ms
+
+    def wants_plan(self, sql: str, ms: float) -> bool:
+        if not self.explain_enabled or ms < SLOW_QUERY_MS:
+            return False
+        head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+        # EXPLAIN ANALYZE executes the statement: never for writes
+        return head in ("SELECT", "WITH") and _normalize_sql(sql) not in self.plans
+
+    def store_plan(self, sql: str, plan: str):
+        with self._lock:
+            self.plans[_normalize_sql(sql)] = plan
+
+
+_QUERY_STATS = _QueryStats()
+
+
+@contextmanager
+def _instrument(kind: str, sql: str):
+    """
+    Time one helper call.  The body sets rec["rows"] and, for reads,
+    rec["conn"]/rec["params"] so a plan can be captured.
+    """
+    rec = {"rows": 0}
+    started = time.perf_counter()
+    yield rec
+    ms = (time.perf_counter() - started) * 1000
+    page, func = _caller()
+    _QUERY_STATS.record(kind, sql, ms, rec["rows"], page, func)
+
+    conn = rec.get("conn")
+    if conn is not None and _QUERY_STATS.wants_plan(sql, ms):
+        try:
+            # EXPLAIN ANALYZE runs the statement again: do it in a savepoint
+            # and roll that back, so neither a failure nor a side effect
+            # (volatile function, data-modifying WITH) reaches the caller's
+            # transaction (transaction() shares this connection)
+            sp = conn.begin_nested()
+            try:
+                plan = conn.execute(
+                    text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), rec.get("params") or {}
+                ).scalars().all()
+            finally:
+                sp.rollback()
+            _QUERY_STATS.store_plan(sql, "\n".join(plan))
+        except Exception as e:
+            _QUERY_STATS.store_plan(sql, f"EXPLAIN failed: {e}")
+
+
+def set_explain_capture(enabled: bool):
+    """
+    Toggle EXPLAIN ANALYZE capture for reads slower than SLOW_QUERY_MS
+    (first occurrence of each statement only).
+    """
+    _QUERY_STATS.explain_enabled = bool(enabled)
+
+
+def explain_capture_enabled() -> bool:
+    return _QUERY_STATS.explain_enabled
+
+
+def reset_query_stats():
+    _QUERY_STATS.reset()
+
+
+def query_stats() -> dict:
+    """
+    Copy of the instrumentation state for the admin page:
+      statements: {sql: {kind, caller, calls, total_ms, max_ms, rows,
+                         timeouts, cancels, hist}}
+      pages:      {page: {queries, db_ms, rows, reruns, wall_ms, timeouts, cancels}}
+      slow_log:   [{at, page, caller, kind, ms, rows, sql}, ...] oldest first
+      plans:      {sql: plan text}
+    """
+    qs = _QUERY_STATS
+    with qs._lock:
+        return {
+            "statements": {k: {**v, "hist": list(v["hist"])} for k, v in qs.statements.items()},
+            "pages": {k: dict(v) for k, v in qs.pages.items()},
+            "slow_log": list(qs.slow_log),
+            "plans": dict(qs.plans),
+        }
+
+
+# ==================================================
+# Statement timeouts and cancellation
+# ==================================================
+_QUERY_CANCELED = "57014"    # SQLSTATE for statement_timeout and pg_cancel
+CANCEL_POLL_SECONDS = 0.1
+HEAVY_QUERY_TIMEOUT_MS = 10_000   # admin summaries / unfiltered scans (< pool_timeout)
+
+
+class QueryTimeout(RuntimeError):
+    """A read ran past its timeout_ms and was stopped by the server."""
+
+
+class QueryCancelled(RuntimeError):
+    """A read was stopped through its cancel hook."""
+
+
+def _set_local_timeout(conn: Connection, timeout_ms: int) -> str:
+    """
+    SET LOCAL statement_timeout for the current transaction; returns the
+    previous value so it can be restored for the rest of the request scope.
+    """
+    return conn.execute(
+        text("""
+            SELECT current_setting('statement_timeout') AS prev,
+                   set_config('statement_timeout', :ms, true)
+        """),
+        {"ms": str(int(timeout_ms))},
+    ).scalar()
+
+
+@contextmanager
+def _statement_guard(conn: Connection, kind: str, sql: str,
+                     timeout_ms: int | None = None, cancel: threading.Event | None = None):
+    """
+    Apply a per-call statement_timeout and watch a cancel Event while the
+    body runs.  Either way Postgres aborts the statement (SQLSTATE 57014),
+    which is re-raised as QueryTimeout / QueryCancelled and counted in
+    query_stats().  No-op for calls without timeout_ms / cancel.
+    """
+    if timeout_ms is None and cancel is None:
+        yield
+        return
+    if conn.dialect.name != "postgresql":
+        yield
+        return
+    if cancel is not None and cancel.is_set():
+        raise QueryCancelled("Query cancelled before it started")
+
+    prev = _set_local_timeout(conn, timeout_ms) if timeout_ms else None
+
+    done = threading.Event()
+    if cancel is not None:
+        dbapi_conn = conn.connection.dbapi_connection
+
+        def watch():
+            while not done.wait(CANCEL_POLL_SECONDS):
+                if cancel.is_set():
+                    dbapi_conn.cancel()
+                    return
+
+        threading.Thread(target=watch, name="db-cancel-watch", daemon=True).start()
+
+    started = time.perf_counter()
+    try:
+        yield
+    except DBAPIError as e:
+        if getattr(e.orig, "pgcode", None) != _QUERY_CANCELED:
+            raise
+        ms = (time.perf_counter() - started) * 1000
+        page, func = _caller()
+        if cancel is not None and cancel.is_set():
+            _QUERY_STATS.record_abort(kind, sql, ms, "cancel", page, func)
+            print(f"[db] {page}/{func}: query cancelled after {ms:.0f} ms")
+            raise QueryCancelled(f"Query in {func} was cancelled after {ms:.0f} ms") from e
+        _QUERY_STATS.record_abort(kind, sql, ms, "timeout", page, func)
+        print(f"[db] {page}/{func}: query hit {timeout_ms} ms statement_timeout")
+        raise QueryTimeout(
+            f"Query in {func} took longer than {timeout_ms / 1000:g}s and was stopped"
+        ) from e
+    finally:
+        done.set()
+
+    if prev is not None:
+        conn.execute(text("SELECT set_config('statement_timeout', :prev, true)"), {"prev": prev})
 
 
 # ==================================================
 # Query helpers
 # ==================================================
-def fetch_all(sql: str, params: dict | None = None):
+def fetch_all(sql: str, params: dict | None = None, ttl: float | None = None,
+              timeout_ms: int | None = None, cancel: threading.Event | None = None):
     """
     Execute SELECT and return list of dict rows.
-    """
-    params = params or {}
-    with engine().connect() as conn:
-        return conn.execute(text(sql), params).mappings().all()
 
+    ttl (seconds) opts the query into the result cache.  Only use it for
+    data that is written through execute_sql / execute_many_sql (or
+    invalidate_cache) so writes drop the cached copy.  Cache misses read
+    from the primary.
 
-def fetch_one(sql: str, params: dict | None = None):
+    timeout_ms sets statement_timeout for this call only and cancel (a
+    threading.Event) stops the query when set; they raise QueryTimeout /
+    QueryCancelled instead of holding the connection.
+    """
+    params = params or {}
+    tables = _tables_read(sql) if ttl else frozenset()
+    if tables:
+        key = _cache_key("all", sql, params)
+        hit, rows = _CACHE.get(key)
+        if hit:
+            return list(rows)
+
+    # Cached results come from the primary: a lagging replica would keep
+    # serving pre-write data for the whole ttl
+    with _read_conn("primary" if tables else None) as conn, _instrument("fetch_all", sql) as rec:
+        with _statement_guard(conn, "fetch_all", sql, timeout_ms, cancel):
+            rows = conn.execute(text(sql), params).mappings().all()
+        rec.update(rows=len(rows), conn=conn, params=params)
+
+    if tables:
+        _CACHE.put(key, tuple(rows), ttl, tables)
+    return rows
+
+
+def fetch_one(sql: str, params: dict | None = None, ttl: float | None = None,
+              timeout_ms: int | None = None, cancel: threading.Event | None = None):
     """
     Execute SELECT and return single row or None.
+    ttl, timeout_ms and cancel work as in fetch_all.
     """
     params = params or {}
-    with engine().connect() as conn:
-        return conn.execute(text(sql), params).mappings().first()
-
-
-def execute_sql(sql: str, params: dict | None = None):
+    tables = _tables_read(sql) if ttl else frozenset()
+    if tables:
+        key = _cache_key("one", sql, params)
+        hit, row = _CACHE.get(key)
+        if hit:
+            return row
+
+    # Cached results come from the primary: a lagging replica would keep
+    # serving pre-write data for the whole ttl
+    with _read_conn("primary" if tables else None) as conn, _instrument("fetch_one", sql) as rec:
+        with _statement_guard(conn, "fetch_one", sql, timeout_ms, cancel):
+            row = conn.execute(text(sql), params).mappings().first()
+        rec.update(rows=int(row is not None), conn=conn, params=params)
+
+    if tables:
+        _CACHE.put(key, row, ttl, tables)
+    return row
+
+
+def execute_sql(sql: str, params: dict | None = None) -> int:
     """
     Execute INSERT / UPDATE / DELETE inside transaction.
+    Returns the number of rows affected.
     """
     params = params or {}
-    with engine().begin() as conn:
-        conn.execute(text(sql), params)
+    try:
+        with _write_conn(_tables_written(sql)) as conn, _instrument("execute_sql", sql) as rec:
+            result = conn.execute(text(sql), params)
+            rec["rows"] = max(result.rowcount, 0)
+    finally:
+        _CACHE.invalidate(_tables_written(sql))
+    return rec["rows"]
+
+def execute_returning(sql: str, params: dict | None = None) -> list:
+    """
+    Execute a write with a RETURNING clause on the primary and return its
+    rows (INSERT ... ON CONFLICT DO NOTHING RETURNING ..., etc.).
+    """
+    params = params or {}
+    try:
+        with _write_conn(_tables_written(sql)) as conn, _instrument("execute_returning", sql) as rec:
+            rows = conn.execute(text(sql), params).mappings().all()
+            rec["rows"] = len(rows)
+    finally:
+        _CACHE.invalidate(_tables_written(sql))
+    return rows
 
 def execute_many_sql(sql: str, params_list: list[dict]):
     """
     Execute bulk INSERT / UPDATE inside a single transaction.
+
+    Plain INSERT ... VALUES statements with more than COPY_THRESHOLD_ROWS
+    rows are loaded with COPY into a temp table and inserted with one
+    INSERT ... SELECT (see _copy_insert); everything else uses executemany.
     """
     if not params_list:
         return
 
-    with engine().begin() as conn:
-        conn.execute(text(sql), params_list)
+    try:
+        with _write_conn(_tables_written(sql)) as conn, _instrument("execute_many_sql", sql) as rec:
+            if not (len(params_list) > COPY_THRESHOLD_ROWS and _copy_insert(conn, sql, params_list)):
+                conn.execute(text(sql), params_list)
+            rec["rows"] = len(params_list)
+    finally:
+        _CACHE.invalidate(_tables_written(sql))
+
+
+# ==================================================
+# Streaming reads (server-side cursor)
+# ==================================================
+STREAM_CHUNK_ROWS = 5000
+
+
+def fetch_iter(sql: str, params: dict | None = None, chunk_size: int = STREAM_CHUNK_ROWS):
+    """
+    Execute SELECT through a named server-side cursor and yield dict rows,
+    holding at most chunk_size rows in memory.
+
+    Uses its own connection (not the request_scope one) so writes made while
+    the caller is iterating can't close the cursor.
+    """
+    params = params or {}
+    with _connect(_read_target()) as conn, _instrument("fetch_iter", sql) as rec:
+        result = conn.execute(
+            text(sql), params, execution_options={"yield_per": chunk_size}
+        )
+        for part in result.mappings().partitions(chunk_size):
+            rec["rows"] += len(part)
+            yield from part
+
+
+def fetch_df_chunks(sql: str, params: dict | None = None, chunk_size: int = STREAM_CHUNK_ROWS):
+    """
+    Like fetch_iter but yields pandas DataFrames of up to chunk_size rows.
+    No chunks are yielded for an empty result.
+    """
+    params = params or {}
+    with _connect(_read_target()) as conn, _instrument("fetch_df_chunks", sql) as rec:
+        result = conn.execute(
+            text(sql), params, execution_options={"yield_per": chunk_size}
+        )
+        columns = list(result.keys())
+        for part in result.partitions(chunk_size):
+            rec["rows"] += len(part)
+            yield pd.DataFrame.from_records(part, columns=columns)
+
+
+# ==================================================
+# Typed DataFrame reads
+# ==================================================
+# Low-cardinality text columns that become pandas categoricals
+CATEGORY_COLUMNS = {
+    "order_type", "orderType",
+    "status", "orderStatus", "order_status",
+    "cookie_code", "cookieCode",
+    "order_source", "event_type", "payment_method",
+}
+
+# psycopg2 type_code (Postgres OID) -> pandas dtype
+_PG_DTYPES = {
+    16: "boolean",      # bool
+    21: "Int16",        # int2
+    23: "Int32",        # int4 (quantities, program_year)
+    20: "Int64",        # int8 (SUM/COUNT)
+    700: "float32",     # float4
+    701: "float64",     # float8
+    1700: "float64",    # numeric (money)
+}
+_PG_DATE, _PG_TIMESTAMP, _PG_TIMESTAMPTZ, _PG_UUID = 1082, 1114, 1184, 2950
+
+
+def _typed_column(name: str, values: list, type_code) -> pd.Series:
+    if name in CATEGORY_COLUMNS:
+        return pd.Series(values, dtype="category")
+    if type_code in (_PG_DATE, _PG_TIMESTAMP):
+        return pd.to_datetime(pd.Series(values, dtype=object))
+    if type_code == _PG_TIMESTAMPTZ:
+        return pd.to_datetime(pd.Series(values, dtype=object), utc=True)
+    if type_code == _PG_UUID:
+        return pd.Series([None if v is None else str(v) for v in values], dtype=object)
+    if type_code == 1700:
+        values = [None if v is None else float(v) for v in values]
+    dtype = _PG_DTYPES.get(type_code)
+    return pd.Series(values, dtype=dtype or object)
+
+
+def fetch_df(
+    sql: str,
+    params: dict | None = None,
+    dtypes: dict[str, str] | None = None,
+    chunk_size: int = STREAM_CHUNK_ROWS,
+    timeout_ms: int | None = None,
+    cancel: threading.Event | None = None,
+) -> pd.DataFrame:
+    """
+    Execute SELECT straight into a typed DataFrame.
+
+    Rows are pulled through a server-side cursor a chunk at a time and
+    appended to per-column buffers, so no list of row objects is ever built.
+    Columns are typed from the Postgres column type:
+      bool -> boolean, int -> nullable Int16/32/64, numeric -> float64,
+      date/timestamp -> datetime64 (timestamptz in UTC), uuid -> str,
+      CATEGORY_COLUMNS (order_type, status, cookie_code, ...) -> category.
+    dtypes overrides the mapping per column (anything astype accepts).
+    timeout_ms and cancel work as in fetch_all.
+    """
+    params = params or {}
+    with _read_conn() as conn, _instrument("fetch_df", sql) as rec:
+        with _statement_guard(conn, "fetch_df", sql, timeout_ms, cancel):
+            result = conn.execute(
+                text(sql), params, execution_options={"yield_per": chunk_size}
+            )
+            df = _result_df(result, rec, chunk_size)
+
+    if dtypes:
+        df = df.astype({k: v for k, v in dtypes.items() if k in df.columns})
+    return df
+
+
+def _result_df(result, rec: dict, chunk_size: int = STREAM_CHUNK_ROWS) -> pd.DataFrame:
+    """Drain a result into per-column buffers and type them (see fetch_df)."""
+    names = list(result.keys())
+    buffers: list[list] = [[] for _ in names]
+    type_codes = [None] * len(names)
+
+    for part in result.partitions(chunk_size):
+        if rec["rows"] == 0 and result.cursor is not None and result.cursor.description:
+            type_codes = [d[1] for d in result.cursor.description]
+        rec["rows"] += len(part)
+        for buf, col in zip(buffers, zip(*part)):
+            buf.extend(col)
+
+    return pd.DataFrame({
+        name: _typed_column(name, buf, code)
+        for name, buf, code in zip(names, buffers, type_codes)
+    })
+
+
+# Temp tables are per connection, so one fixed name is enough (and keeps
+# the query text, and so its stats entry, the same on every call)
+_STAGE_TABLE = "_staged_rows"
+
+
+def fetch_df_staged(
+    sql: str,
+    frame: pd.DataFrame,
+    columns: dict[str, str],
+    params: dict | None = None,
+    timeout_ms: int | None = None,
+) -> pd.DataFrame:
+    """
+    fetch_df for a query that joins against an in-memory frame.
+
+    frame[columns] (name -> Postgres type) is COPYed into a temp table and
+    {staged} in sql is replaced with its name, so the comparison runs as a
+    set-based join in the database instead of shipping ids back and forth.
+    Staging, the query and cleanup share one primary connection (temp
+    tables can't be created on a replica) and one transaction.
+    """
+    sql = sql.replace("{staged}", _STAGE_TABLE)
+    params = params or {}
+    cols = list(columns)
+    with _read_conn("primary") as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {_STAGE_TABLE}"))
+        conn.execute(text(
+            f"CREATE TEMP TABLE {_STAGE_TABLE} ({', '.join(f'{c} {t}' for c, t in columns.items())}) ON COMMIT DROP"
+        ))
+        _copy_rows(conn, _STAGE_TABLE, cols, zip(*(frame[c].tolist() for c in cols)))
+        conn.execute(text(f"ANALYZE {_STAGE_TABLE}"))
+        with _instrument("fetch_df_staged", sql) as rec:
+            with _statement_guard(conn, "fetch_df_staged", sql, timeout_ms, None):
+                df = _result_df(conn.execute(text(sql), params), rec)
+            rec.update(conn=conn, params=params)
+        # After _instrument, so a slow-query EXPLAIN still finds the table
+        conn.execute(text(f"DROP TABLE {_STAGE_TABLE}"))
+    return df
+
+
+# ==================================================
+# COPY bulk loader
+# ==================================================
+COPY_THRESHOLD_ROWS = 1000
+
+_INSERT_VALUES_RE = re.compile(
+    r"^\s*INSERT\s+INTO\s+([\w.]+)\s*\((.*?)\)\s*VALUES\s*\((.*)\)\s*(ON\s+CONFLICT\b.*)?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_PARAM_RE = re.compile(r"(?<!:):(\w+)")
+
+
+def _split_top_level(expr: str) -> list[str]:
+    """
+    Split a VALUES / column list on commas that are not inside
+    parentheses or quotes.
+    """
+    parts, depth, quote, buf = [], 0, None, []
+    for ch in expr:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append("".join(buf).strip())
+            buf = []
+            continue
+        buf.append(ch)
+    parts.append("".join(buf).strip())
+    return parts
+
+
+def _copy_plan(sql: str) -> dict | None:
+    """
+    Work out how to run an INSERT ... VALUES (...) as COPY + INSERT ... SELECT.
+
+    Returns None when the statement is not a single-row VALUES insert whose
+    parameters each map straight onto one target column (params buried in
+    expressions like make_date(:year, 1, 5) can't be typed from the target).
+    """
+    m = _INSERT_VALUES_RE.match(sql)
+    if not m:
+        return None
+
+    table, col_sql, values_sql, tail = m.groups()
+    cols = _split_top_level(col_sql)
+    values = _split_top_level(values_sql)
+    if len(cols) != len(values):
+        return None
+
+    param_cols: dict[str, str] = {}
+    select_items = []
+    for col, val in zip(cols, values):
+        direct = re.fullmatch(r":(\w+)", val)
+        if direct:
+            param_cols.setdefault(direct.group(1), col)
+            select_items.append(f"t.{direct.group(1)}")
+        elif _PARAM_RE.search(val):
+            return None
+        else:
+            select_items.append(val)
+
+    if not param_cols or (tail and _PARAM_RE.search(tail)):
+        return None
+
+    return {
+        "table": table,
+        "cols": cols,
+        "param_cols": param_cols,
+        "select_items": select_items,
+        "tail": tail or "",
+    }
+
+
+def _copy_value(v) -> str:
+    # CSV COPY: unquoted empty = NULL, quoted anything = literal text
+    if v is None or v is pd.NaT or v is pd.NA or (isinstance(v, float) and v != v):
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        # executemany let Postgres cast 12.0 into integer columns; COPY won't
+        v = int(v)
+    return '"' + str(v).replace('"', '""') + '"'
+
+
+def _copy_rows(conn: Connection, table: str, cols: list[str], rows) -> None:
+    """COPY FROM STDIN (CSV) an iterable of value sequences into table(cols)."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(_copy_value(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv)", buf
+        )
+    finally:
+        cursor.close()
+
+
+def _copy_insert(conn: Connection, sql: str, params_list: list[dict]) -> bool:
+    """
+    Stream params_list through COPY FROM STDIN into a temp table shaped like
+    the target columns, then INSERT ... SELECT in one statement.
+    Runs inside the caller's transaction.  Returns False (and does nothing)
+    when the statement or dialect doesn't qualify.
+    """
+    if conn.dialect.name != "postgresql":
+        return False
+    plan = _copy_plan(sql)
+    if plan is None:
+        return False
+
+    params = list(plan["param_cols"])
+    keys = set(params)
+    if not all(p.keys() == keys for p in params_list):
+        return False
+
+    tmp = f"_bulk_{uuid.uuid4().hex[:12]}"
+    conn.execute(text(f"""
+        CREATE TEMP TABLE {tmp} ON COMMIT DROP AS
+        SELECT {", ".join(f"{col} AS {p}" for p, col in plan["param_cols"].items())}
+        FROM {plan["table"]}
+        WITH NO DATA
+    """))
+
+    _copy_rows(conn, tmp, params, ([row[p] for p in params] for row in params_list))
+
+    conn.execute(text(f"""
+        INSERT INTO {plan["table"]} ({", ".join(plan["cols"])})
+        SELECT {", ".join(plan["select_items"])}
+        FROM {tmp} t
+        {plan["tail"]}
+    """))
+    conn.execute(text(f"DROP TABLE {tmp}"))
+    return True
 
 
 
@@ -0,0 +1,421 @@
+import csv
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+# ==================================================
+# Digital Cookie export parsing
+# ==================================================
+DOC_CHUNK_ROWS = 5_000
+DOC_PARSE_CACHE_SIZE = 1
+
+# Export header -> import column.  Exports name the box count and subtotal
+# differently between seasons; when a file carries both, the first one wins.
+DOC_COLUMN_MAP = {
+    "Order Number": "external_order_id",
+    "Order Date": "submit_dt",
+
+    "Girl First Name": "scout_first_name",
+    "Girl Last Name": "scout_last_name",
+    "Girl GSUSAID": "scout_gsusa_id",
+
+    "Order Type": "order_type",
+    "Order Status": "order_status",
+    "Customer Name": "customer_name",
+    "Customer Email": "customer_email",
+    "Customer First Name": "customer_first_name",
+    "Customer Last Name": "customer_last_name",
+    "Order Total": "order_total",
+    "Quantity": "order_qty_boxes",
+    "Total": "order_amount",
+    "Original Cookie Subtotal": "order_amount",
+    "Total Packages (Excluding Donation)": "order_qty_boxes",
+}
+
+# eBudde "All DOC Orders" report header -> column.  Cookie columns carry
+# eBudde's abbreviations and map straight to cookie codes (OpC = donations).
+EBUDDE_COLUMN_MAP = {
+    "Order Number": "external_order_id",
+    "Order #": "external_order_id",
+    "DOC Order Number": "external_order_id",
+    "Order Date": "submit_dt",
+
+    "Girl First Name": "scout_first_name",
+    "Girl Last Name": "scout_last_name",
+    "Girl GSUSAID": "scout_gsusa_id",
+    "Girl GSUSA ID": "scout_gsusa_id",
+
+    "Order Type": "order_type",
+    "Order Status": "order_status",
+    "Total Pkgs": "order_qty_boxes",
+    "Total Packages": "order_qty_boxes",
+    "Total $": "order_amount",
+    "Total Amount": "order_amount",
+
+    "Adf": "ADV",
+    "Adv": "ADV",
+    "LmUp": "LEM",
+    "Tre": "TRE",
+    "DSD": "DSD",
+    "Sam": "SAM",
+    "Tags": "TAG",
+    "Tmint": "TM",
+    "TMint": "TM",
+    "Exp": "EXP",
+    "Toff": "TOF",
+    "OpC": "DON",
+}
+
+_DOC_ID_COLS = ("external_order_id", "scout_gsusa_id")
+_DOC_DATE_COLS = ("submit_dt",)
+_DOC_NUMERIC_COLS = ("order_total", "order_qty_boxes", "order_amount")
+_DOC_TEXT_COLS = (
+    "scout_first_name", "scout_last_name", "order_type", "order_status",
+    "customer_name", "customer_email", "customer_first_name", "customer_last_name",
+)
+
+
+def normalize_column_names(headers, column_map: dict = DOC_COLUMN_MAP) -> list[str | None]:
+    """
+    Import column names for an export header row (column_map; other
+    headers, e.g. cookie display names, pass through).  Blank and repeated
+    names come back as None so their cells are dropped.
+    """
+    names, seen = [], set()
+    for h in headers:
+        name = column_map.get(str(h).strip(), str(h).strip()) if h is not None else None
+        if not name or name in seen:
+            names.append(None)
+            continue
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _id_str(v):
+    if v is None:
+        return None
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    return str(v).strip() or None
+
+
+def _typed_chunk(rows: list[tuple], names: list[str | None]) -> pd.DataFrame:
+    keep = [i for i, n in enumerate(names) if n]
+    frame = pd.DataFrame(
+        {names[i]: [r[i] if i < len(r) else None for r in rows] for i in keep}
+    )
+    for col in frame.columns:
+        if col in _DOC_ID_COLS:
+            frame[col] = pd.Series([_id_str(v) for v in frame[col].tolist()], dtype=object)
+        elif col in _DOC_DATE_COLS:
+            frame[col] = pd.to_datetime(frame[col], errors="coerce")
+        elif col in _DOC_NUMERIC_COLS:
+            frame[col] = pd.to_numeric(frame[col], errors="coerce")
+        elif col not in _DOC_TEXT_COLS:
+            # Cookie quantity columns (CSV cells arrive as text); a pass-through
+            # column with no numbers in it at all is left as text
+            numbers = pd.to_numeric(frame[col], errors="coerce")
+            if numbers.notna().any() or frame[col].isna().all():
+                frame[col] = numbers
+    return frame.infer_objects()
+
+
+@contextmanager
+def _sheet_rows(data: bytes) -> Iterator[Iterator[tuple]]:
+    """Rows of an upload: the first sheet of an .xlsx, or a CSV file."""
+    if not data.startswith(b"PK"):
+        # Not a zip archive, so not .xlsx: read it as CSV (blank cells = None)
+        reader = csv.reader(io.StringIO(data.decode("utf-8-sig")))
+        yield (tuple(v if v != "" else None for v in row) for row in reader)
+        return
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        yield wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_doc_chunks(data: bytes, chunk_rows: int = DOC_CHUNK_ROWS,
+                    column_map: dict = DOC_COLUMN_MAP) -> Iterator[pd.DataFrame]:
+    """
+    Stream a Digital Cookie .xlsx export (or another report, given its
+    column_map) as typed DataFrames of up to chunk_rows rows, columns
+    already normalized.  openpyxl read-only mode keeps memory to one chunk
+    however big the export, for callers that consume the chunks as they
+    come; blank rows are skipped.
+    """
+    with _sheet_rows(data) as rows:
+        header = next(rows, None)
+        if header is None:
+            yield pd.DataFrame()
+            return
+        names = normalize_column_names(header, column_map)
+
+        buf, yielded = [], False
+        for row in rows:
+            if all(v is None or v == "" for v in row):
+                continue
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield _typed_chunk(buf, names)
+                buf, yielded = [], True
+        # An export with no orders still yields its (empty) columns
+        if buf or not yielded:
+            yield _typed_chunk(buf, names)
+
+
+class _ParseCache:
+    """Parsed exports by content hash, LRU, so wizard reruns skip the parse."""
+    def __init__(self, max_entries: int = DOC_PARSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is not None:
+                self._entries.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        with self._lock:
+            self._entries[key] = frame
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_PARSED = _ParseCache()
+
+
+def _parse_cached(kind: str, data: bytes, column_map: dict) -> pd.DataFrame:
+    key = (kind, hashlib.sha256(data).hexdigest())
+    frame = _PARSED.get(key)
+    if frame is None:
+        frame = pd.concat(list(iter_doc_chunks(data, column_map=column_map)), ignore_index=True)
+        _PARSED.put(key, frame)
+    return frame.copy(deep=False)
+
+
+def parse_doc_export(data: bytes) -> pd.DataFrame:
+    """
+    The whole export as one DataFrame (see iter_doc_chunks), parsed once
+    per distinct upload.  Only the parse is bounded: the result holds every
+    row, and the most recent upload stays cached.  Callers get their own
+    frame object and may add or replace columns, but must not edit values
+    in place.
+    """
+    return _parse_cached("doc", data, DOC_COLUMN_MAP)
+
+
+def parse_ebudde_report(data: bytes) -> pd.DataFrame:
+    """
+    eBudde's "All DOC Orders" report (.xlsx or .csv) as one DataFrame with
+    DOC export column names and cookie-code columns (EBUDDE_COLUMN_MAP).
+    Cached like parse_doc_export.
+    """
+    return _parse_cached("ebudde", data, EBUDDE_COLUMN_MAP)
+
+
+# ==================================================
+# Scout matching
+# ==================================================
+FUZZY_AUTO_ACCEPT = 0.90    # fuzzy matches at or above this import without review
+FUZZY_SUGGEST = 0.70        # below this the review queue offers no suggestion
+FUZZY_MARGIN = 0.05         # the best candidate must beat the runner-up by this
+
+MATCH_GSUSA = "gsusa"
+MATCH_NAME = "name"
+MATCH_ALIAS = "alias"
+MATCH_FUZZY = "fuzzy"
+
+_KEY_COLS = ["scout_first_name", "scout_last_name", "scout_gsusa_id"]
+
+
+def normalize_name(names: pd.Series) -> pd.Series:
+    """Lower-case ASCII letters and digits only ("Zoë O'Neil-Smith" -> "zoeoneilsmith")."""
+    return (
+        names.fillna("").astype(str)
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", "", regex=True)
+    )
+
+
+def alias_key(first: pd.Series, last: pd.Series) -> pd.Series:
+    """scout_aliases.alias_name for export names: normalized "first last"."""
+    return normalize_name(first) + " " + normalize_name(last)
+
+
+@dataclass
+class ScoutMatches:
+    # Export rows plus scout_id, parent_id, match_method and match_confidence
+    # (scout_id is NaN where nothing matched)
+    orders: pd.DataFrame
+    # One row per unresolved normalized name (alias_name): scout_first_name,
+    # scout_last_name, scout_name, order_count, suggested_scout_id, confidence
+    review: pd.DataFrame
+    # (scout_id, gsusa_id) for scouts without one that matched by exact name / alias
+    gsusa_updates: list[tuple] = field(default_factory=list)
+
+
+def _length_cap(a: pd.Series, b: pd.Series) -> np.ndarray:
+    """Upper bound on SequenceMatcher.ratio from lengths alone (real_quick_ratio)."""
+    la, lb = a.str.len().to_numpy(), b.str.len().to_numpy()
+    return 2 * np.minimum(la, lb) / np.maximum(la + lb, 1)
+
+
+def _similarity(a: pd.Series, b: pd.Series) -> np.ndarray:
+    """SequenceMatcher ratio per row, computed once per distinct pair."""
+    frame = pd.DataFrame({"a": a.to_numpy(), "b": b.to_numpy()})
+    distinct = frame.drop_duplicates()
+    distinct["r"] = [SequenceMatcher(None, x, y).ratio() for x, y in zip(distinct["a"], distinct["b"])]
+    return frame.merge(distinct, on=["a", "b"], how="left")["r"].to_numpy()
+
+
+def _fuzzy_candidates(keys: pd.DataFrame, scouts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Best scout per unresolved key with its score (0.4 first name + 0.6 last
+    name similarity) and the runner-up's.  Candidates are blocked on a
+    shared first letter of the last name or of the first name, so one typo
+    still finds its scout without scoring every pair; pairs that cannot
+    reach FUZZY_SUGGEST are dropped before the first-name scoring.
+    """
+    empty = pd.DataFrame(columns=["key_id", "scout_id", "score", "runner_up"])
+    left = keys.assign(bl=keys["nl"].str[:1], bf=keys["nf"].str[:1])
+    right = scouts.assign(bl=scouts["nl"].str[:1], bf=scouts["nf"].str[:1])
+    pairs = pd.concat([
+        left.merge(right, on="bl", suffixes=("", "_s")),
+        left.merge(right, on="bf", suffixes=("", "_s")),
+    ], ignore_index=True).drop_duplicates(["key_id", "scout_id"])
+
+    cap = 0.4 * _length_cap(pairs["nf"], pairs["nf_s"]) + 0.6 * _length_cap(pairs["nl"], pairs["nl_s"])
+    pairs = pairs[cap >= FUZZY_SUGGEST]
+    if pairs.empty:
+        return empty
+
+    last = 0.6 * _similarity(pairs["nl"], pairs["nl_s"])
+    keep = last + 0.4 >= FUZZY_SUGGEST
+    pairs = pairs[keep]
+    if pairs.empty:
+        return empty
+    pairs = pairs.assign(score=last[keep] + 0.4 * _similarity(pairs["nf"], pairs["nf_s"]))
+
+    ranked = pairs.sort_values(["key_id", "score"], ascending=[True, False])
+    ranked["rank"] = ranked.groupby("key_id").cumcount()
+    best = ranked[ranked["rank"] == 0].set_index("key_id")
+    runner_up = ranked[ranked["rank"] == 1].set_index("key_id")["score"]
+    best = best.assign(runner_up=runner_up.reindex(best.index).fillna(0.0))
+    return best.reset_index()[["key_id", "scout_id", "score", "runner_up"]]
+
+
+def match_scouts(orders: pd.DataFrame, scouts, aliases: dict | None = None) -> ScoutMatches:
+    """
+    Resolve each export row to a scout, in order of trust:
+    GSUSA id, exact normalized name, scout_aliases, then a blocked fuzzy
+    match on first / last name.  Work is done once per distinct export
+    name, not per order.  Names still unresolved (or fuzzy below
+    FUZZY_AUTO_ACCEPT) land in the review queue.
+    """
+    scouts_df = pd.DataFrame(
+        [dict(s) for s in scouts],
+        columns=["scout_id", "first_name", "last_name", "gsusa_id", "parent_id"],
+    )
+    scouts_df["nf"] = normalize_name(scouts_df["first_name"])
+    scouts_df["nl"] = normalize_name(scouts_df["last_name"])
+
+    orders = orders.copy()
+    if "scout_gsusa_id" not in orders.columns:
+        orders["scout_gsusa_id"] = None
+
+    keys = orders[_KEY_COLS].drop_duplicates().reset_index(drop=True)
+    keys["key_id"] = keys.index
+    keys["nf"] = normalize_name(keys["scout_first_name"])
+    keys["nl"] = normalize_name(keys["scout_last_name"])
+    keys["alias_name"] = keys["nf"] + " " + keys["nl"]
+    keys["scout_id"] = None
+    keys["match_method"] = None
+    keys["match_confidence"] = np.nan
+
+    def _fill(found: pd.Series, method: str, confidence):
+        hit = keys["scout_id"].isna() & found.notna()
+        if not hit.any():
+            return
+        keys.loc[hit, "scout_id"] = found[hit]
+        keys.loc[hit, "match_method"] = method
+        keys.loc[hit, "match_confidence"] = (
+            confidence[hit].astype(float) if isinstance(confidence, pd.Series) else confidence
+        )
+
+    # 1. GSUSA id (ids held by two scouts are ambiguous and skipped)
+    by_gsusa = scouts_df.dropna(subset=["gsusa_id"]).drop_duplicates("gsusa_id", keep=False)
+    _fill(keys["scout_gsusa_id"].map(by_gsusa.set_index("gsusa_id")["scout_id"]), MATCH_GSUSA, 1.0)
+
+    # 2. Exact normalized name (same-name scouts are ambiguous and skipped)
+    by_name = scouts_df.drop_duplicates(["nf", "nl"], keep=False)
+    named = keys[["nf", "nl"]].merge(by_name[["nf", "nl", "scout_id"]], on=["nf", "nl"], how="left")
+    _fill(pd.Series(named["scout_id"].to_numpy(), index=keys.index), MATCH_NAME, 1.0)
+
+    # 3. Aliases saved from earlier reviews
+    if aliases:
+        _fill(keys["alias_name"].map(pd.Series(aliases, dtype=object)), MATCH_ALIAS, 1.0)
+
+    # 4. Fuzzy, blocked on initials
+    open_keys = keys[keys["scout_id"].isna() & (keys["nf"] + keys["nl"] != "")]
+    best = _fuzzy_candidates(open_keys[["key_id", "nf", "nl"]], scouts_df[["scout_id", "nf", "nl"]])
+    best = best.set_index("key_id").reindex(keys.index)
+    accept = (best["score"] >= FUZZY_AUTO_ACCEPT) & (best["score"] - best["runner_up"] >= FUZZY_MARGIN)
+    _fill(best["scout_id"].where(accept), MATCH_FUZZY, best["score"])
+
+    # Back onto the orders; parent follows the scout
+    orders = orders.merge(
+        keys[_KEY_COLS + ["alias_name", "scout_id", "match_method", "match_confidence"]],
+        on=_KEY_COLS, how="left", suffixes=("_export", ""),
+    )
+    orders["parent_id"] = orders["scout_id"].map(scouts_df.set_index("scout_id")["parent_id"])
+
+    # Review queue: one row per unresolved normalized name, with the best
+    # fuzzy guess when it is worth offering
+    counts = orders.loc[orders["scout_id"].isna()].groupby("alias_name").size()
+    review = keys[keys["scout_id"].isna()].drop_duplicates("alias_name")
+    guess = best.loc[review.index]
+    suggest = guess["score"] >= FUZZY_SUGGEST
+    review = pd.DataFrame({
+        "scout_first_name": review["scout_first_name"],
+        "scout_last_name": review["scout_last_name"],
+        "scout_name": (
+            review["scout_first_name"].fillna("").astype(str) + " "
+            + review["scout_last_name"].fillna("").astype(str)
+        ).str.strip(),
+        "alias_name": review["alias_name"],
+        "order_count": review["alias_name"].map(counts).fillna(0).astype(int),
+        "suggested_scout_id": guess["scout_id"].where(suggest),
+        "confidence": guess["score"].where(suggest),
+    }).sort_values("scout_name").reset_index(drop=True)
+
+    # GSUSA ids to record: trusted matches only, one id per scout, unused elsewhere
+    trusted = orders[
+        orders["match_method"].isin([MATCH_NAME, MATCH_ALIAS]) & orders["scout_gsusa_id"].notna()
+    ]
+    missing = set(scouts_df.loc[scouts_df["gsusa_id"].isna(), "scout_id"])
+    taken = set(scouts_df["gsusa_id"].dropna())
+    ids = trusted.groupby("scout_id")["scout_gsusa_id"].unique()
+    gsusa_updates = [
+        (sid, vals[0]) for sid, vals in ids.items()
+        if sid in missing and len(vals) == 1 and vals[0] not in taken
+    ]
+
+    return ScoutMatches(orders=orders, review=review, gsusa_updates=gsusa_updates)
@@ -0,0 +1,308 @@
+"""
+Background import jobs.
+
+A job is written to cookies_app.import_jobs with its work already split
+into batches (cookies_app.import_job_batches).  A worker thread claims
+queued jobs and applies one batch per transaction, committing the batch's
+done_at and the job's progress with the data, so a page rerun or browser
+disconnect never leaves half an import behind.  A job whose worker died
+(no heartbeat for JOB_STALE_SECONDS) is claimed again and continues from
+its first open batch.
+
+    python -m utils.job_utils            # run queued jobs, then exit
+    python -m utils.job_utils --worker   # keep polling for jobs
+"""
+import json
+import sys
+import threading
+
+import pandas as pd
+
+from utils.db_utils import transaction, execute_sql, execute_returning, fetch_all, fetch_one
+from utils.order_utils import apply_doc_import
+
+
+# ==================================================
+# Settings
+# ==================================================
+JOB_BATCH_ROWS = 500        # orders per committed batch
+JOB_POLL_SECONDS = 2.0      # idle worker checks for new / stale jobs
+JOB_STALE_SECONDS = 300     # running job without a heartbeat this long is resumed
+
+JOB_DOC_IMPORT = "doc_import"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Columns the import writes as timestamps (JSON carries them as ISO text)
+_DATETIME_COLS = ("submit_dt", "created_at")
+
+
+# ==================================================
+# Batch payloads
+# ==================================================
+def _frame_payload(frame: pd.DataFrame) -> dict:
+    """
+    Wide order frame -> JSON-safe dict of columns + row values (keeps the
+    column order, and duplicate names, of the frame).
+    """
+    data = frame.to_json(orient="values", date_format="iso", date_unit="s", default_handler=str)
+    return {"columns": list(frame.columns), "data": json.loads(data)}
+
+
+def _payload_frame(payload: dict) -> pd.DataFrame:
+    frame = pd.DataFrame(payload["data"], columns=payload["columns"])
+    for col in _DATETIME_COLS:
+        if col in frame.columns:
+            frame[col] = pd.to_datetime(frame[col])
+    return frame
+
+
+def _doc_import_batches(new_orders: pd.DataFrame, item_updates: list[dict] | None) -> list[dict]:
+    """One payload per JOB_BATCH_ROWS orders; quantity updates ride on the last one."""
+    batches = [
+        {"orders": _frame_payload(new_orders.iloc[start:start + JOB_BATCH_ROWS])}
+        for start in range(0, len(new_orders), JOB_BATCH_ROWS)
+    ] or [{"orders": _frame_payload(new_orders.iloc[0:0])}]
+    if item_updates:
+        batches[-1]["item_updates"] = item_updates
+    return batches
+
+
+def _run_doc_import_batch(payload: dict) -> int:
+    created = apply_doc_import(_payload_frame(payload["orders"]), payload.get("item_updates"))
+    return len(created)
+
+
+# job_type -> function applying one batch payload inside the batch transaction
+_BATCH_HANDLERS = {
+    JOB_DOC_IMPORT: _run_doc_import_batch,
+}
+
+
+# ==================================================
+# Submit + status
+# ==================================================
+def _submit_job(job_type: str, batches: list[dict], program_year: int | None,
+                created_by: str | None) -> str:
+    with transaction():
+        job = execute_returning("""
+            INSERT INTO cookies_app.import_jobs (job_type, program_year, total_batches, created_by)
+            VALUES (:job_type, :year, :total, :created_by)
+            RETURNING job_id
+        """, {"job_type": job_type, "year": program_year, "total": len(batches), "created_by": created_by})
+        job_id = str(job[0]["job_id"])
+        for batch_no, payload in enumerate(batches):
+            execute_sql("""
+                INSERT INTO cookies_app.import_job_batches (job_id, batch_no, payload)
+                VALUES (:job_id, :batch_no, CAST(:payload AS jsonb))
+            """, {"job_id": job_id, "batch_no": batch_no, "payload": json.dumps(payload)})
+
+    print(f"[jobs] queued {job_type} job {job_id} ({len(batches)} batch(es))")
+    _WORKER.start()
+    _WORKER.wake()
+    return job_id
+
+
+def submit_doc_import_job(new_orders: pd.DataFrame, item_updates: list[dict] | None = None,
+                          program_year: int | None = None, created_by: str | None = None) -> str:
+    """
+    Queue a DOC import (the arguments apply_doc_import takes) for the
+    background worker and return its job_id.  Each batch of orders is
+    created atomically; poll get_import_job for progress.
+    """
+    return _submit_job(JOB_DOC_IMPORT, _doc_import_batches(new_orders, item_updates),
+                       program_year, created_by)
+
+
+_JOB_COLS = """
+    job_id, job_type, program_year, status, total_batches, done_batches,
+    created_rows, error, created_by, created_at, started_at, heartbeat_at, finished_at
+"""
+
+
+def get_import_job(job_id: str) -> dict | None:
+    return fetch_one(f"""
+        SELECT {_JOB_COLS}
+        FROM cookies_app.import_jobs
+        WHERE job_id = CAST(:job_id AS uuid)
+    """, {"job_id": str(job_id)})
+
+
+def list_import_jobs(job_type: str | None = None, limit: int = 10) -> list[dict]:
+    return fetch_all(f"""
+        SELECT {_JOB_COLS}
+        FROM cookies_app.import_jobs
+        WHERE (CAST(:job_type AS text) IS NULL OR job_type = :job_type)
+        ORDER BY created_at DESC
+        LIMIT :limit
+    """, {"job_type": job_type, "limit": limit})
+
+
+def retry_import_job(job_id: str) -> bool:
+    """Queue a failed job again; it continues from its first open batch."""
+    updated = execute_sql("""
+        UPDATE cookies_app.import_jobs
+        SET status = :queued, error = NULL, finished_at = NULL
+        WHERE job_id = CAST(:job_id AS uuid)
+          AND status = :failed
+    """, {"job_id": str(job_id), "queued": JOB_QUEUED, "failed": JOB_FAILED})
+    if updated:
+        _WORKER.start()
+        _WORKER.wake()
+    return bool(updated)
+
+
+# ==================================================
+# Running jobs
+# ==================================================
+def _claim_job() -> dict | None:
+    """
+    Take the oldest queued job, or a running one whose worker stopped
+    sending heartbeats.  SKIP LOCKED keeps two workers off the same job.
+    """
+    rows = execute_returning("""
+        UPDATE cookies_app.import_jobs j
+        SET status = :running,
+            started_at = COALESCE(j.started_at, now()),
+            heartbeat_at = now()
+        WHERE j.job_id = (
+            SELECT job_id
+            FROM cookies_app.import_jobs
+            WHERE status = :queued
+               OR (status = :running AND heartbeat_at < now() - make_interval(secs => :stale))
+            ORDER BY created_at
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING j.job_id, j.job_type, j.done_batches, j.total_batches
+    """, {"running": JOB_RUNNING, "queued": JOB_QUEUED, "stale": JOB_STALE_SECONDS})
+    return dict(rows[0]) if rows else None
+
+
+def _run_batch(job_id: str, batch_no: int, handler) -> None:
+    """
+    Apply one batch and record it in the same transaction.  The done_at
+    update locks the batch row first, so a batch another worker already
+    committed is skipped rather than applied twice.
+    """
+    with transaction():
+        claimed = execute_returning("""
+            UPDATE cookies_app.import_job_batches
+            SET done_at = now()
+            WHERE job_id = CAST(:job_id AS uuid)
+              AND batch_no = :batch_no
+              AND done_at IS NULL
+            RETURNING payload
+        """, {"job_id": job_id, "batch_no": batch_no})
+        if not claimed:
+            return
+
+        created = handler(claimed[0]["payload"])
+        execute_sql("""
+            UPDATE cookies_app.import_job_batches
+            SET created_rows = :created
+            WHERE job_id = CAST(:job_id AS uuid) AND batch_no = :batch_no
+        """, {"job_id": job_id, "batch_no": batch_no, "created": created})
+        execute_sql("""
+            UPDATE cookies_app.import_jobs
+            SET done_batches = done_batches + 1,
+                created_rows = created_rows + :created,
+                heartbeat_at = now()
+            WHERE job_id = CAST(:job_id AS uuid)
+        """, {"job_id": job_id, "created": created})
+
+
+def run_job(job: dict) -> str:
+    """Run a claimed job's open batches in order.  Returns its final status."""
+    job_id = str(job["job_id"])
+    handler = _BATCH_HANDLERS[job["job_type"]]
+    open_batches = fetch_all("""
+        SELECT batch_no
+        FROM cookies_app.import_job_batches
+        WHERE job_id = CAST(:job_id AS uuid) AND done_at IS NULL
+        ORDER BY batch_no
+    """, {"job_id": job_id})
+    if job["done_batches"]:
+        print(f"[jobs] resuming {job_id} at batch {job['done_batches'] + 1}/{job['total_batches']}")
+
+    try:
+        for row in open_batches:
+            _run_batch(job_id, row["batch_no"], handler)
+    except Exception as e:
+        # The failed batch rolled back; everything before it stays committed
+        execute_sql("""
+            UPDATE cookies_app.import_jobs
+            SET status = :failed, error = :error, finished_at = now()
+            WHERE job_id = CAST(:job_id AS uuid)
+        """, {"job_id": job_id, "failed": JOB_FAILED, "error": f"{type(e).__name__}: {e}"})
+        print(f"[jobs] {job_id} failed: {e}")
+        return JOB_FAILED
+
+    execute_sql("""
+        UPDATE cookies_app.import_jobs
+        SET status = :done, finished_at = now()
+        WHERE job_id = CAST(:job_id AS uuid)
+    """, {"job_id": job_id, "done": JOB_DONE})
+    print(f"[jobs] {job_id} done")
+    return JOB_DONE
+
+
+def run_pending_jobs() -> int:
+    """Run jobs until none are claimable.  Returns how many ran."""
+    ran = 0
+    while (job := _claim_job()) is not None:
+        run_job(job)
+        ran += 1
+    return ran
+
+
+class _JobWorker:
+    """
+    One daemon thread per process, started on first submit.  It sleeps
+    JOB_POLL_SECONDS between empty polls (so stale jobs from a crashed
+    process are picked up) and is woken early by new submissions.
+    """
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="import-job-worker", daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            try:
+                ran = run_pending_jobs()
+            except Exception as e:
+                # Database unavailable etc.: try again on the next poll
+                print(f"[jobs] worker error: {e}")
+                ran = 0
+            if not ran:
+                self._wake.wait(JOB_POLL_SECONDS)
+                self._wake.clear()
+
+
+_WORKER = _JobWorker()
+
+
+def start_job_worker():
+    """Start this process's worker (idempotent) so interrupted jobs resume."""
+    _WORKER.start()
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        _WORKER.start()
+        _WORKER._thread.join()
+    else:
+        print(f"Ran {run_pending_jobs()} job(s).")
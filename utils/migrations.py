@@ -0,0 +1,422 @@
+"""
+Schema changes for cookies_app.
+
+Each migration runs once, in list order, inside its own transaction and is
+recorded in cookies_app.schema_migrations.  Statements are written to be
+safe on a database that already has the change.
+
+    python -m utils.migrations          # apply pending
+    python -m utils.migrations --list   # show status
+"""
+import sys
+
+from utils.db_utils import transaction, execute_sql, fetch_all
+
+
+MIGRATIONS: list[tuple[str, str]] = [
+    # One row per (order, year, cookie) so quantity edits can upsert.
+    # Existing duplicates are merged (quantities summed, as the grids show them).
+    ("0001_order_items_unique_cookie", """
+        WITH dupes AS (
+            SELECT
+                order_id,
+                program_year,
+                cookie_code,
+                (array_agg(order_item_id ORDER BY order_item_id))[1] AS keep_id,
+                SUM(quantity) AS quantity
+            FROM cookies_app.order_items
+            GROUP BY order_id, program_year, cookie_code
+            HAVING COUNT(*) > 1
+        ),
+        merged AS (
+            UPDATE cookies_app.order_items oi
+            SET quantity = d.quantity
+            FROM dupes d
+            WHERE oi.order_item_id = d.keep_id
+        )
+        DELETE FROM cookies_app.order_items oi
+        USING dupes d
+        WHERE oi.order_id = d.order_id
+          AND oi.program_year = d.program_year
+          AND oi.cookie_code = d.cookie_code
+          AND oi.order_item_id <> d.keep_id;
+
+        CREATE UNIQUE INDEX IF NOT EXISTS order_items_order_year_cookie_uq
+            ON cookies_app.order_items (order_id, program_year, cookie_code);
+    """),
+    # orders.order_qty_boxes / order_amount maintained from order_items.
+    # Statement-level triggers: one recompute per statement for the orders
+    # it touched, however many item rows it wrote.
+    ("0002_order_totals_triggers", """
+        CREATE OR REPLACE FUNCTION cookies_app.recompute_order_totals(order_ids uuid[])
+        RETURNS void LANGUAGE sql AS $$
+            UPDATE cookies_app.orders o
+            SET order_qty_boxes = t.total_qty,
+                order_amount = t.total_amount
+            FROM (
+                SELECT
+                    o2.order_id,
+                    COALESCE(SUM(oi.quantity), 0) AS total_qty,
+                    COALESCE(SUM(oi.quantity * cy.price_per_box), 0) AS total_amount
+                FROM cookies_app.orders o2
+                LEFT JOIN cookies_app.order_items oi
+                  ON oi.order_id = o2.order_id
+                 AND oi.program_year = o2.program_year
+                LEFT JOIN cookies_app.cookie_years cy
+                  ON cy.cookie_code = oi.cookie_code
+                 AND cy.program_year = oi.program_year
+                WHERE o2.order_id = ANY(order_ids)
+                GROUP BY o2.order_id
+            ) t
+            WHERE o.order_id = t.order_id
+              AND (o.order_qty_boxes IS DISTINCT FROM t.total_qty
+                   OR o.order_amount IS DISTINCT FROM t.total_amount);
+        $$;
+
+        CREATE OR REPLACE FUNCTION cookies_app.order_items_totals_trg()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM cookies_app.recompute_order_totals(
+                    ARRAY(SELECT DISTINCT order_id FROM new_items));
+            ELSIF TG_OP = 'UPDATE' THEN
+                PERFORM cookies_app.recompute_order_totals(
+                    ARRAY(SELECT order_id FROM new_items UNION SELECT order_id FROM old_items));
+            ELSE
+                PERFORM cookies_app.recompute_order_totals(
+                    ARRAY(SELECT DISTINCT order_id FROM old_items));
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS order_items_totals_ins ON cookies_app.order_items;
+        DROP TRIGGER IF EXISTS order_items_totals_upd ON cookies_app.order_items;
+        DROP TRIGGER IF EXISTS order_items_totals_del ON cookies_app.order_items;
+
+        CREATE TRIGGER order_items_totals_ins
+            AFTER INSERT ON cookies_app.order_items
+            REFERENCING NEW TABLE AS new_items
+            FOR EACH STATEMENT EXECUTE FUNCTION cookies_app.order_items_totals_trg();
+        CREATE TRIGGER order_items_totals_upd
+            AFTER UPDATE ON cookies_app.order_items
+            REFERENCING OLD TABLE AS old_items NEW TABLE AS new_items
+            FOR EACH STATEMENT EXECUTE FUNCTION cookies_app.order_items_totals_trg();
+        CREATE TRIGGER order_items_totals_del
+            AFTER DELETE ON cookies_app.order_items
+            REFERENCING OLD TABLE AS old_items
+            FOR EACH STATEMENT EXECUTE FUNCTION cookies_app.order_items_totals_trg();
+
+        -- A price change re-prices that year's orders for the cookie
+        CREATE OR REPLACE FUNCTION cookies_app.cookie_years_price_trg()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM cookies_app.recompute_order_totals(ARRAY(
+                SELECT DISTINCT oi.order_id
+                FROM cookies_app.order_items oi
+                JOIN new_prices n
+                  ON n.cookie_code = oi.cookie_code
+                 AND n.program_year = oi.program_year
+                JOIN old_prices o
+                  ON o.cookie_code = n.cookie_code
+                 AND o.program_year = n.program_year
+                WHERE o.price_per_box IS DISTINCT FROM n.price_per_box
+            ));
+            RETURN NULL;
+        END;
+        $$;
+
+        DROP TRIGGER IF EXISTS cookie_years_price_upd ON cookies_app.cookie_years;
+        CREATE TRIGGER cookie_years_price_upd
+            AFTER UPDATE ON cookies_app.cookie_years
+            REFERENCING OLD TABLE AS old_prices NEW TABLE AS new_prices
+            FOR EACH STATEMENT EXECUTE FUNCTION cookies_app.cookie_years_price_trg();
+
+        -- Bring existing orders with items in line once (item-less orders,
+        -- e.g. booths not yet counted, keep their header totals)
+        SELECT cookies_app.recompute_order_totals(
+            ARRAY(SELECT DISTINCT order_id FROM cookies_app.order_items));
+    """),
+    # Imports dedupe in the database (ON CONFLICT DO NOTHING).  Existing
+    # duplicates are not deleted here: the migration stops and names them.
+    ("0003_orders_external_id_unique", """
+        DO $$
+        DECLARE
+            dupes text;
+        BEGIN
+            SELECT string_agg(order_source || ' / ' || external_order_id, ', ')
+            INTO dupes
+            FROM (
+                SELECT order_source, external_order_id
+                FROM cookies_app.orders
+                WHERE external_order_id IS NOT NULL
+                GROUP BY order_source, external_order_id
+                HAVING COUNT(*) > 1
+                LIMIT 20
+            ) d;
+            IF dupes IS NOT NULL THEN
+                RAISE EXCEPTION USING MESSAGE =
+                    'Duplicate imported orders, delete the extras first: ' || dupes;
+            END IF;
+        END;
+        $$;
+
+        CREATE UNIQUE INDEX IF NOT EXISTS orders_source_external_id_uq
+            ON cookies_app.orders (order_source, external_order_id);
+    """),
+    # Keyset paging for the admin grids (order_utils.get_orders_page):
+    # newest first within a year, walked backwards from the cursor.
+    ("0004_orders_keyset_index", """
+        CREATE INDEX IF NOT EXISTS orders_year_submit_keyset_idx
+            ON cookies_app.orders (program_year, (COALESCE(submit_dt, '1900-01-01')), order_id);
+    """),
+    # One row per scout per season for the girl / admin summaries, kept
+    # current by statement-level triggers on orders, order_items and
+    # money_ledger.  Only the (scout, year) pairs a statement touched are
+    # recomputed.
+    ("0005_scout_season_totals", """
+        CREATE TABLE IF NOT EXISTS cookies_app.scout_season_totals (
+            scout_id uuid NOT NULL,
+            program_year integer NOT NULL,
+            order_count integer NOT NULL DEFAULT 0,
+            total_boxes integer NOT NULL DEFAULT 0,
+            paper_boxes integer NOT NULL DEFAULT 0,
+            digital_boxes integer NOT NULL DEFAULT 0,
+            amount_due numeric(10, 2) NOT NULL DEFAULT 0,
+            amount_paid numeric(10, 2) NOT NULL DEFAULT 0,
+            balance numeric(10, 2) GENERATED ALWAYS AS (amount_due - amount_paid) STORED,
+            cookie_boxes jsonb NOT NULL DEFAULT '{}',
+            updated_at timestamp NOT NULL DEFAULT now(),
+            PRIMARY KEY (scout_id, program_year)
+        );
+
+        CREATE OR REPLACE FUNCTION cookies_app.refresh_scout_season_totals(scout_ids uuid[], years integer[])
+        RETURNS void LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Concurrent writers touching the same scout take turns; otherwise
+            -- both DELETE nothing and both INSERT the same key.
+            PERFORM pg_advisory_xact_lock(hashtextextended(CAST(k.scout_id AS text), k.program_year))
+            FROM (
+                SELECT DISTINCT u.scout_id, u.program_year
+                FROM unnest(scout_ids, years) AS u(scout_id, program_year)
+                WHERE u.scout_id IS NOT NULL
+                ORDER BY 1, 2
+            ) k;
+
+            DELETE FROM cookies_app.scout_season_totals t
+            USING unnest(scout_ids, years) AS k(scout_id, program_year)
+            WHERE t.scout_id = k.scout_id
+              AND t.program_year = k.program_year;
+
+            INSERT INTO cookies_app.scout_season_totals (
+                scout_id, program_year, order_count, total_boxes, paper_boxes,
+                digital_boxes, amount_due, amount_paid, cookie_boxes, updated_at
+            )
+            WITH k AS (
+                SELECT DISTINCT u.scout_id, u.program_year
+                FROM unnest(scout_ids, years) AS u(scout_id, program_year)
+                WHERE u.scout_id IS NOT NULL
+            ),
+            ord AS (
+                SELECT
+                    o.scout_id,
+                    o.program_year,
+                    o.order_id,
+                    o.order_type,
+                    COALESCE(o.order_qty_boxes, 0) AS boxes,
+                    COALESCE(o.order_amount, 0) AS amount,
+                    (SELECT COALESCE(SUM(ml.amount), 0)
+                     FROM cookies_app.money_ledger ml
+                     WHERE ml.related_order_id = o.order_id) AS paid
+                FROM cookies_app.orders o
+                JOIN k
+                  ON k.scout_id = o.scout_id
+                 AND k.program_year = o.program_year
+            ),
+            cookies AS (
+                SELECT c.scout_id, c.program_year, jsonb_object_agg(c.cookie_code, c.qty) AS cookie_boxes
+                FROM (
+                    SELECT ord.scout_id, ord.program_year, oi.cookie_code, SUM(oi.quantity) AS qty
+                    FROM ord
+                    JOIN cookies_app.order_items oi
+                      ON oi.order_id = ord.order_id
+                     AND oi.program_year = ord.program_year
+                    GROUP BY ord.scout_id, ord.program_year, oi.cookie_code
+                ) c
+                GROUP BY c.scout_id, c.program_year
+            )
+            SELECT
+                ord.scout_id,
+                ord.program_year,
+                COUNT(*),
+                SUM(ord.boxes),
+                COALESCE(SUM(ord.boxes) FILTER (WHERE ord.order_type = 'Paper'), 0),
+                COALESCE(SUM(ord.boxes) FILTER (WHERE ord.order_type = 'Digital'), 0),
+                SUM(ord.amount),
+                -- Payments the summaries count: those against Paper / Digital orders
+                COALESCE(SUM(ord.paid) FILTER (WHERE ord.order_type IN ('Paper', 'Digital')), 0),
+                COALESCE(cookies.cookie_boxes, '{}'),
+                now()
+            FROM ord
+            LEFT JOIN cookies
+              ON cookies.scout_id = ord.scout_id
+             AND cookies.program_year = ord.program_year
+            GROUP BY ord.scout_id, ord.program_year, cookies.cookie_boxes;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION cookies_app.scout_season_totals_trg()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            new_s uuid[]; new_y integer[];
+            old_s uuid[]; old_y integer[];
+        BEGIN
+            IF TG_OP <> 'DELETE' THEN
+                IF TG_TABLE_NAME = 'orders' THEN
+                    SELECT array_agg(scout_id), array_agg(program_year) INTO new_s, new_y
+                    FROM (SELECT DISTINCT scout_id, program_year FROM new_rows) k;
+                ELSIF TG_TABLE_NAME = 'order_items' THEN
+                    SELECT array_agg(scout_id), array_agg(program_year) INTO new_s, new_y
+                    FROM (SELECT DISTINCT o.scout_id, o.program_year
+                          FROM new_rows r JOIN cookies_app.orders o ON o.order_id = r.order_id) k;
+                ELSE
+                    SELECT array_agg(scout_id), array_agg(program_year) INTO new_s, new_y
+                    FROM (SELECT DISTINCT o.scout_id, o.program_year
+                          FROM new_rows r JOIN cookies_app.orders o ON o.order_id = r.related_order_id) k;
+                END IF;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                IF TG_TABLE_NAME = 'orders' THEN
+                    SELECT array_agg(scout_id), array_agg(program_year) INTO old_s, old_y
+                    FROM (SELECT DISTINCT scout_id, program_year FROM old_rows) k;
+                ELSIF TG_TABLE_NAME = 'order_items' THEN
+                    SELECT array_agg(scout_id), array_agg(program_year) INTO old_s, old_y
+                    FROM (SELECT DISTINCT o.scout_id, o.program_year
+                          FROM old_rows r JOIN cookies_app.orders o ON o.order_id = r.order_id) k;
+                ELSE
+                    SELECT array_agg(scout_id), array_agg(program_year) INTO old_s, old_y
+                    FROM (SELECT DISTINCT o.scout_id, o.program_year
+                          FROM old_rows r JOIN cookies_app.orders o ON o.order_id = r.related_order_id) k;
+                END IF;
+            END IF;
+            IF new_s IS NOT NULL OR old_s IS NOT NULL THEN
+                PERFORM cookies_app.refresh_scout_season_totals(
+                    COALESCE(new_s, '{}') || COALESCE(old_s, '{}'),
+                    COALESCE(new_y, '{}') || COALESCE(old_y, '{}'));
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+
+        DO $$
+        DECLARE
+            tbl text;
+        BEGIN
+            FOREACH tbl IN ARRAY ARRAY['orders', 'order_items', 'money_ledger'] LOOP
+                tbl := 'cookies_app.' || quote_ident(tbl);
+                EXECUTE 'DROP TRIGGER IF EXISTS scout_totals_ins ON ' || tbl;
+                EXECUTE 'DROP TRIGGER IF EXISTS scout_totals_upd ON ' || tbl;
+                EXECUTE 'DROP TRIGGER IF EXISTS scout_totals_del ON ' || tbl;
+                EXECUTE 'CREATE TRIGGER scout_totals_ins AFTER INSERT ON ' || tbl
+                     || ' REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT'
+                     || ' EXECUTE FUNCTION cookies_app.scout_season_totals_trg()';
+                EXECUTE 'CREATE TRIGGER scout_totals_upd AFTER UPDATE ON ' || tbl
+                     || ' REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT'
+                     || ' EXECUTE FUNCTION cookies_app.scout_season_totals_trg()';
+                EXECUTE 'CREATE TRIGGER scout_totals_del AFTER DELETE ON ' || tbl
+                     || ' REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT'
+                     || ' EXECUTE FUNCTION cookies_app.scout_season_totals_trg()';
+            END LOOP;
+        END;
+        $$;
+
+        SELECT cookies_app.refresh_scout_season_totals(array_agg(scout_id), array_agg(program_year))
+        FROM (SELECT DISTINCT scout_id, program_year FROM cookies_app.orders) k;
+    """),
+    # Name variants the DOC import has already resolved to a scout.
+    # alias_name is the normalized "first last" (doc_import_utils.normalize_name).
+    ("0006_scout_aliases", """
+        CREATE TABLE IF NOT EXISTS cookies_app.scout_aliases (
+            alias_name text PRIMARY KEY,
+            scout_id uuid NOT NULL REFERENCES cookies_app.scouts ON DELETE CASCADE,
+            created_at timestamp NOT NULL DEFAULT now()
+        );
+    """),
+    # Background imports (utils/job_utils.py).  A job's work is split into
+    # batches up front; each batch commits together with its done_at, so a
+    # job picked up again after a crash continues from the first open batch.
+    ("0007_import_jobs", """
+        CREATE TABLE IF NOT EXISTS cookies_app.import_jobs (
+            job_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+            job_type text NOT NULL,
+            program_year integer,
+            status text NOT NULL DEFAULT 'queued',
+            total_batches integer NOT NULL DEFAULT 0,
+            done_batches integer NOT NULL DEFAULT 0,
+            created_rows integer NOT NULL DEFAULT 0,
+            error text,
+            created_by text,
+            created_at timestamp NOT NULL DEFAULT now(),
+            started_at timestamp,
+            heartbeat_at timestamp,
+            finished_at timestamp
+        );
+
+        CREATE INDEX IF NOT EXISTS import_jobs_status_idx
+            ON cookies_app.import_jobs (status, created_at);
+
+        CREATE TABLE IF NOT EXISTS cookies_app.import_job_batches (
+            job_id uuid NOT NULL REFERENCES cookies_app.import_jobs ON DELETE CASCADE,
+            batch_no integer NOT NULL,
+            payload jsonb NOT NULL,
+            created_rows integer,
+            done_at timestamp,
+            PRIMARY KEY (job_id, batch_no)
+        );
+    """),
+]
+
+
+def _ensure_table():
+    execute_sql("""
+        CREATE TABLE IF NOT EXISTS cookies_app.schema_migrations (
+            migration_id text PRIMARY KEY,
+            applied_at timestamp NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def applied_migrations() -> set[str]:
+    _ensure_table()
+    rows = fetch_all("SELECT migration_id FROM cookies_app.schema_migrations")
+    return {r["migration_id"] for r in rows}
+
+
+def apply_migrations(verbose: bool = True) -> list[str]:
+    """
+    Apply pending migrations in order.  Returns the ids applied.
+    """
+    done = applied_migrations()
+    applied = []
+    for migration_id, sql in MIGRATIONS:
+        if migration_id in done:
+            continue
+        with transaction():
+            execute_sql(sql)
+            execute_sql(
+                "INSERT INTO cookies_app.schema_migrations (migration_id) VALUES (:mid)",
+                {"mid": migration_id},
+            )
+        applied.append(migration_id)
+        if verbose:
+            print(f"✓ Applied {migration_id}")
+    return applied
+
+
+if __name__ == "__main__":
+    if "--list" in sys.argv:
+        done = applied_migrations()
+        for migration_id, _ in MIGRATIONS:
+            print(f"{'✓' if migration_id in done else ' '} {migration_id}")
+    elif not apply_migrations():
+        print("No pending migrations.")
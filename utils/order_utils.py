@@ -3,10 +3,17 @@ from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any, Iterable, Optional
+import numpy as np
 import pandas as pd
-from utils.db_utils import get_engine,fetch_all, fetch_one, execute_sql, execute_many_sql, to_pacific
+from utils.db_utils import (
+    get_engine, fetch_all, fetch_one, execute_sql, execute_many_sql, to_pacific, transaction,
+    fetch_df, fetch_df_staged, execute_returning, HEAVY_QUERY_TIMEOUT_MS,
+    invalidate_cache, table_version, CACHE_TTL_CATALOG, CACHE_TTL_ROSTER,
+)
 
 from sqlalchemy import text
+import re
+import time
 import uuid
 
 
@@ -39,6 +46,35 @@ def _initial_order_window_sql() -> str:
          AND o.submit_dt <  make_date(o.program_year, 2, 1))
     """
 
+
+BULK_VALUES_CHUNK = 1000
+
+
+def _values_rows(rows: list[tuple], casts: list[str] | None = None,
+                 extra: list[str] = ()) -> tuple[str, dict]:
+    """
+    Render rows as a VALUES list with one bound, cast parameter per cell:
+    ("(CAST(:v0_0 AS uuid), CAST(:v0_1 AS int)), ...", {"v0_0": ..., ...})
+    Without casts the cells are bare parameters, typed by the target
+    columns when the list feeds INSERT ... VALUES directly.  `extra` SQL
+    expressions (e.g. now()) are appended to every row.
+    """
+    params, tuples = {}, []
+    for i, row in enumerate(rows):
+        cells = []
+        for j, value in enumerate(row):
+            params[f"v{i}_{j}"] = value
+            cells.append(f"CAST(:v{i}_{j} AS {casts[j]})" if casts else f":v{i}_{j}")
+        cells.extend(extra)
+        tuples.append(f"({', '.join(cells)})")
+    return ",\n".join(tuples), params
+
+
+def _chunks(rows: list, size: int = BULK_VALUES_CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
 # ==================================================
 # Scout helpers
 # ==================================================
@@ -58,7 +94,7 @@ def get_all_scouts():
         SELECT scout_id, first_name, last_name, gsusa_id, parent_id
         FROM cookies_app.scouts
         ORDER BY last_name, first_name
-    """)
+    """, ttl=CACHE_TTL_ROSTER)
 
 def add_scout(parent_id, first_name, last_name, goals, award_preferences):
     sql = """
@@ -93,6 +129,7 @@ def add_scout(parent_id, first_name, last_name, goals, award_preferences):
         )
         scout_id = result.scalar()
 
+    invalidate_cache("scouts")
     return scout_id
     
 def update_scout(
@@ -126,21 +163,25 @@ def update_scout(
     engine = get_engine()
     with engine.begin() as conn:
         conn.execute(text(sql), params)
+    invalidate_cache("scouts")
 
 
-def fetch_scout_aliases(conn):
-    query = "SELECT alias_name, scout_id FROM scout_aliases"
-    rows = conn.execute(query).fetchall()
-    return {r[0].lower(): r[1] for r in rows}
+def fetch_scout_aliases() -> dict:
+    """Normalized alias name -> scout_id (scout_aliases, migration 0006)."""
+    rows = fetch_all("""
+        SELECT alias_name, scout_id
+        FROM cookies_app.scout_aliases
+    """, ttl=CACHE_TTL_ROSTER)
+    return {r["alias_name"]: r["scout_id"] for r in rows}
 
-def insert_scout_alias(conn, alias_name: str, scout_id: int):
+def insert_scout_alias(alias_name: str, scout_id):
     execute_sql("""
-        INSERT INTO scout_aliases (alias_name, scout_id)
-        VALUES (%s, %s)
-        ON CONFLICT (alias_name) DO NOTHING
+        INSERT INTO cookies_app.scout_aliases (alias_name, scout_id)
+        VALUES (:alias, :scout)
+        ON CONFLICT (alias_name) DO UPDATE SET scout_id = EXCLUDED.scout_id
         """,{
             "alias": alias_name, 
-            "scout":scout_id}
+            "scout": str(scout_id)}
     )
 
 def get_all_parents():
@@ -148,7 +189,7 @@ def get_all_parents():
         SELECT parent_id, parent_firstname, parent_lastname
         FROM cookies_app.parents
         ORDER BY parent_lastname, parent_firstname
-    """)
+    """, ttl=CACHE_TTL_ROSTER)
 
 def update_scout_gsusa_id(scout_id, gsusa_id):
     execute_sql("""
@@ -163,43 +204,135 @@ def update_scout_gsusa_id(scout_id, gsusa_id):
             }
         )
 
+def update_scout_gsusa_ids(updates: list[tuple]) -> int:
+    """
+    Fill gsusa_id for many scouts at once: [(scout_id, gsusa_id), ...].
+    Scouts that already have one are left alone.  Returns rows updated.
+    """
+    updated = 0
+    with transaction():
+        for chunk in _chunks([(str(sid), str(gid)) for sid, gid in updates]):
+            values, params = _values_rows(chunk, casts=["uuid", "text"])
+            updated += execute_sql(f"""
+                UPDATE cookies_app.scouts s
+                SET gsusa_id = v.gsusa_id
+                FROM (VALUES {values}) AS v(scout_id, gsusa_id)
+                WHERE s.scout_id = v.scout_id
+                  AND s.gsusa_id IS NULL
+            """, params)
+    return updated
+
             
 # ==================================================
 # Cookie helpers
 # ==================================================
-def get_cookie_codes_for_year(program_year: int) -> list[str]:
+@dataclass(frozen=True)
+class CookieInfo:
+    """One cookie_years row; reads as c.cookie_code or c["cookie_code"]."""
+    cookie_code: str
+    display_name: str
+    price_per_box: Decimal
+    display_order: int
+    active: bool
+    default_booth_qty: int
+    cookie_avg_pct: Decimal
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+class CookieCatalog:
     """
-    Returns ordered list of cookie codes for a program year.
-    Used for admin grids, print pages, etc.
+    cookie_years for one program year, indexed by code.
+    Get it from get_cookie_catalog rather than building one.
     """
+    def __init__(self, program_year: int, rows):
+        self.program_year = program_year
+        # Display order; inactive cookies are kept so old quantities resolve
+        self.all = [
+            CookieInfo(
+                cookie_code=r["cookie_code"],
+                display_name=r["display_name"],
+                price_per_box=Decimal(str(r["price_per_box"] or 0)),
+                display_order=r["display_order"],
+                active=bool(r["active"]),
+                default_booth_qty=int(r["default_booth_qty"] or 0),
+                cookie_avg_pct=Decimal(str(r["cookie_avg_pct"] or 0)),
+            )
+            for r in rows
+        ]
+        self.active = [c for c in self.all if c.active]
+        self._by_code = {c.cookie_code: c for c in self.all}
+
+    def __contains__(self, code) -> bool:
+        return code in self._by_code
+
+    def get(self, code) -> Optional[CookieInfo]:
+        return self._by_code.get(code)
+
+    def price(self, code) -> Decimal:
+        c = self._by_code.get(code)
+        return c.price_per_box if c else Decimal("0")
+
+    def display_name(self, code) -> str:
+        c = self._by_code.get(code)
+        return c.display_name if c else code
+
+    def codes(self, active_only: bool = True) -> list[str]:
+        return [c.cookie_code for c in (self.active if active_only else self.all)]
+
+    def rename_map(self) -> dict:
+        """display_name -> cookie_code for the active cookies."""
+        return {c.display_name: c.cookie_code for c in self.active}
+
+
+# program_year -> (cookie_years version, expires, catalog)
+_CATALOGS: dict[int, tuple] = {}
+
+
+def get_cookie_catalog(program_year: int) -> CookieCatalog:
+    """
+    The year's CookieCatalog, loaded once per process.  Any write to
+    cookie_years from this process moves its table_version and the next
+    call reloads; CACHE_TTL_CATALOG bounds how long edits made elsewhere
+    (another process, the SQL console) take to show up.
+    """
+    year = int(program_year)
+    version = table_version("cookie_years")
+    entry = _CATALOGS.get(year)
+    if entry and entry[0] == version and entry[1] > time.monotonic():
+        return entry[2]
+
     rows = fetch_all("""
-        SELECT cookie_code
+        SELECT cookie_code, display_name, price_per_box, display_order,
+               active, default_booth_qty, cookie_avg_pct
         FROM cookies_app.cookie_years
         WHERE program_year = :year
-          AND active = true
-        ORDER BY display_order
-    """, {"year": program_year})
-    
-    return [r["cookie_code"] for r in rows]
+        ORDER BY display_order, cookie_code
+    """, {"year": year})
+    catalog = CookieCatalog(year, rows)
+    _CATALOGS[year] = (version, time.monotonic() + CACHE_TTL_CATALOG, catalog)
+    return catalog
+
+
+def bump_cookie_catalog_version():
+    """Force every catalog to reload, e.g. after editing cookie_years by hand."""
+    invalidate_cache("cookie_years")
+
+
+def get_cookie_codes_for_year(program_year: int) -> list[str]:
+    """
+    Returns ordered list of cookie codes for a program year.
+    Used for admin grids, print pages, etc.
+    """
+    return get_cookie_catalog(program_year).codes()
 
 def get_cookies_for_year(program_year):
-    rows = fetch_all("""
-        SELECT cookie_code, display_name, price_per_box
-        FROM cookies_app.cookie_years
-        WHERE program_year = :year
-          AND active = TRUE
-        ORDER BY display_order
-    """,{"year": program_year})
-    return rows
+    return list(get_cookie_catalog(program_year).active)
     
 
 def build_cookie_rename_map(program_year: int) -> dict:
-    cookies = get_cookies_for_year(program_year)
-
-    return {
-        row["display_name"]: row["cookie_code"]
-        for row in cookies
-    }
+    return get_cookie_catalog(program_year).rename_map()
 
 
 def aggregate_orders_by_cookie(df: pd.DataFrame) -> pd.DataFrame:
@@ -213,7 +346,31 @@ def aggregate_orders_by_cookie(df: pd.DataFrame) -> pd.DataFrame:
 # ==================================================
 # Order header + items
 # ==================================================
-def get_orders_for_scout_summary(scout_id: str) -> pd.DataFrame:
+def get_scout_season_totals(scout_id, year) -> Optional[dict]:
+    """
+    One scout's season rollup (scout_season_totals, migration 0005):
+    boxes by type, amount due / paid / balance and cookie_boxes
+    ({cookie_code: qty}).  None when the scout has no orders that year.
+    Not cached - the rollup is written by triggers the query cache never sees.
+    """
+    row = fetch_one("""
+        SELECT
+            order_count,
+            total_boxes,
+            paper_boxes,
+            digital_boxes,
+            amount_due,
+            amount_paid,
+            balance,
+            cookie_boxes
+        FROM cookies_app.scout_season_totals
+        WHERE scout_id = :sid
+          AND program_year = :year
+    """, {"sid": scout_id, "year": year})
+    return dict(row) if row else None
+
+
+def get_orders_for_scout_summary(scout_id: str, year: Optional[int] = None) -> pd.DataFrame:
     # Used in admin girl order summary - joins the header and the cookie details
     rows = fetch_all("""
         SELECT
@@ -229,8 +386,9 @@ def get_orders_for_scout_summary(scout_id: str) -> pd.DataFrame:
           ON cy.cookie_code = oi.cookie_code
          AND cy.program_year = o.program_year
         WHERE o.scout_id = :sid
+          AND (CAST(:year AS integer) IS NULL OR o.program_year = :year)
         ORDER BY o.submit_dt DESC
-    """, {"sid": scout_id})
+    """, {"sid": scout_id, "year": year})
 
     if not rows:
         return pd.DataFrame()
@@ -300,30 +458,43 @@ def get_order_items(order_id):
     df = pd.DataFrame(rows)
 
 
-def get_all_orders_wide(program_year: Optional[int] = None) -> pd.DataFrame:
+def _wide_cookie_codes(program_year: Optional[int] = None) -> list[str]:
     """
-    Get all orders in WIDE format - one row per order with admin fields.
-    Ready for admin_order_management page.
-    
-    Columns: orderId, orderType, orderStatus, addEbudde, initialOrder, verifiedDigitalCookie,
-    comments, submit_dt, scoutName, boothId, paymentStatus, plus one column per cookie type.
+    Cookie columns for get_all_orders_wide: every cookie_years code for the
+    year (active or not, so old quantities still show), in display order,
+    then DON, which has no cookie_years row in some seasons.
+    Codes are used as column aliases, so anything but [A-Za-z0-9_] is skipped.
     """
-    params = {}
-    year_filter = ""
-    
     if program_year:
-        year_filter = "WHERE o.program_year = :year"
-        params["year"] = program_year
-    
-    rows = fetch_all(f"""
-        WITH paid AS (
-            SELECT
-                related_order_id AS order_id,
-                COALESCE(SUM(amount), 0) AS paid_amount
-            FROM cookies_app.money_ledger
-            GROUP BY related_order_id
+        codes = get_cookie_catalog(program_year).codes(active_only=False)
+    else:
+        codes = [r["cookie_code"] for r in fetch_all("""
+            SELECT cookie_code
+            FROM cookies_app.cookie_years
+            GROUP BY cookie_code
+            ORDER BY MIN(display_order), cookie_code
+        """, ttl=CACHE_TTL_CATALOG)]
+    codes = list(dict.fromkeys([*codes, DONATION_CODE]))
+    return [c for c in codes if re.fullmatch(r"\w+", c or "")]
+
+
+def _cookie_pivot_sql(cookie_codes: list[str], params: dict) -> tuple[str, str]:
+    """FILTER aggregates for the items CTE and the matching select columns."""
+    pivot_cols, select_cols = [], []
+    for i, code in enumerate(cookie_codes):
+        params[f"code_{i}"] = code
+        pivot_cols.append(
+            f'SUM(oi.quantity) FILTER (WHERE oi.cookie_code = :code_{i}) AS "{code}"'
         )
-        SELECT
+        select_cols.append(f'COALESCE(items."{code}", 0)::int AS "{code}"')
+    pivot_sql = "".join(f",\n                {c}" for c in pivot_cols)
+    select_sql = "".join(f",\n            {c}" for c in select_cols)
+    return pivot_sql, select_sql
+
+
+def _orders_wide_columns(paid_col: str, select_sql: str) -> str:
+    """Select list shared by get_all_orders_wide and get_orders_page (orders aliased o)."""
+    return f"""
             o.order_id AS "orderId",
             o.program_year,
             o.submit_dt,
@@ -350,15 +521,81 @@ def get_all_orders_wide(program_year: Optional[int] = None) -> pd.DataFrame:
                 ''
             ) AS "scoutName",
             
-            COALESCE(paid.paid_amount, 0) AS "paidAmount",
-            
-            oi.cookie_code AS "cookieCode",
-            oi.quantity
-            
+            COALESCE({paid_col}, 0) AS "paidAmount"{select_sql}
+    """
+
+
+def _finish_orders_wide(df: pd.DataFrame, cookie_codes: list[str]) -> pd.DataFrame:
+    # The admin grid edits these as plain strings
+    for col in ('orderType', 'orderStatus'):
+        df[col] = df[col].astype(object)
+    df[cookie_codes] = df[cookie_codes].astype(int)
+    
+    # paymentStatus sits between the order fields and the cookie columns
+    df.insert(
+        df.columns.get_loc('paidAmount') + 1,
+        'paymentStatus',
+        payment_status_series(df['orderType'], to_cents(df['orderAmount']), to_cents(df['paidAmount'])),
+    )
+    
+    # Convert submit_dt to date safely
+    df['submit_dt'] = pd.to_datetime(df['submit_dt'], errors='coerce').dt.date
+    
+    # Non-digital orders should never appear "verified"
+    df.loc[~df['orderType'].str.contains('Digital', case=False, na=False), 'verifiedDigitalCookie'] = False
+    
+    return df
+
+
+def get_all_orders_wide(program_year: Optional[int] = None) -> pd.DataFrame:
+    """
+    Get all orders in WIDE format - one row per order with admin fields.
+    
+    Columns: orderId, orderType, orderStatus, addEbudde, initialOrder, verifiedDigitalCookie,
+    comments, submit_dt, scoutName, boothId, paymentStatus, plus one column per cookie type.
+
+    The pivot happens in Postgres (one FILTER aggregate per cookie_years code),
+    so each order comes back once instead of once per cookie.  Grids should
+    page through get_orders_page instead of loading the whole year.
+    """
+    params: dict[str, Any] = {}
+    year_filter = ""
+    item_year_filter = ""
+    # All years scans every order: fail fast (QueryTimeout) rather than hold a connection
+    timeout_ms = HEAVY_QUERY_TIMEOUT_MS
+    
+    if program_year:
+        year_filter = "WHERE o.program_year = :year"
+        item_year_filter = "WHERE oi.program_year = :year"
+        params["year"] = program_year
+        timeout_ms = None
+
+    cookie_codes = _wide_cookie_codes(program_year)
+    pivot_sql, select_sql = _cookie_pivot_sql(cookie_codes, params)
+    
+    # Typed straight from the cursor (see fetch_df); orderType/orderStatus
+    # come back categorical and are turned into plain strings below
+    df = fetch_df(f"""
+        WITH paid AS (
+            SELECT
+                related_order_id AS order_id,
+                COALESCE(SUM(amount), 0) AS paid_amount
+            FROM cookies_app.money_ledger
+            GROUP BY related_order_id
+        ),
+        items AS (
+            SELECT
+                oi.order_id,
+                oi.program_year{pivot_sql}
+            FROM cookies_app.order_items oi
+            {item_year_filter}
+            GROUP BY oi.order_id, oi.program_year
+        )
+        SELECT{_orders_wide_columns("paid.paid_amount", select_sql)}
         FROM cookies_app.orders o
-        LEFT JOIN cookies_app.order_items oi
-          ON oi.order_id = o.order_id
-         AND oi.program_year = o.program_year
+        LEFT JOIN items
+          ON items.order_id = o.order_id
+         AND items.program_year = o.program_year
         LEFT JOIN cookies_app.scouts s
           ON s.scout_id = o.scout_id
         LEFT JOIN cookies_app.parents p
@@ -367,77 +604,168 @@ def get_all_orders_wide(program_year: Optional[int] = None) -> pd.DataFrame:
           ON paid.order_id = o.order_id
         {year_filter}
         ORDER BY o.submit_dt DESC, o.order_id
-    """, params)
-    
-    if not rows:
-        return pd.DataFrame()
-    
-    df = pd.DataFrame(rows)
-    
-    # Get all unique orders first (before pivoting)
-    meta_cols = ['orderId', 'program_year', 'submit_dt', 'orderType', 'orderStatus', 
-                 'orderAmount', 'orderQtyBoxes', 'comments', 'boothId', 'scoutId', 'addEbudde', 
-                 'verifiedDigitalCookie', 'orderPickedup', 'initialOrder', 'scoutName', 'paidAmount']
-    
-    # Only use columns that exist in the dataframe
-    available_meta_cols = [col for col in meta_cols if col in df.columns]
+    """, params, timeout_ms=timeout_ms)
     
-    if not available_meta_cols:
+    if df.empty:
         return pd.DataFrame()
-    
-    # Make sure orderId is included
-    if 'orderId' not in available_meta_cols:
-        return pd.DataFrame()
-    
-    meta = df[available_meta_cols].drop_duplicates('orderId').set_index('orderId')
-    
-    # Calculate payment status for each order
-    def calc_payment_status(row):
-        return get_payment_status(
-            row.get('orderType'),
-            Decimal(str(row.get('orderAmount', 0))),
-            Decimal(str(row.get('paidAmount', 0)))
+
+    return _finish_orders_wide(df, cookie_codes)
+
+
+# ==================================================
+# Paged orders (admin grids)
+# ==================================================
+ORDERS_PAGE_SIZE = 200
+
+# Sort key for keyset paging; matches the 0004 migration index expression
+_ORDER_SORT_SQL = "COALESCE(o.submit_dt, '1900-01-01')"
+
+_ORDER_PAID_SQL = """
+    LEFT JOIN LATERAL (
+        SELECT SUM(ml.amount) AS paid_amount
+        FROM cookies_app.money_ledger ml
+        WHERE ml.related_order_id = o.order_id
+    ) paid ON true
+"""
+
+
+@dataclass
+class OrderFilters:
+    """
+    Filters pushed into SQL by get_orders_page / count_orders.
+    None (or an empty list) means no filter on that field.
+    """
+    statuses: Optional[list[str]] = None
+    order_types: Optional[list[str]] = None
+    exclude_order_types: Optional[list[str]] = None
+    scout_ids: Optional[list[str]] = None
+    exclude_scout_ids: Optional[list[str]] = None
+    booth_ids: Optional[list[str]] = None
+    paid: Optional[bool] = None             # True: PAID only, False: UNPAID only
+    initial_order: Optional[bool] = None
+    add_ebudde: Optional[bool] = None
+    order_pickedup: Optional[bool] = None
+
+
+def _order_filter_sql(filters: OrderFilters | None, params: dict) -> list[str]:
+    """WHERE conditions (orders aliased o, paid amount as paid.paid_amount)."""
+    f = filters or OrderFilters()
+    where = []
+
+    def _in(name: str, col: str, values, cast: str = "text"):
+        if values:
+            params[name] = [str(v) for v in values]
+            where.append(f"{col} = ANY(CAST(:{name} AS {cast}[]))")
+
+    _in("f_statuses", "o.status", f.statuses)
+    _in("f_types", "o.order_type", f.order_types)
+    if f.exclude_order_types:
+        # NULL order types are kept, as the pandas filter did
+        params["f_not_types"] = list(f.exclude_order_types)
+        where.append("(o.order_type IS NULL OR o.order_type <> ALL(CAST(:f_not_types AS text[])))")
+    _in("f_scouts", "o.scout_id", f.scout_ids, cast="uuid")
+    if f.exclude_scout_ids:
+        params["f_not_scouts"] = [str(v) for v in f.exclude_scout_ids]
+        where.append("(o.scout_id IS NULL OR o.scout_id <> ALL(CAST(:f_not_scouts AS uuid[])))")
+    _in("f_booths", "o.booth_id", f.booth_ids, cast="uuid")
+
+    if f.paid is not None:
+        # Same rule as get_payment_status
+        paid_sql = """(
+            COALESCE(o.order_type, '') ILIKE '%digital%'
+            OR COALESCE(paid.paid_amount, 0) + 0.005 >= COALESCE(o.order_amount, 0)
+        )"""
+        where.append(paid_sql if f.paid else f"NOT {paid_sql}")
+    if f.initial_order is not None:
+        params["f_initial"] = f.initial_order
+        where.append(f"""COALESCE(o.initial_order, {_initial_order_window_sql()}) = :f_initial""")
+    if f.add_ebudde is not None:
+        params["f_ebudde"] = f.add_ebudde
+        where.append("COALESCE(o.add_ebudde, false) = :f_ebudde")
+    if f.order_pickedup is not None:
+        params["f_pickedup"] = f.order_pickedup
+        where.append("COALESCE(o.order_pickedup, false) = :f_pickedup")
+    return where
+
+
+def count_orders(program_year: int, filters: OrderFilters | None = None) -> int:
+    """Orders matching the filters (for "page x of y")."""
+    params: dict[str, Any] = {"year": program_year}
+    where = ["o.program_year = :year", *_order_filter_sql(filters, params)]
+    row = fetch_one(f"""
+        SELECT COUNT(*) AS n
+        FROM cookies_app.orders o
+        {_ORDER_PAID_SQL if filters and filters.paid is not None else ""}
+        WHERE {" AND ".join(where)}
+    """, params)
+    return int(row["n"]) if row else 0
+
+
+def get_orders_page(
+    program_year: int,
+    filters: OrderFilters | None = None,
+    after: tuple | None = None,
+    limit: int = ORDERS_PAGE_SIZE,
+) -> tuple[pd.DataFrame, tuple | None]:
+    """
+    One page of get_all_orders_wide rows, newest first, filtered in SQL.
+
+    Keyset pagination on (submit_dt, order_id): pass the returned cursor as
+    `after` for the next page; it is None on the last page.  Items and
+    payments are aggregated for the page's orders only.
+    """
+    params: dict[str, Any] = {"year": program_year, "limit": int(limit)}
+    where = ["o.program_year = :year", *_order_filter_sql(filters, params)]
+    if after is not None:
+        params["after_dt"], params["after_id"] = after[0], str(after[1])
+        where.append(
+            f"({_ORDER_SORT_SQL}, o.order_id) < (CAST(:after_dt AS timestamp), CAST(:after_id AS uuid))"
         )
-    
-    meta['paymentStatus'] = meta.apply(calc_payment_status, axis=1)
-    
-    # Pivot cookies by cookie_code, summing quantities
-    if 'cookieCode' in df.columns and 'quantity' in df.columns:
-        cookies = df[df['cookieCode'].notna()].pivot_table(
-            index='orderId',
-            columns='cookieCode',
-            values='quantity',
-            aggfunc='sum',
-            fill_value=0
-        ).astype(int)
-    else:
-        cookies = pd.DataFrame()
-    
-    # Merge metadata with cookies, keeping all metadata rows
-    if not cookies.empty:
-        result = meta.join(cookies, how='left').reset_index()
-    else:
-        # If no cookies at all, still include all orders
-        result = meta.reset_index()
-    
-    # Fill missing cookie columns with 0
-    all_cookie_codes = get_cookie_codes_for_year(program_year) if program_year else []
-    for code in all_cookie_codes:
-        if code not in result.columns:
-            result[code] = 0
-        else:
-            # Fill NaN values with 0
-            result[code] = result[code].fillna(0).astype(int)
-    
-    # Convert submit_dt to date safely
-    if 'submit_dt' in result.columns:
-        result['submit_dt'] = pd.to_datetime(result['submit_dt'], errors='coerce').dt.date
-    
-    # Non-digital orders should never appear "verified"
-    if 'orderType' in result.columns and 'verifiedDigitalCookie' in result.columns:
-        result.loc[~result['orderType'].str.contains('Digital', case=False, na=False), 'verifiedDigitalCookie'] = False
-    
-    return result
+
+    cookie_codes = _wide_cookie_codes(program_year)
+    pivot_sql, select_sql = _cookie_pivot_sql(cookie_codes, params)
+
+    df = fetch_df(f"""
+        WITH page AS (
+            SELECT
+                o.*,
+                paid.paid_amount,
+                {_ORDER_SORT_SQL} AS sort_dt
+            FROM cookies_app.orders o
+            {_ORDER_PAID_SQL}
+            WHERE {" AND ".join(where)}
+            ORDER BY {_ORDER_SORT_SQL} DESC, o.order_id DESC
+            LIMIT :limit
+        ),
+        items AS (
+            SELECT
+                oi.order_id,
+                oi.program_year{pivot_sql}
+            FROM cookies_app.order_items oi
+            JOIN page
+              ON page.order_id = oi.order_id
+             AND page.program_year = oi.program_year
+            GROUP BY oi.order_id, oi.program_year
+        )
+        SELECT{_orders_wide_columns("o.paid_amount", select_sql)},
+            o.sort_dt AS "_sortDt"
+        FROM page o
+        LEFT JOIN items
+          ON items.order_id = o.order_id
+         AND items.program_year = o.program_year
+        LEFT JOIN cookies_app.scouts s
+          ON s.scout_id = o.scout_id
+        LEFT JOIN cookies_app.parents p
+          ON p.parent_id = o.parent_id
+        ORDER BY o.sort_dt DESC, o.order_id DESC
+    """, params)
+
+    if df.empty:
+        return pd.DataFrame(), None
+
+    sort_dt = df.pop("_sortDt")
+    cursor = (sort_dt.iloc[-1], str(df["orderId"].iloc[-1])) if len(df) == limit else None
+    return _finish_orders_wide(df, cookie_codes), cursor
 
 
 def get_outstanding_non_booth_orders(program_year=None):
@@ -702,82 +1030,118 @@ def insert_planned_inventory(parent_id, scout_id, program_year, order_id, items)
                 "order_id": str(order_id)
             })
 
+_HEADER_COLS = [
+    "order_id", "parent_id", "scout_id", "program_year", "order_ref",
+    "order_type", "status", "order_qty_boxes", "order_amount", "comments",
+    "external_order_id", "order_source", "initial_order", "submit_dt",
+]
+
+
 def bulk_insert_order_headers(df):
-    sql = """
-        INSERT INTO cookies_app.orders (
-            order_id,
-            parent_id,
-            scout_id,
-            program_year,
-            order_ref,
-            order_type,
-            status,
-            order_qty_boxes,
-            order_amount,
-            comments,
-            external_order_id,
-            order_source,
-            initial_order,
-            submit_dt,
-            created_at
-        )
-        VALUES (
-            :order_id,
-            :parent_id,
-            :scout_id,
-            :program_year,
-            :order_ref,
-            :order_type,
-            :status,
-            :order_qty_boxes,
-            :order_amount,
-            :comments,
-            :external_order_id,
-            :order_source,
-            :initial_order,
-            :submit_dt,
-            now()
-        )
     """
+    Insert order headers and return the rows that became new orders, with
+    order_id set; pass that frame to the item / inventory / money inserts.
 
-    payload = []
+    Rows without both scout_id and parent_id are skipped.  Rows whose
+    (order_source, external_order_id) already exists are skipped by the
+    database (unique index, ON CONFLICT DO NOTHING), so a repeated or
+    concurrent import creates each order once.
+    """
+    # Skip orders without both scout_id and parent_id
+    df = df[df["parent_id"].notna() & df["scout_id"].notna()].copy()
+    df["order_id"] = [str(uuid.uuid4()) for _ in range(len(df))]
+    if df.empty:
+        return df
+
+    headers = df.reindex(columns=_HEADER_COLS)
+    headers["parent_id"] = headers["parent_id"].astype(str)
+    headers["scout_id"] = headers["scout_id"].astype(str)
+    if "initial_order" in df.columns:
+        headers["initial_order"] = headers["initial_order"].astype(bool)
+    headers = headers.astype(object).where(headers.notna(), None)
+    rows = list(zip(*(headers[c].tolist() for c in _HEADER_COLS)))
+
+    created = []
+    for chunk in _chunks(rows):
+        values, params = _values_rows(chunk, extra=["now()"])
+        created += execute_returning(f"""
+            INSERT INTO cookies_app.orders (
+                {", ".join(_HEADER_COLS)},
+                created_at
+            )
+            VALUES {values}
+            ON CONFLICT DO NOTHING
+            RETURNING order_id, external_order_id
+        """, params)
+
+    new_ids = {str(r["order_id"]) for r in created}
+    return df[df["order_id"].isin(new_ids)]
+
+DONATION_CODE = "DON"
+
+
+def _import_cookie_catalog(years) -> pd.DataFrame:
+    """
+    (program_year, cookie_code) pairs an import may write: each year's
+    cookie_years codes plus DON, which the DOC importer maps donation
+    columns to whether or not the catalog lists it.
+    """
+    pairs = {
+        (int(y), code)
+        for y in years
+        for code in [*get_cookie_catalog(int(y)).codes(active_only=False), DONATION_CODE]
+    }
+    return pd.DataFrame(sorted(pairs), columns=["program_year", "cookie_code"])
 
-    for r in df.itertuples():
-        # Skip orders without both scout_id and parent_id
-        if pd.isna(r.parent_id) or pd.isna(r.scout_id):
-            continue
-        
-        order_id = uuid.uuid4()
 
-        payload.append({
-            "order_id": str(order_id),
-            "parent_id": str(r.parent_id),
-            "scout_id": str(r.scout_id),
-            "program_year": r.program_year,
-            "order_ref": r.order_ref,
-            "order_type": r.order_type,
-            "status": r.status,
-            "order_qty_boxes": r.order_qty_boxes,
-            "order_amount": r.order_amount,
-            "comments": r.comments,
-            "external_order_id": r.external_order_id,
-            "order_source": r.order_source,
-            "initial_order": bool(r.initial_order) if hasattr(r, "initial_order") else None,
-            "submit_dt": r.submit_dt,
-        })
+def _records(frame: pd.DataFrame) -> list[dict]:
+    """Rows as dicts of plain Python values (faster than to_dict('records'))."""
+    cols = list(frame.columns)
+    return [dict(zip(cols, row)) for row in zip(*(frame[c].tolist() for c in cols))]
 
-        # store for downstream inserts
-        df.at[r.Index, "order_id"] = order_id
 
-    execute_many_sql(sql, payload)
-    return df
+def _str_ids(frame: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """str() id columns (uuid.UUID from bulk_insert_order_headers), leaving NaN as NaN."""
+    frame = frame.reindex(columns=cols)
+    return frame.apply(lambda s: s.map(str, na_action="ignore").astype(object))
+
+
+def _melt_cookie_columns(df: pd.DataFrame, id_cols: list[str]) -> pd.DataFrame:
+    """
+    Wide import frame -> one row per (order row, cookie) with a float
+    quantity (NaN for blanks / junk).  Only cookie columns in the row's own
+    year catalog are kept.  id_cols come back as str (NaN where missing),
+    converted once per order rather than once per item.
+    """
+    out_cols = [*id_cols, "program_year", "cookie_code", "quantity"]
+    if df.empty or "program_year" not in df.columns:
+        return pd.DataFrame(columns=out_cols)
+
+    years = pd.to_numeric(df["program_year"], errors="coerce")
+    df, years = df[years.notna()], years.dropna().astype(int)
+    catalog = _import_cookie_catalog(years.unique())
+    codes = [c for c in catalog["cookie_code"].unique() if c in df.columns]
+    if not codes:
+        return pd.DataFrame(columns=out_cols)
+
+    wide = _str_ids(df, id_cols)
+    wide["program_year"] = years
+    wide[codes] = df[codes].apply(pd.to_numeric, errors="coerce")
+    long = wide.melt(
+        id_vars=[*id_cols, "program_year"],
+        value_vars=codes,
+        var_name="cookie_code",
+        value_name="quantity",
+    )
+    return long.merge(catalog, on=["program_year", "cookie_code"], how="inner")[out_cols]
+
 
 def bulk_insert_order_items(df):
     """
     Insert order items from a wide-format DataFrame.
-    
-    Expects columns: order_id, scout_id, parent_id, program_year, plus cookie code columns
-    (ADV, LEM, TRE, DSD, SAM, TAG, TM, EXP, TOF, DON)
+
+    Expects columns: order_id, scout_id, parent_id, program_year, plus cookie
+    code columns (the year's cookie_years codes, and DON).
     """
     sql = """
         INSERT INTO cookies_app.order_items (
@@ -790,7 +1154,7 @@ def bulk_insert_order_items(df):
             quantity
         )
         VALUES (
-            :order_item_id,
+            gen_random_uuid(),
             :order_id,
             :parent_id,
             :scout_id,
@@ -799,62 +1163,25 @@ def bulk_insert_order_items(df):
             :quantity
         )
     """
-    
-    # Define all possible cookie codes
-    cookie_codes = ['ADV', 'LEM', 'TRE', 'DSD', 'SAM', 'TAG', 'TM', 'EXP', 'TOF', 'DON']
-    payload = []
-    
-    for _, row in df.iterrows():
-        order_id = row.get('order_id')
-        parent_id = row.get('parent_id')
-        scout_id = row.get('scout_id')
-        program_year = row.get('program_year')
-        
+
+    items = _melt_cookie_columns(df, ["order_id", "parent_id", "scout_id"])
+    # Skip rows without an order, and 0 / blank quantities
+    items = items[items["order_id"].notna() & items["quantity"].notna() & (items["quantity"] != 0)]
+    if items.empty:
+        return
+
+    payload = pd.DataFrame({
+        "order_id": items["order_id"],
         # Default parent_id and scout_id to 999 if missing
-        if pd.isna(parent_id):
-            parent_id = 999
-        if pd.isna(scout_id):
-            scout_id = 999
-        
-        # Skip if missing required fields
-        if pd.isna(order_id):
-            continue
-        
-        # Iterate through each cookie code
-        for cookie_code in cookie_codes:
-            # Skip if column doesn't exist
-            if cookie_code not in df.columns:
-                continue
-            
-            qty = row.get(cookie_code)
-            
-            # Convert to numeric and skip if 0 or NaN
-            try:
-                qty = pd.to_numeric(qty, errors='coerce')
-            except (TypeError, ValueError):
-                qty = 0
-            
-            if pd.isna(qty) or qty == 0:
-                continue
-            
-            payload.append({
-                "order_item_id": str(uuid.uuid4()),
-                "order_id": str(order_id),
-                "parent_id": str(parent_id),
-                "scout_id": str(scout_id),
-                "program_year": int(program_year),
-                "cookie_code": cookie_code,
-                "quantity": int(qty),
-            })
-    
-    # Only execute if we have items to insert
-    if payload:
-        execute_many_sql(sql, payload)
+        "parent_id": items["parent_id"].fillna("999"),
+        "scout_id": items["scout_id"].fillna("999"),
+        "program_year": items["program_year"].astype(int),
+        "cookie_code": items["cookie_code"],
+        "quantity": items["quantity"].astype(int),
+    })
+    execute_many_sql(sql, _records(payload))
 
 def bulk_insert_planned_inventory(df):
-    # Only accept known cookie codes to avoid pulling in extra columns like order_total
-    cookie_codes = ['ADV', 'LEM', 'TRE', 'DSD', 'SAM', 'TAG', 'TM', 'EXP', 'TOF', 'DON']
-
     sql = """
         INSERT INTO cookies_app.inventory_ledger (
             inventory_event_id,
@@ -882,65 +1209,39 @@ def bulk_insert_planned_inventory(df):
         )
     """
 
-    payload = []
-
+    # Only accept the year's cookie codes, so extra columns like order_total never count
     if 'cookie_code' in df.columns and 'quantity' in df.columns:
         # Long format
-        for r in df.itertuples():
-            qty = getattr(r, 'quantity', 0)
-            qty = pd.to_numeric(qty, errors='coerce')
-            if pd.isna(qty) or qty <= 0:
-                continue
-
-            # Require matched parent/scout
-            if pd.isna(r.parent_id) or pd.isna(r.scout_id):
-                continue
-
-            # Skip unknown cookie codes
-            if r.cookie_code not in cookie_codes:
-                continue
-
-            payload.append({
-                "parent_id": str(r.parent_id),
-                "scout_id": str(r.scout_id),
-                "program_year": r.program_year,
-                "cookie_code": r.cookie_code,
-                "quantity": int(qty),
-                "order_id": str(r.order_id),
-            })
+        items = _str_ids(df, ["order_id", "parent_id", "scout_id"])
+        items["cookie_code"] = df.get("cookie_code")
+        items["quantity"] = df.get("quantity")
+        items["program_year"] = df.get("program_year")
+        items["quantity"] = pd.to_numeric(items["quantity"], errors="coerce")
+        items["program_year"] = pd.to_numeric(items["program_year"], errors="coerce")
+        items = items[items["program_year"].notna()].astype({"program_year": int})
+        catalog = _import_cookie_catalog(items["program_year"].unique())
+        items = items.merge(catalog, on=["program_year", "cookie_code"], how="inner")
     else:
         # Wide format
-        meta_cols = {'order_id', 'parent_id', 'scout_id', 'program_year', 'order_ref', 'order_type', 'status', 'order_qty_boxes', 'order_amount', 'comments', 'external_order_id', 'order_source', 'submit_dt', 'created_at', 'Customer Email Address', 'Payment Status', 'Council Name', 'Troop Number', 'Refund', 'Baker'}
-
-        for r in df.itertuples():
-            for col in df.columns:
-                if col in meta_cols:
-                    continue
-
-                # Skip columns that are not cookie codes
-                if col not in cookie_codes:
-                    continue
-
-                qty = getattr(r, col)
-                # Coerce strings/None to numeric; skip non-positive or NaN
-                qty = pd.to_numeric(qty, errors='coerce')
-                if pd.isna(qty) or qty <= 0:
-                    continue
-
-                # Require matched parent/scout
-                if pd.isna(r.parent_id) or pd.isna(r.scout_id):
-                    continue
-
-                payload.append({
-                    "parent_id": str(r.parent_id),
-                    "scout_id": str(r.scout_id),
-                    "program_year": r.program_year,
-                    "cookie_code": col,
-                    "quantity": int(qty),
-                    "order_id": str(r.order_id),
-                })
-
-    execute_many_sql(sql, payload)
+        items = _melt_cookie_columns(df, ["order_id", "parent_id", "scout_id"])
+
+    # Positive quantities with an order and a matched parent/scout only
+    items = items[
+        (items["quantity"] > 0)
+        & items["order_id"].notna()
+        & items["parent_id"].notna()
+        & items["scout_id"].notna()
+    ]
+
+    payload = pd.DataFrame({
+        "parent_id": items["parent_id"],
+        "scout_id": items["scout_id"],
+        "program_year": items["program_year"].astype(int),
+        "cookie_code": items["cookie_code"],
+        "quantity": items["quantity"].astype(int),
+        "order_id": items["order_id"],
+    })
+    execute_many_sql(sql, _records(payload))
 
 
 # ==================================================
@@ -979,36 +1280,26 @@ def bulk_insert_money_ledger(df):
         )
     """
 
-    payload = []
+    cols = df.reindex(columns=["order_id", "parent_id", "scout_id", "program_year", "order_amount", "order_type"])
 
-    for _, row in df.iterrows():
-        order_id = row.get('order_id')
-        parent_id = row.get('parent_id')
-        scout_id = row.get('scout_id')
-        program_year = row.get('program_year')
-        order_amount = row.get('order_amount')
-        order_type = row.get('order_type')
-    
-        # Only create payment entry for Digital Cookie orders
-        if not _is_digital(order_type):
-            continue
-    
-        # Skip if missing required fields
-        if pd.isna(order_id) or pd.isna(parent_id) or pd.isna(scout_id) or pd.isna(order_amount):
-            continue
-    
-        payload.append({
-            "parent_id": str(parent_id),
-            "scout_id": str(scout_id),
-            "program_year": int(program_year),
-            "amount": float(order_amount),
-            "method": "DIGITAL_COOKIE",
-            "notes": "Digital Cookie import - pre-paid",
-            "order_id": str(order_id),
-        })
+    # Only create payment entry for Digital Cookie orders, with all required fields
+    paid = cols[
+        cols["order_type"].astype("string").str.contains("digital", case=False, na=False)
+        & cols[["order_id", "parent_id", "scout_id", "order_amount"]].notna().all(axis=1)
+    ]
+    if paid.empty:
+        return
 
-    if payload:
-        execute_many_sql(sql, payload)
+    payload = pd.DataFrame({
+        "parent_id": paid["parent_id"].astype(str),
+        "scout_id": paid["scout_id"].astype(str),
+        "program_year": paid["program_year"].astype(int),
+        "amount": paid["order_amount"].astype(float),
+        "method": "DIGITAL_COOKIE",
+        "notes": "Digital Cookie import - pre-paid",
+        "order_id": paid["order_id"].astype(str),
+    })
+    execute_many_sql(sql, _records(payload))
 
 def get_paid_amount_by_order(order_id: str) -> Decimal:
     row = fetch_one("""
@@ -1029,6 +1320,79 @@ def get_payment_status(order_type: str | None, order_amount: Decimal, paid_amoun
     return "UNPAID"
 
 
+def to_cents(values) -> pd.Series:
+    """
+    Money column (Decimal / float / str) -> int64 cents.  Missing -> 0.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    return (pd.to_numeric(s, errors="coerce").fillna(0) * 100).round().astype("int64")
+
+
+def payment_status_series(order_type: pd.Series, order_cents: pd.Series, paid_cents: pd.Series) -> pd.Series:
+    """
+    Vectorized get_payment_status over integer cents.
+    The 0.005 tolerance there is half a cent, so in cents it is paid >= owed.
+    """
+    digital = order_type.astype("string").str.contains("digital", case=False, regex=False, na=False)
+    paid = digital.to_numpy(dtype=bool) | (paid_cents.to_numpy() >= order_cents.to_numpy())
+    return pd.Series(np.where(paid, "PAID", "UNPAID"), index=order_type.index, dtype=object)
+
+
+def payment_columns(
+    df: pd.DataFrame,
+    type_col: str = "orderType",
+    amount_col: str = "orderAmount",
+    paid_col: str = "paidAmount",
+) -> pd.DataFrame:
+    """
+    Per-row sales_cents, paid_cents (Digital Cookie counts as paid in full),
+    balance_cents and paymentStatus, aligned to df's index.
+    """
+    sales = to_cents(df[amount_col])
+    received = to_cents(df[paid_col]) if paid_col in df.columns else pd.Series(0, index=df.index)
+    status = payment_status_series(df[type_col], sales, received)
+    digital = df[type_col].astype("string").str.contains("digital", case=False, regex=False, na=False)
+    paid = received.where(~digital.to_numpy(dtype=bool), sales)
+    return pd.DataFrame({
+        "sales_cents": sales,
+        "paid_cents": paid,
+        "balance_cents": sales - paid,
+        "paymentStatus": status,
+    }, index=df.index)
+
+
+def season_payment_summary(
+    df: pd.DataFrame,
+    by: str | pd.Series | list | None = None,
+    type_col: str = "orderType",
+    amount_col: str = "orderAmount",
+    paid_col: str = "paidAmount",
+    qty_col: str = "orderQtyBoxes",
+) -> pd.DataFrame:
+    """
+    Season totals from one-row-per-order data (get_all_orders_wide):
+    orders, boxes, sales_cents, paid_cents, balance_cents, unpaid_orders.
+    One row per group of `by` (column names or Series aligned to df), or a
+    single "total" row.
+    """
+    money = payment_columns(df, type_col, amount_col, paid_col)
+    frame = pd.DataFrame({
+        "orders": 1,
+        "boxes": pd.to_numeric(df[qty_col], errors="coerce").fillna(0).astype("int64")
+        if qty_col in df.columns else 0,
+        "sales_cents": money["sales_cents"],
+        "paid_cents": money["paid_cents"],
+        "balance_cents": money["balance_cents"],
+        "unpaid_orders": (money["paymentStatus"] == "UNPAID").astype("int64"),
+    }, index=df.index)
+
+    if by is None:
+        return frame.sum().to_frame("total").T
+    keys = [by] if isinstance(by, (str, pd.Series)) else list(by)
+    keys = [k if isinstance(k, pd.Series) else df[k] for k in keys]
+    return frame.groupby(keys, sort=False, dropna=False).sum()
+
+
 # ==================================================
 # Parent-editable fields (used by delete/modify page)
 # ==================================================
@@ -1323,174 +1687,622 @@ def get_admin_orders_flat(program_year: int):
 # Bulk admin updates (used by admin management grid)
 # ==================================================
 
+_ORDER_FIELDS = {
+    # grid key: (orders column, SQL type)
+    "initialOrder": ("initial_order", "boolean"),
+    "addEbudde": ("add_ebudde", "boolean"),
+    "verifiedDigitalCookie": ("verified_digital", "boolean"),
+    "orderStatus": ("status", "text"),
+    "comments": ("comments", "text"),
+    "orderType": ("order_type", "text"),
+    "orderPickedup": ("order_pickedup", "boolean"),
+}
+
+
+def _field_value(sql_type: str, v):
+    if v is None or pd.isna(v):
+        return None
+    return bool(v) if sql_type == "boolean" else str(v)
+
+
 def admin_update_orders_bulk(updates: list[dict[str, Any]], cookie_cols: list[str] = None):
     """
     Apply bulk updates to orders and their cookie quantities.
     Each item in 'updates' should look like:
       {"orderId": "...", "initialOrder": True, "addEbudde": False, "verifiedDigitalCookie": True, "orderStatus": "PRINTED", "TM": 10, "SAM": 5, ...}
     Only whitelisted fields are applied for orders table.
-    Cookie columns update the order_items table.
-    """
-    allowed = {
-        "initialOrder": "initial_order",
-        "addEbudde": "add_ebudde",
-        "verifiedDigitalCookie": "verified_digital",
-        "orderStatus": "status",
-        "comments": "comments",
-        "orderType": "order_type",
-        "orderPickedup": "order_pickedup",
-    }
-    
+    Cookie columns update the order_items table (0 / empty deletes the row);
+    order totals follow via the order_items triggers.
+
+    The whole batch is one transaction: header fields are updated per set of
+    edited columns, cookie rows with one upsert and one delete.
+    """
     cookie_cols = cookie_cols or []
 
+    header_groups: dict[tuple[str, ...], list[tuple]] = {}
+    # keyed by (order, cookie) so a repeated edit keeps its last value
+    quantities: dict[tuple[str, str], int] = {}
+
     for u in updates:
+        oid = u.get("orderId")
+        if not oid:
+            continue
+        u = dict(u)
         if u.get("orderStatus") == "PICKED_UP":
             u["orderPickedup"] = True
-
         if u.get("orderPickedup") is True and "orderStatus" not in u:
             u["orderStatus"] = "PICKED_UP"
 
-        oid = u.get("orderId")
-        if not oid:
-            continue
+        keys = tuple(k for k in _ORDER_FIELDS if k in u)
+        if keys:
+            header_groups.setdefault(keys, []).append(
+                (str(oid), *(_field_value(_ORDER_FIELDS[k][1], u[k]) for k in keys))
+            )
+
+        for code in cookie_cols:
+            if code in u:
+                qty = u[code]
+                quantities[(str(oid), code)] = 0 if qty is None or pd.isna(qty) else int(qty)
+
+    upserts = [(oid, code, qty) for (oid, code), qty in quantities.items() if qty]
+    deletes = [(oid, code) for (oid, code), qty in quantities.items() if not qty]
+
+    with transaction():
+        # Order header fields: one UPDATE ... FROM (VALUES ...) per column set
+        for keys, rows in header_groups.items():
+            cols = [_ORDER_FIELDS[k][0] for k in keys]
+            casts = ["uuid", *(_ORDER_FIELDS[k][1] for k in keys)]
+            for chunk in _chunks(rows):
+                values, params = _values_rows(chunk, casts)
+                execute_sql(f"""
+                    UPDATE cookies_app.orders o
+                    SET {", ".join(f"{c} = v.{c}" for c in cols)}
+                    FROM (VALUES {values}) AS v(order_id, {", ".join(cols)})
+                    WHERE o.order_id = v.order_id
+                """, params)
+
+        # Cookie quantities: upsert non-zero, delete zero
+        for chunk in _chunks(upserts):
+            values, params = _values_rows(chunk, ["uuid", "text", "int"])
+            execute_sql(f"""
+                INSERT INTO cookies_app.order_items
+                    (order_id, program_year, cookie_code, quantity, parent_id, scout_id)
+                SELECT o.order_id, o.program_year, v.cookie_code, v.quantity, o.parent_id, o.scout_id
+                FROM (VALUES {values}) AS v(order_id, cookie_code, quantity)
+                JOIN cookies_app.orders o ON o.order_id = v.order_id
+                ON CONFLICT (order_id, program_year, cookie_code)
+                DO UPDATE SET quantity = EXCLUDED.quantity
+            """, params)
+
+        for chunk in _chunks(deletes):
+            values, params = _values_rows(chunk, ["uuid", "text"])
+            execute_sql(f"""
+                DELETE FROM cookies_app.order_items oi
+                USING (VALUES {values}) AS v(order_id, cookie_code)
+                WHERE oi.order_id = v.order_id
+                  AND oi.cookie_code = v.cookie_code
+            """, params)
 
-        # Update order table fields
-        sets = []
-        params: dict[str, Any] = {"oid": oid}
-
-        for k, col in allowed.items():
-            if k in u:
-                sets.append(f"{col} = :{k}")
-                params[k] = u[k]
-
-        if sets:
-            sql = f"""
-                UPDATE cookies_app.orders
-                SET {", ".join(sets)}
-                WHERE order_id = :oid
-            """
-            execute_sql(sql, params)
-        
-        # Update cookie quantities in order_items
-        cookie_changed = False
-        for cookie_code in cookie_cols:
-            if cookie_code in u:
-                cookie_changed = True
-                new_qty = u[cookie_code]
-                
-                # Get program_year for this order
-                year_result = fetch_one("""
-                    SELECT program_year FROM cookies_app.orders WHERE order_id = :oid
-                """, {"oid": oid})
-                
-                if not year_result:
-                    continue
-                    
-                program_year = year_result.program_year
-                
-                # Check if order_item exists
-                existing = fetch_one("""
-                    SELECT quantity FROM cookies_app.order_items
-                    WHERE order_id = :oid AND cookie_code = :code AND program_year = :year
-                """, {"oid": oid, "code": cookie_code, "year": program_year})
-                
-                if new_qty == 0 or new_qty is None:
-                    # Delete if quantity is 0
-                    if existing:
-                        execute_sql("""
-                            DELETE FROM cookies_app.order_items
-                            WHERE order_id = :oid AND cookie_code = :code AND program_year = :year
-                        """, {"oid": oid, "code": cookie_code, "year": program_year})
-                else:
-                    # Update or insert
-                    if existing:
-                        execute_sql("""
-                            UPDATE cookies_app.order_items
-                            SET quantity = :qty
-                            WHERE order_id = :oid AND cookie_code = :code AND program_year = :year
-                        """, {"oid": oid, "code": cookie_code, "qty": new_qty, "year": program_year})
-                    else:
-                        # Get parent_id and scout_id from order
-                        order_info = fetch_one("""
-                            SELECT parent_id, scout_id FROM cookies_app.orders WHERE order_id = :oid
-                        """, {"oid": oid})
-                        
-                        if order_info:
-                            execute_sql("""
-                                INSERT INTO cookies_app.order_items 
-                                (order_id, program_year, cookie_code, quantity, parent_id, scout_id)
-                                VALUES (:oid, :year, :code, :qty, :pid, :sid)
-                            """, {
-                                "oid": oid, 
-                                "year": program_year, 
-                                "code": cookie_code, 
-                                "qty": new_qty,
-                                "pid": order_info.parent_id,
-                                "sid": order_info.scout_id
-                            })
-
-        # Recompute order header totals from current order_items + cookie prices
-        # so Order Management amount/qty always matches edited cookie rows.
-        if cookie_changed:
-            totals = fetch_one("""
-                SELECT
-                    COALESCE(SUM(oi.quantity), 0) AS total_qty,
-                    COALESCE(SUM(oi.quantity * cy.price_per_box), 0) AS total_amount
-                FROM cookies_app.orders o
-                LEFT JOIN cookies_app.order_items oi
-                  ON oi.order_id = o.order_id
-                 AND oi.program_year = o.program_year
-                LEFT JOIN cookies_app.cookie_years cy
-                  ON cy.cookie_code = oi.cookie_code
-                 AND cy.program_year = oi.program_year
-                WHERE o.order_id = :oid
-            """, {"oid": oid})
-
-            execute_sql("""
-                UPDATE cookies_app.orders
-                SET order_qty_boxes = :qty,
-                    order_amount = :amt
-                WHERE order_id = :oid
-            """, {
-                "oid": oid,
-                "qty": int(totals.total_qty or 0),
-                "amt": int(totals.total_amount or 0),
-            })
 
-def fetch_existing_external_orders(order_source: str) -> set:
+# ==================================================
+# Order totals (maintained by the order_items triggers)
+# ==================================================
+
+def verify_order_totals(program_year: int | None = None) -> pd.DataFrame:
+    """
+    One pass over orders + order_items: orders whose stored
+    order_qty_boxes / order_amount differ from their items.
+
+    The 0002 migration triggers keep these in step; anything returned here
+    was written around them (or before the migration).  Orders without
+    items only show up when they carry non-zero totals (item_rows = 0).
+    """
+    return fetch_df("""
+        WITH computed AS (
+            SELECT
+                o.order_id,
+                o.program_year,
+                o.order_type,
+                o.order_qty_boxes,
+                o.order_amount,
+                COUNT(oi.order_id) AS item_rows,
+                COALESCE(SUM(oi.quantity), 0) AS items_qty,
+                COALESCE(SUM(oi.quantity * cy.price_per_box), 0) AS items_amount
+            FROM cookies_app.orders o
+            LEFT JOIN cookies_app.order_items oi
+              ON oi.order_id = o.order_id
+             AND oi.program_year = o.program_year
+            LEFT JOIN cookies_app.cookie_years cy
+              ON cy.cookie_code = oi.cookie_code
+             AND cy.program_year = oi.program_year
+            WHERE (CAST(:year AS int) IS NULL OR o.program_year = :year)
+            GROUP BY o.order_id
+        )
+        SELECT *
+        FROM computed
+        WHERE order_qty_boxes IS DISTINCT FROM items_qty
+           OR order_amount IS DISTINCT FROM items_amount
+        ORDER BY program_year, order_id
+    """, {"year": program_year}, timeout_ms=HEAVY_QUERY_TIMEOUT_MS)
+
+
+def repair_order_totals(order_ids: Iterable[str]):
+    """Recompute stored totals from order_items for the given orders."""
+    order_ids = [str(o) for o in order_ids]
+    for chunk in _chunks(order_ids):
+        execute_sql(
+            "SELECT cookies_app.recompute_order_totals(CAST(:oids AS uuid[]))",
+            {"oids": chunk},
+        )
+    # The function writes orders; the SQL text doesn't say so
+    invalidate_cache("orders")
+
+
+def fetch_existing_external_orders(order_source: str, external_ids: Iterable[str]) -> set:
+    """
+    Which of external_ids are already imported for order_source.  For the
+    import preview only; the insert itself dedupes in the database.
+    """
+    external_ids = [str(x) for x in external_ids]
+    if not external_ids:
+        return set()
     rows = fetch_all("""
         SELECT external_order_id
         FROM cookies_app.orders
         WHERE order_source = :source
-    """, {"source": order_source})
-    return [r['external_order_id'] for r in rows]
+          AND external_order_id = ANY(:ids)
+    """, {"source": order_source, "ids": external_ids})
+    return {r['external_order_id'] for r in rows}
+
+
+# ==================================================
+# DOC import plan (dry run) + apply
+# ==================================================
+DOC_ORDER_SOURCE = "Digital Cookie Import"
+
+# What the DOC import brings in: in-person orders that are processing
+# (imported) or completed (audited / force-imported)
+DOC_IMPORT_TYPES = ["In-Person Delivery", "In-Person Delivery with Donation"]
+DOC_IMPORT_STATUSES = ["PROCESSING", "COMPLETED"]
+
+PLAN_NEW = "new"
+PLAN_UNCHANGED = "imported"
+PLAN_CHANGED = "changed"
+PLAN_COMPLETED_MISSING = "completed_missing"
+PLAN_ACTIONS = (PLAN_NEW, PLAN_UNCHANGED, PLAN_CHANGED, PLAN_COMPLETED_MISSING)
+
+_PLAN_STAGE_COLS = {
+    "external_order_id": "text",
+    "order_status": "text",
+    "cookie_code": "text",
+    "quantity": "integer",
+}
+
+
+@dataclass
+class DocImportPlan:
+    """
+    What importing an export would do, one row per uploaded order:
+    external_order_id, export_status, action (PLAN_*), order_id / db_status
+    when already imported, export_boxes / db_boxes, and for changed orders
+    changes = {cookie_code: [db_qty, export_qty]} (None = no row).
+    """
+    orders: pd.DataFrame
+
+    def counts(self) -> dict:
+        return {a: int((self.orders["action"] == a).sum()) for a in PLAN_ACTIONS}
+
+    def ids(self, *actions: str) -> list[str]:
+        return self.orders.loc[self.orders["action"].isin(actions), "external_order_id"].tolist()
+
+    def item_diffs(self) -> pd.DataFrame:
+        """Changed orders as one row per (order, cookie) difference."""
+        changed = self.orders[self.orders["action"] == PLAN_CHANGED]
+        return pd.DataFrame(
+            [
+                (ext, code, db_qty or 0, export_qty or 0)
+                for ext, changes in zip(changed["external_order_id"], changed["changes"])
+                for code, (db_qty, export_qty) in sorted(changes.items())
+            ],
+            columns=["external_order_id", "cookie_code", "db_qty", "export_qty"],
+        )
+
+    def item_updates(self) -> list[dict]:
+        """admin_update_orders_bulk rows that set changed orders to the export's quantities."""
+        changed = self.orders[self.orders["action"] == PLAN_CHANGED]
+        return [
+            {"orderId": oid, **{code: export_qty or 0 for code, (_db, export_qty) in changes.items()}}
+            for oid, changes in zip(changed["order_id"], changed["changes"])
+        ]
+
+
+def _stage_frame(df: pd.DataFrame, codes: set[str], head_cols: list[str]) -> pd.DataFrame:
+    """
+    Long rows for fetch_df_staged: one header row per order (external_order_id
+    + head_cols, no cookie) plus one (external_order_id, cookie_code,
+    quantity) row per non-zero cookie cell.  Repeated cookie columns
+    (several donation columns -> DON) are summed by the staged query.
+    """
+    heads = df[["external_order_id", *head_cols]].assign(cookie_code=None, quantity=None)
+    frames = [heads]
+    for i, col in enumerate(df.columns):
+        if col in codes:
+            qty = pd.to_numeric(df.iloc[:, i], errors="coerce").fillna(0).round().astype(int)
+            frames.append(pd.DataFrame({
+                "external_order_id": df["external_order_id"],
+                "cookie_code": col,
+                "quantity": qty,
+            })[qty != 0])
+    staged = pd.concat(frames, ignore_index=True).reindex(columns=[*heads.columns])
+    return staged[staged["external_order_id"].notna()]
+
+
+def plan_doc_import(df: pd.DataFrame, program_year: int,
+                    order_source: str = DOC_ORDER_SOURCE) -> DocImportPlan:
+    """
+    Dry run of a DOC import: compare the uploaded orders (external_order_id,
+    order_status and cookie-code columns, as renamed for the import) with
+    what the database already holds, in one staged join (fetch_df_staged).
+
+      new                PROCESSING in the export, not imported yet
+      completed_missing  COMPLETED in the export, not imported yet
+      imported           already imported, same cookie quantities
+      changed            already imported, quantities differ upstream
+    """
+    codes = {*_wide_cookie_codes(program_year), DONATION_CODE}
+    staged = _stage_frame(df, codes, ["order_status"])
+
+    plan = fetch_df_staged("""
+        WITH up AS (
+            SELECT
+                external_order_id,
+                MAX(order_status) AS export_status,
+                COALESCE(SUM(quantity), 0) AS export_boxes
+            FROM {staged}
+            GROUP BY external_order_id
+        ),
+        db AS (
+            SELECT o.order_id, o.external_order_id, o.status, o.order_qty_boxes
+            FROM cookies_app.orders o
+            JOIN up
+              ON up.external_order_id = o.external_order_id
+            WHERE o.order_source = :source
+        ),
+        up_items AS (
+            SELECT s.external_order_id, s.cookie_code, SUM(s.quantity) AS qty
+            FROM {staged} s
+            JOIN db
+              ON db.external_order_id = s.external_order_id
+            WHERE s.cookie_code IS NOT NULL
+            GROUP BY s.external_order_id, s.cookie_code
+        ),
+        db_items AS (
+            SELECT db.external_order_id, oi.cookie_code, SUM(oi.quantity) AS qty
+            FROM db
+            JOIN cookies_app.order_items oi
+              ON oi.order_id = db.order_id
+            GROUP BY db.external_order_id, oi.cookie_code
+        ),
+        item_diff AS (
+            SELECT
+                external_order_id,
+                jsonb_object_agg(cookie_code, jsonb_build_array(d.qty, u.qty)) AS changes
+            FROM up_items u
+            FULL JOIN db_items d USING (external_order_id, cookie_code)
+            WHERE u.qty IS DISTINCT FROM d.qty
+            GROUP BY external_order_id
+        )
+        SELECT
+            up.external_order_id,
+            up.export_status,
+            CASE
+                WHEN db.order_id IS NULL AND up.export_status = 'COMPLETED' THEN 'completed_missing'
+                WHEN db.order_id IS NULL THEN 'new'
+                WHEN item_diff.changes IS NOT NULL THEN 'changed'
+                ELSE 'imported'
+            END AS action,
+            db.order_id,
+            db.status AS db_status,
+            up.export_boxes,
+            db.order_qty_boxes AS db_boxes,
+            item_diff.changes
+        FROM up
+        LEFT JOIN db USING (external_order_id)
+        LEFT JOIN item_diff USING (external_order_id)
+        ORDER BY up.external_order_id
+    """, staged, _PLAN_STAGE_COLS, {"source": order_source})
+    return DocImportPlan(orders=plan)
+
+
+def apply_doc_import(new_orders: pd.DataFrame, item_updates: list[dict] | None = None) -> pd.DataFrame:
+    """
+    Apply an import plan in one transaction: create the new orders (headers,
+    items, planned inventory, pre-paid ledger) and, when given, set changed
+    orders' items to the export's quantities (DocImportPlan.item_updates).
+    Nothing is written unless all of it succeeds.  Returns the created rows.
+    """
+    with transaction():
+        created = bulk_insert_order_headers(new_orders)
+        bulk_insert_order_items(created)
+        bulk_insert_planned_inventory(created)
+        bulk_insert_money_ledger(created)
+        if item_updates:
+            codes = sorted({k for u in item_updates for k in u if k != "orderId"})
+            admin_update_orders_bulk(item_updates, codes)
+    return created
+
+
+# =====================================================
+# eBudde "All DOC Orders" reconciliation
+# =====================================================
+RECON_MISSING_LOCAL = "missing_local"        # in eBudde, never imported here
+RECON_MISSING_EBUDDE = "missing_ebudde"      # imported here, not in eBudde
+RECON_SCOUT = "scout_mismatch"               # same order, credited to another scout
+RECON_QTY = "quantity_mismatch"              # same order, one row per differing cookie
+RECON_AMOUNT = "amount_mismatch"             # same order, different order amount
+RECON_STATUS = "status_mismatch"             # imported here, eBudde now shows it canceled, shipped...
+RECON_CLASSES = (RECON_MISSING_LOCAL, RECON_MISSING_EBUDDE, RECON_SCOUT, RECON_QTY, RECON_AMOUNT,
+                 RECON_STATUS)
+
+_RECON_STAGE_COLS = {
+    "external_order_id": "text",
+    "scout_id": "uuid",
+    "order_amount": "numeric",
+    "in_scope": "boolean",
+    "ebudde_status": "text",
+    "cookie_code": "text",
+    "quantity": "integer",
+}
+
+
+@dataclass
+class EbuddeReconciliation:
+    """
+    Differences between an eBudde report and the imported DOC orders, one
+    row per discrepancy: discrepancy (RECON_*), external_order_id,
+    order_id, scout_id / scout_name (ours, else eBudde's), ebudde_scout_id /
+    ebudde_scout_name, cookie_code (quantity rows), local_qty / ebudde_qty
+    (boxes: per cookie, or per order for missing orders), local_amount /
+    ebudde_amount, ebudde_status (order type / status in the report).
+    """
+    discrepancies: pd.DataFrame
+    out_of_scope: int = 0       # report-only orders the DOC import never brings in
+
+    def counts(self) -> dict:
+        return {c: int((self.discrepancies["discrepancy"] == c).sum()) for c in RECON_CLASSES}
+
+    def of(self, discrepancy: str) -> pd.DataFrame:
+        return self.discrepancies[self.discrepancies["discrepancy"] == discrepancy]
+
+    @property
+    def in_sync(self) -> bool:
+        return self.discrepancies.empty
+
+
+def reconcile_ebudde_orders(report: pd.DataFrame, program_year: int,
+                            order_source: str = DOC_ORDER_SOURCE) -> EbuddeReconciliation:
+    """
+    Compare an eBudde "All DOC Orders" report (doc_import_utils.parse_ebudde_report,
+    with scout_id filled in by match_scouts; None = unmatched) against the
+    year's imported DOC orders in one staged query: orders full-join on
+    external_order_id, items on (order, cookie_code), all as hash joins in
+    the database.  Cookie columns may be codes or catalog display names.
+
+    Only orders the DOC import would bring in (DOC_IMPORT_TYPES /
+    DOC_IMPORT_STATUSES, when the report has those columns) are compared.
+    A shipped, canceled etc. order that was imported here is a status
+    mismatch; one that wasn't is only counted in out_of_scope.
+    """
+    in_scope = pd.Series(True, index=report.index)
+    status = pd.Series("", index=report.index)
+    for col, allowed in (("order_type", DOC_IMPORT_TYPES), ("order_status", DOC_IMPORT_STATUSES)):
+        if col in report.columns:
+            in_scope &= report[col].isin(allowed)
+            status = status.str.cat(report[col].fillna("").astype(str), sep=" / ")
+    report = report.assign(in_scope=in_scope, ebudde_status=status.str.strip(" /"))
+
+    report = report.rename(columns=build_cookie_rename_map(program_year))
+    if "order_amount" not in report.columns:
+        report = report.assign(order_amount=None)
+    if "scout_id" not in report.columns:
+        report = report.assign(scout_id=None)
+    codes = {*_wide_cookie_codes(program_year), DONATION_CODE}
+    staged = _stage_frame(report, codes, ["scout_id", "order_amount", "in_scope", "ebudde_status"])
+
+    found = fetch_df_staged("""
+        WITH eb AS (
+            SELECT
+                external_order_id,
+                CAST(MIN(CAST(scout_id AS text)) AS uuid) AS scout_id,
+                SUM(order_amount) AS amount,
+                COALESCE(SUM(quantity), 0) AS boxes,
+                COALESCE(BOOL_AND(in_scope), true) AS in_scope,
+                MAX(ebudde_status) AS ebudde_status
+            FROM {staged}
+            GROUP BY external_order_id
+        ),
+        eb_items AS (
+            SELECT external_order_id, cookie_code, SUM(quantity) AS qty
+            FROM {staged}
+            WHERE cookie_code IS NOT NULL
+            GROUP BY external_order_id, cookie_code
+        ),
+        db AS (
+            SELECT order_id, external_order_id, scout_id, order_qty_boxes, order_amount
+            FROM cookies_app.orders
+            WHERE order_source = :source
+              AND program_year = :year
+              AND external_order_id IS NOT NULL
+        ),
+        db_items AS (
+            SELECT db.external_order_id, oi.cookie_code, SUM(oi.quantity) AS qty
+            FROM db
+            JOIN cookies_app.order_items oi
+              ON oi.order_id = db.order_id
+            GROUP BY db.external_order_id, oi.cookie_code
+        ),
+        pairs AS (
+            SELECT
+                external_order_id,
+                db.order_id,
+                db.scout_id,
+                eb.scout_id AS ebudde_scout_id,
+                db.order_qty_boxes,
+                eb.boxes AS ebudde_boxes,
+                db.order_amount,
+                eb.amount AS ebudde_amount,
+                eb.ebudde_status,
+                eb.external_order_id IS NOT NULL AS in_ebudde,
+                COALESCE(eb.in_scope, true) AS in_scope
+            FROM eb
+            FULL JOIN db USING (external_order_id)
+        ),
+        found AS (
+            SELECT 'missing_local' AS discrepancy, external_order_id, order_id, ebudde_scout_id,
+                   CAST(NULL AS text) AS cookie_code, CAST(NULL AS bigint) AS local_qty,
+                   ebudde_boxes AS ebudde_qty, order_amount AS local_amount, ebudde_amount,
+                   CAST(NULL AS text) AS ebudde_status
+            FROM pairs
+            WHERE order_id IS NULL AND in_scope
+
+            UNION ALL
+            SELECT 'missing_ebudde', external_order_id, order_id, ebudde_scout_id,
+                   NULL, order_qty_boxes, NULL, order_amount, NULL, NULL
+            FROM pairs
+            WHERE NOT in_ebudde
+
+            UNION ALL
+            SELECT 'status_mismatch', external_order_id, order_id, ebudde_scout_id,
+                   NULL, order_qty_boxes, ebudde_boxes, order_amount, ebudde_amount, ebudde_status
+            FROM pairs
+            WHERE in_ebudde AND order_id IS NOT NULL AND NOT in_scope
+
+            UNION ALL
+            SELECT 'scout_mismatch', external_order_id, order_id, ebudde_scout_id,
+                   NULL, NULL, NULL, NULL, NULL, NULL
+            FROM pairs
+            WHERE in_ebudde AND order_id IS NOT NULL AND in_scope
+              AND ebudde_scout_id IS NOT NULL
+              AND ebudde_scout_id IS DISTINCT FROM scout_id
+
+            UNION ALL
+            SELECT 'amount_mismatch', external_order_id, order_id, ebudde_scout_id,
+                   NULL, NULL, NULL, order_amount, ebudde_amount, NULL
+            FROM pairs
+            WHERE in_ebudde AND order_id IS NOT NULL AND in_scope
+              AND ebudde_amount IS NOT NULL
+              AND ROUND(ebudde_amount, 2) <> COALESCE(order_amount, 0)
+
+            UNION ALL
+            SELECT 'quantity_mismatch', external_order_id, p.order_id, p.ebudde_scout_id,
+                   cookie_code, COALESCE(d.qty, 0), COALESCE(e.qty, 0), NULL, NULL, NULL
+            FROM eb_items e
+            FULL JOIN db_items d USING (external_order_id, cookie_code)
+            JOIN pairs p USING (external_order_id)
+            WHERE p.in_ebudde AND p.order_id IS NOT NULL AND p.in_scope
+              AND COALESCE(d.qty, 0) <> COALESCE(e.qty, 0)
+        )
+        SELECT
+            f.discrepancy,
+            f.external_order_id,
+            f.order_id,
+            COALESCE(o.scout_id, f.ebudde_scout_id) AS scout_id,
+            s.first_name || ' ' || s.last_name AS scout_name,
+            f.ebudde_scout_id,
+            es.first_name || ' ' || es.last_name AS ebudde_scout_name,
+            f.ebudde_status,
+            f.cookie_code,
+            f.local_qty,
+            f.ebudde_qty,
+            f.local_amount,
+            f.ebudde_amount
+        FROM found f
+        LEFT JOIN cookies_app.orders o
+          ON o.order_id = f.order_id
+        LEFT JOIN cookies_app.scouts s
+          ON s.scout_id = COALESCE(o.scout_id, f.ebudde_scout_id)
+        LEFT JOIN cookies_app.scouts es
+          ON es.scout_id = f.ebudde_scout_id
+        ORDER BY f.discrepancy, scout_name, f.external_order_id, f.cookie_code
+    """, staged, _RECON_STAGE_COLS, {"source": order_source, "year": int(program_year)},
+        timeout_ms=HEAVY_QUERY_TIMEOUT_MS)
+    # Out-of-scope report orders that weren't imported here are only counted
+    skipped = set(report.loc[~report["in_scope"], "external_order_id"].dropna())
+    skipped -= set(found.loc[found["discrepancy"] == RECON_STATUS, "external_order_id"])
+    return EbuddeReconciliation(discrepancies=found, out_of_scope=len(skipped))
 
 
 # =====================================================
 # Safe deletion utilities (for cleanup/admin use)
 # =====================================================
 
+DELETE_CHUNK = 500
+
+# Child tables first, so it works with or without ON DELETE CASCADE
+_ORDER_DELETES = [
+    ("inventory_ledger", "DELETE FROM cookies_app.inventory_ledger WHERE related_order_id = ANY(CAST(:ids AS uuid[]))"),
+    ("money_ledger", "DELETE FROM cookies_app.money_ledger WHERE related_order_id = ANY(CAST(:ids AS uuid[]))"),
+    ("order_items", "DELETE FROM cookies_app.order_items WHERE order_id = ANY(CAST(:ids AS uuid[]))"),
+    ("orders", "DELETE FROM cookies_app.orders WHERE order_id = ANY(CAST(:ids AS uuid[]))"),
+]
+
+_BOOTH_ORDERS = "SELECT order_id FROM cookies_app.orders WHERE booth_id = ANY(CAST(:ids AS uuid[]))"
+
+_BOOTH_DELETES = [
+    ("inventory_ledger", f"DELETE FROM cookies_app.inventory_ledger WHERE related_order_id IN ({_BOOTH_ORDERS})"),
+    ("money_ledger", f"DELETE FROM cookies_app.money_ledger WHERE related_order_id IN ({_BOOTH_ORDERS})"),
+    ("order_items", f"DELETE FROM cookies_app.order_items WHERE order_id IN ({_BOOTH_ORDERS})"),
+    ("orders", "DELETE FROM cookies_app.orders WHERE booth_id = ANY(CAST(:ids AS uuid[]))"),
+    ("booth_scouts", "DELETE FROM cookies_app.booth_scouts WHERE booth_id = ANY(CAST(:ids AS uuid[]))"),
+    ("booth_inventory_plan", "DELETE FROM cookies_app.booth_inventory_plan WHERE booth_id = ANY(CAST(:ids AS uuid[]))"),
+    ("booth_inventory_actual", "DELETE FROM cookies_app.booth_inventory_actual WHERE booth_id = ANY(CAST(:ids AS uuid[]))"),
+    ("booths", "DELETE FROM cookies_app.booths WHERE booth_id = ANY(CAST(:ids AS uuid[]))"),
+]
+
+
+def _delete_bulk(ids: Iterable[str], deletes: list[tuple[str, str]]) -> dict[str, int]:
+    ids = list(dict.fromkeys(str(i) for i in ids))
+    counts = {table: 0 for table, _ in deletes}
+    # One transaction for every chunk: all of it goes, or none of it
+    with transaction():
+        for chunk in _chunks(ids, DELETE_CHUNK):
+            for table, sql in deletes:
+                counts[table] += execute_sql(sql, {"ids": chunk})
+    return counts
+
+
+def delete_orders_bulk(order_ids: Iterable[str]) -> dict[str, int]:
+    """
+    Delete orders with their ledger rows and items, in one transaction
+    (array parameters, DELETE_CHUNK ids per statement).
+
+    Returns rows deleted per table, e.g. {"orders": 120, "order_items": 610, ...}.
+    """
+    return _delete_bulk(order_ids, _ORDER_DELETES)
+
+
+def delete_booths_bulk(booth_ids: Iterable[str]) -> dict[str, int]:
+    """
+    Delete booths with their orders (ledgers, items), booth scouts and
+    inventory plan / actuals, in one transaction.
+
+    Returns rows deleted per table.
+    """
+    return _delete_bulk(booth_ids, _BOOTH_DELETES)
+
+
 def delete_order_cascade(order_id: str) -> bool:
     """
-    Delete an order and all related data in the correct order.
-    
-    Note: If CASCADE DELETE constraints are enabled in the database,
-    only the final DELETE FROM orders is needed. This function provides
-    a fallback for manual cascading if constraints aren't set up.
-    
+    Delete an order and all related data.
+
     Args:
         order_id: UUID of the order to delete
-        
+
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        # Delete in reverse dependency order
-        # With CASCADE DELETE enabled, these are automatic, but safe to call anyway
-        execute_sql("DELETE FROM cookies_app.inventory_ledger WHERE related_order_id = :oid", {"oid": order_id})
-        execute_sql("DELETE FROM cookies_app.money_ledger WHERE related_order_id = :oid", {"oid": order_id})
-        execute_sql("DELETE FROM cookies_app.order_items WHERE order_id = :oid", {"oid": order_id})
-        execute_sql("DELETE FROM cookies_app.orders WHERE order_id = :oid", {"oid": order_id})
+        delete_orders_bulk([order_id])
         return True
     except Exception as e:
         print(f"Error deleting order {order_id}: {e}")
@@ -1499,49 +2311,16 @@ def delete_order_cascade(order_id: str) -> bool:
 
 def delete_booth_cascade(booth_id: str) -> bool:
     """
-    Delete a booth and all related data in the correct order.
-    
-    Manually deletes in order:
-    1. order_items related to booth orders
-    2. inventory_ledger related to booth orders
-    3. money_ledger related to booth orders
-    4. orders with this booth_id
-    5. booth_scouts entries
-    6. booth_inventory_plan entries
-    7. booth itself
-    
+    Delete a booth and all related data (see delete_booths_bulk).
+
     Args:
         booth_id: UUID of the booth to delete
-        
+
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if successful; raises on error
     """
     try:
-        # Get all orders for this booth
-        orders = fetch_all("""
-            SELECT order_id FROM cookies_app.orders WHERE booth_id = :bid
-        """, {"bid": booth_id})
-        
-        # Delete order-related data for each order
-        for order in orders:
-            order_id = str(order.order_id)
-            # Delete order items
-            execute_sql("DELETE FROM cookies_app.order_items WHERE order_id = :oid", {"oid": order_id})
-            # Delete inventory ledger entries (uses related_order_id column)
-            execute_sql("DELETE FROM cookies_app.inventory_ledger WHERE related_order_id = :oid", {"oid": order_id})
-            # Delete money ledger entries (uses related_order_id column)
-            execute_sql("DELETE FROM cookies_app.money_ledger WHERE related_order_id = :oid", {"oid": order_id})
-        
-        # Delete the orders themselves
-        execute_sql("DELETE FROM cookies_app.orders WHERE booth_id = :bid", {"bid": booth_id})
-        
-        # Delete booth-specific data
-        execute_sql("DELETE FROM cookies_app.booth_scouts WHERE booth_id = :bid", {"bid": booth_id})
-        execute_sql("DELETE FROM cookies_app.booth_inventory_plan WHERE booth_id = :bid", {"bid": booth_id})
-        
-        # Finally delete the booth itself
-        execute_sql("DELETE FROM cookies_app.booths WHERE booth_id = :bid", {"bid": booth_id})
-        
+        delete_booths_bulk([booth_id])
         return True
     except Exception as e:
         error_msg = f"Error deleting booth {booth_id}: {str(e)}"
@@ -1551,33 +2330,12 @@ def delete_booth_cascade(booth_id: str) -> bool:
 
 def delete_booth_cascade_manual(booth_id: str) -> bool:
     """
-    Delete a booth and all related data manually (if CASCADE not enabled).
-    
-    This is a fallback version that manually deletes all related data
-    in the correct order. Use this if CASCADE DELETE constraints
-    haven't been applied to the database.
-    
-    Args:
-        booth_id: UUID of the booth to delete
-        
-    Returns:
-        bool: True if successful, False otherwise
+    Delete a booth and all related data, returning False instead of raising.
+    delete_booths_bulk deletes child rows explicitly, so this works whether
+    or not CASCADE DELETE constraints are in place.
     """
     try:
-        # First, get all orders for this booth
-        booth_orders = fetch_all(
-            "SELECT order_id FROM cookies_app.orders WHERE booth_id = :bid",
-            {"bid": booth_id}
-        )
-        
-        # Delete each booth order with cascade
-        for order in booth_orders:
-            delete_order_cascade(str(order['order_id']))
-        
-        # Now delete booth-specific data
-        execute_sql("DELETE FROM cookies_app.booth_inventory_plan WHERE booth_id = :bid", {"bid": booth_id})
-        execute_sql("DELETE FROM cookies_app.booth_scouts WHERE booth_id = :bid", {"bid": booth_id})
-        execute_sql("DELETE FROM cookies_app.booths WHERE booth_id = :bid", {"bid": booth_id})
+        delete_booths_bulk([booth_id])
         return True
     except Exception as e:
         print(f"Error deleting booth {booth_id}: {e}")
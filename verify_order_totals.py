@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Check orders.order_qty_boxes / order_amount against order_items in one pass
+
+    python verify_order_totals.py [--year 2026] [--repair]
+
+The order_items triggers (utils/migrations.py, 0002) keep them in step;
+drift means something wrote around them.  --repair recomputes the drifted
+orders that have items (item-less orders are listed only).
+"""
+import argparse
+
+from utils.order_utils import verify_order_totals, repair_order_totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--repair", action="store_true")
+    args = parser.parse_args()
+
+    drift = verify_order_totals(args.year)
+    if drift.empty:
+        print("✓ Order totals match order_items")
+        return
+
+    print(f"✗ {len(drift)} order(s) with drifted totals")
+    print(drift.to_string(index=False))
+
+    if args.repair:
+        fixable = drift.loc[drift["item_rows"] > 0, "order_id"]
+        repair_order_totals(fixable)
+        remaining = verify_order_totals(args.year)
+        print(f"✓ Repaired {len(fixable)} order(s); {len(remaining)} still differ (no items)")
+
+
+if __name__ == "__main__":
+    main()